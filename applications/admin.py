@@ -1,7 +1,10 @@
 # applications/admin.py
+from django import forms
 from django.contrib import admin
+from django.utils import timezone
 
-from .models import Application, Document
+from .forms import StatusTransitionMixin
+from .models import Application, ApplicationStatusChange, Document, DocumentBlob, OutboxEmail
 
 
 class DocumentInline(admin.TabularInline):
@@ -11,8 +14,32 @@ class DocumentInline(admin.TabularInline):
     can_delete = False
 
 
+class ApplicationStatusChangeInline(admin.TabularInline):
+    model = ApplicationStatusChange
+    fields = ("changed_at", "from_status", "to_status", "changed_by")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("changed_by")
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ApplicationAdminForm(StatusTransitionMixin, forms.ModelForm):
+    class Meta:
+        model = Application
+        fields = "__all__"
+
+
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
+    form = ApplicationAdminForm
     list_display = (
         "application_id",
         "client",
@@ -24,9 +51,13 @@ class ApplicationAdmin(admin.ModelAdmin):
     list_filter = ("status", "destination_country", "submitted_date")
     search_fields = ("application_id", "client__username", "client__email")
     readonly_fields = ("application_id", "submitted_date", "last_updated")
-    inlines = [DocumentInline]
+    inlines = [DocumentInline, ApplicationStatusChangeInline]
     list_per_page = 20
 
+    def save_model(self, request, obj, form, change):
+        obj.changed_by = request.user
+        super().save_model(request, obj, form, change)
+
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
@@ -34,3 +65,33 @@ class DocumentAdmin(admin.ModelAdmin):
     list_filter = ("verified", "document_type", "uploaded_at")
     search_fields = ("application__application_id",)
     readonly_fields = ("uploaded_at",)
+
+
+@admin.register(DocumentBlob)
+class DocumentBlobAdmin(admin.ModelAdmin):
+    list_display = ("sha256", "size", "ref_count", "created_at")
+    search_fields = ("sha256",)
+    readonly_fields = [field.name for field in DocumentBlob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("application", "kind", "state", "attempts", "created_at", "sent_at")
+    list_filter = ("state", "kind")
+    search_fields = ("application__application_id",)
+    list_select_related = ["application"]
+    readonly_fields = [field.name for field in OutboxEmail._meta.fields]
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Send again")
+    def retry(self, request, queryset):
+        count = queryset.exclude(state=OutboxEmail.SENT).update(
+            state=OutboxEmail.PENDING, attempts=0, available_at=timezone.now()
+        )
+        self.message_user(request, f"{count} emails queued to send again.")
@@ -0,0 +1,192 @@
+# applications/blobs.py
+"""
+Content-addressed storage of document files.
+
+Files are stored once per distinct content under document_blobs/, named by
+their SHA-256, and each Document points at its DocumentBlob. Storing bytes
+that already have a blob only takes another reference. Blobs are deleted
+by reclaim_blobs() once no document references them.
+"""
+import hashlib
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Document, DocumentBlob
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = "document_blobs"
+
+_local = threading.local()
+
+
+def blob_storage():
+    return DocumentBlob._meta.get_field("file").storage
+
+
+def blob_name(sha256, filename):
+    """document_blobs/ab/cd/abcd….pdf; the extension keeps content types right when served"""
+    ext = os.path.splitext(filename)[1].lower()
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def content_sha256(content):
+    hasher = hashlib.sha256()
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+@contextmanager
+def storing_blobs():
+    """
+    transaction.atomic() for blocks that store document files. Blob files
+    written inside it are deleted if it rolls back, since the rows naming
+    them are gone; a nested block hands its files on to the enclosing one.
+    """
+    enclosing = getattr(_local, "written", None)
+    _local.written = written = []
+    try:
+        with transaction.atomic():
+            yield
+    except BaseException:
+        for name in written:
+            blob_storage().delete(name)
+        raise
+    else:
+        if enclosing is not None:
+            enclosing.extend(written)
+    finally:
+        _local.written = enclosing
+
+
+def _written(name):
+    """Record a newly written blob file for storing_blobs() to delete on rollback"""
+    written = getattr(_local, "written", None)
+    if written is not None:
+        written.append(name)
+
+
+def reference_blob(sha256, **filters):
+    """The blob with this hash with one more reference taken, or None if there is none"""
+    with transaction.atomic():
+        if DocumentBlob.objects.filter(pk=sha256, **filters).update(ref_count=F("ref_count") + 1):
+            return DocumentBlob.objects.get(pk=sha256)
+    return None
+
+
+def acquire_blob(sha256, content, filename):
+    """
+    The blob holding these bytes, with one more reference taken. content is
+    only written when no blob has this hash yet.
+    """
+    with transaction.atomic():
+        blob = reference_blob(sha256)
+        if blob is not None:
+            return blob
+        # Always written, never assumed from a file already at the name: the
+        # reclaimer may be about to delete that one. The storage picks a free name.
+        size = content.size
+        name = blob_storage().save(blob_name(sha256, filename), content)
+        try:
+            with transaction.atomic():
+                blob = DocumentBlob.objects.create(sha256=sha256, file=name, size=size, ref_count=1)
+            _written(name)
+            return blob
+        except IntegrityError:
+            # Another upload of the same bytes got there first
+            blob_storage().delete(name)
+            DocumentBlob.objects.filter(pk=sha256).update(ref_count=F("ref_count") + 1)
+            return DocumentBlob.objects.get(pk=sha256)
+
+
+def release_blob(blob_id):
+    if blob_id:
+        DocumentBlob.objects.filter(pk=blob_id).update(ref_count=F("ref_count") - 1)
+
+
+def attach_blob(document, blob, filename):
+    """
+    Point document at blob, shown and downloaded as filename; the caller saves
+    it. Any previous blob must be released separately.
+    """
+    document.blob = blob
+    # A plain name, so saving the document doesn't write the file again
+    document.file = blob.file.name
+    document.original_name = os.path.basename(filename)[-255:]
+
+
+def store_document_file(document, content, filename, sha256=None):
+    """Attach content to document through a blob, writing it only if the bytes are new"""
+    blob = acquire_blob(sha256 or content_sha256(content), content, filename)
+    attach_blob(document, blob, filename)
+    return blob
+
+
+def backfill_blob(document):
+    """Move a document stored before blobs existed into one; returns whether it was moved"""
+    with storing_blobs():
+        document = Document.objects.select_for_update().get(pk=document.pk)
+        if document.blob_id or not document.file or not document.file.storage.exists(document.file.name):
+            return False
+        old_name = document.file.name
+        with document.file.open("rb") as fh:
+            sha256 = content_sha256(fh)
+            store_document_file(document, fh, document.original_name or old_name, sha256)
+        document.sha256 = document.sha256 or sha256
+        document.save(update_fields=["file", "blob", "sha256", "original_name"])
+        transaction.on_commit(lambda: blob_storage().delete(old_name))
+    return True
+
+
+def reusable_document(client, sha256):
+    """
+    A checked document of client's with these bytes, if any. Instant
+    re-uploads are limited to the client's own files: knowing a hash must
+    not be enough to get someone else's document.
+    """
+    if not sha256:
+        return None
+    return Document.objects.filter(
+        sha256=sha256,
+        application__client=client,
+        blob__isnull=False,
+        processing_status=Document.PROCESSING_READY,
+    ).first()
+
+
+def unreferenced_blobs(grace):
+    """
+    Blobs no document uses. ref_count picks the candidates; the documents
+    themselves are counted too, so a drifted count can't lose a file.
+    """
+    return (
+        DocumentBlob.objects.filter(ref_count__lte=0, created_at__lt=timezone.now() - grace)
+        .annotate(references=Count("documents"))
+        .filter(references=0)
+    )
+
+
+def reclaim_blobs(grace, dry_run=False):
+    """Delete unreferenced blobs and their files; returns (blobs, bytes) reclaimed"""
+    count = size = 0
+    for blob in unreferenced_blobs(grace).iterator():
+        if dry_run:
+            count, size = count + 1, size + blob.size
+            continue
+        with transaction.atomic():
+            # Re-checked as it's deleted, in case an upload took a reference meanwhile
+            deleted, _ = DocumentBlob.objects.filter(pk=blob.pk, ref_count__lte=0, documents__isnull=True).delete()
+            if deleted:
+                transaction.on_commit(lambda name=blob.file.name: blob_storage().delete(name))
+        if deleted:
+            count, size = count + 1, size + blob.size
+            logger.info(f"Reclaimed document blob {blob.sha256}")
+    return count, size
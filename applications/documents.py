@@ -0,0 +1,144 @@
+# applications/documents.py
+"""
+Checks run on uploaded documents after the upload request has returned:
+the content must match the file's extension, PDFs must be readable,
+unencrypted and within the page limit, and photos and scans are downscaled
+and recompressed as JPEG. The upload request itself only checks the name
+and size, so a slow check never holds it up.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from utils.file_handlers import SecureFileHandler
+from utils.file_validators import FileValidator
+
+from .blobs import release_blob, store_document_file, storing_blobs
+from .models import Document
+
+logger = logging.getLogger(__name__)
+
+MAX_DOCUMENT_SIZE = 10 * 1024 * 1024
+ALLOWED_EXTENSIONS = [".pdf", ".jpg", ".jpeg", ".png", ".doc", ".docx"]
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+MAX_PDF_PAGES = 50
+# What libmagic reports for each extension; Word files are also reported by their container format
+DOCUMENT_MIME_TYPES = {
+    ".pdf": ["application/pdf"],
+    ".jpg": ["image/jpeg"],
+    ".jpeg": ["image/jpeg"],
+    ".png": ["image/png"],
+    ".doc": ["application/msword", "application/x-ole-storage", "application/CDFV2"],
+    ".docx": ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/zip"],
+}
+
+document_validator = FileValidator(
+    max_size=MAX_DOCUMENT_SIZE,
+    allowed_extensions=ALLOWED_EXTENSIONS,
+    allowed_mime_types=DOCUMENT_MIME_TYPES,
+    max_pages=MAX_PDF_PAGES,
+)
+
+
+def validate_upload(name, size):
+    """Checks an upload must pass before it's stored, whether sent whole or in chunks"""
+    document_validator.check_name_and_size(name, size)
+
+
+def check_stored_file(name):
+    """
+    Error message for the stored file name, or "" if it passes. Uses no
+    database connection, so it can run in a worker process.
+    """
+    try:
+        with default_storage.open(name, "rb") as fh:
+            document_validator.inspect(fh)
+    except ValidationError as e:
+        return " ".join(e.messages)
+    except Exception as e:
+        return str(e)
+    return ""
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones already have it
+    if not apps.ready:
+        django.setup()
+
+
+def revalidate_documents(documents, workers=1, batch_size=200):
+    """
+    Check documents' stored files again, fanning out over worker processes,
+    and record any change of outcome. Returns (checked, newly invalid).
+    """
+    checked = invalid = 0
+    documents = documents.exclude(processing_status=Document.PROCESSING_PENDING).order_by("pk")
+    rows = documents.values_list("pk", "file", "processing_status", "processing_error").iterator()
+    pool = None
+    if workers > 1:
+        # Workers only read files: results are written back from this process
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker)
+    try:
+        for batch in iter(lambda: list(islice(rows, batch_size)), []):
+            names = [name for _pk, name, _status, _error in batch]
+            errors = pool.map(check_stored_file, names, chunksize=16) if pool else map(check_stored_file, names)
+            changed = []
+            for (pk, _name, status, old_error), error in zip(batch, errors):
+                new_status = Document.PROCESSING_INVALID if error else Document.PROCESSING_READY
+                if (new_status, error) != (status, old_error):
+                    changed.append(Document(pk=pk, processing_status=new_status, processing_error=error))
+                if new_status == Document.PROCESSING_INVALID and status != new_status:
+                    invalid += 1
+            Document.objects.bulk_update(changed, ["processing_status", "processing_error"])
+            checked += len(batch)
+    finally:
+        if pool:
+            pool.shutdown()
+    return checked, invalid
+
+
+def compress_image(document):
+    """Replace the document's image with the compressed JPEG if that is smaller"""
+    with document.file.open("rb") as fh:
+        compressed = SecureFileHandler.compress_image(fh)
+    if compressed.size >= document.file.size:
+        return
+    old_blob_id, old_name = document.blob_id, document.file.name
+    name = os.path.splitext(document.original_name or os.path.basename(old_name))[0]
+    store_document_file(document, compressed, f"{name}.jpg")
+    if old_blob_id:
+        # Other documents may share the original, so it's only released
+        release_blob(old_blob_id)
+    else:
+        transaction.on_commit(lambda: document.file.storage.delete(old_name))
+
+
+def process_document(document):
+    """Check document's file and record the outcome in processing_status"""
+    # A compressed image's new blob and the document pointing at it are saved together
+    with storing_blobs():
+        try:
+            with document.file.open("rb") as fh:
+                info = document_validator.inspect(fh)
+        except Exception as e:
+            error = " ".join(e.messages) if isinstance(e, ValidationError) else str(e)
+            logger.warning(f"Document {document.pk} failed its checks: {error}")
+            document.processing_status, document.processing_error = Document.PROCESSING_INVALID, error
+        else:
+            document.processing_status, document.processing_error = Document.PROCESSING_READY, ""
+            if info.extension in IMAGE_EXTENSIONS:
+                try:
+                    with storing_blobs():
+                        compress_image(document)
+                except Exception as e:
+                    # Compression only saves space: a valid image it can't handle is kept as uploaded
+                    logger.warning(f"Document {document.pk} kept uncompressed: {e}")
+                    document.refresh_from_db(fields=["file", "original_name", "blob"])
+        document.save(update_fields=["file", "original_name", "blob", "processing_status", "processing_error"])
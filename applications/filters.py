@@ -0,0 +1,30 @@
+# applications/filters.py
+import django_filters
+from django import forms
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+from study_destinations.models import StudyDestination
+
+from .models import Application
+
+SELECT = forms.Select(attrs={"class": "form-select"})
+
+
+class ApplicationFilter(django_filters.FilterSet):
+    """Staff application list filters; each has a (field, submitted_date, id) index behind it"""
+
+    status = django_filters.ChoiceFilter(choices=Application.STATUS_CHOICES, widget=SELECT)
+    destination = django_filters.ModelChoiceFilter(
+        queryset=StudyDestination.objects.only("country_name").order_by("country_name"), widget=SELECT
+    )
+    assigned_staff = django_filters.ModelChoiceFilter(
+        queryset=User.objects.filter(Q(is_staff=True) | Q(staff_profile__isnull=False)).order_by(
+            "first_name", "username"
+        ),
+        widget=SELECT,
+    )
+
+    class Meta:
+        model = Application
+        fields = ["status", "destination", "assigned_staff"]
@@ -1,9 +1,12 @@
+import re
+
 from django import forms
 
 from study_destinations.models import StudyDestination
 from utils.file_handlers import SecureFileHandler
 
-from .models import Application, Document
+from .documents import validate_upload
+from .models import Application, ChunkedUpload, Document
 
 
 class ApplicationForm(forms.ModelForm):
@@ -90,7 +93,27 @@ class ApplicationForm(forms.ModelForm):
         return cleaned_data
 
 
-class ApplicationStatusUpdateForm(forms.ModelForm):
+class StatusTransitionMixin:
+    """Limits and validates the status field to the moves in ALLOWED_TRANSITIONS"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and "status" in self.fields:
+            allowed = {self.instance.status, *self.instance.allowed_statuses()}
+            self.fields["status"].choices = [choice for choice in self.fields["status"].choices if choice[0] in allowed]
+
+    def clean_status(self):
+        status = self.cleaned_data["status"]
+        # self.instance still holds the stored status until the form is saved
+        if self.instance.pk and status != self.instance.status and status not in self.instance.allowed_statuses():
+            raise forms.ValidationError(
+                f"An application can't move from {self.instance.get_status_display()} "
+                f"to {dict(Application.STATUS_CHOICES).get(status, status)}."
+            )
+        return status
+
+
+class ApplicationStatusUpdateForm(StatusTransitionMixin, forms.ModelForm):
     class Meta:
         model = Application
         fields = ["status", "notes", "assigned_staff"]
@@ -114,16 +137,31 @@ class DocumentUploadForm(forms.ModelForm):
         file = self.cleaned_data.get("file")
 
         if file:
-            # Check file size (max 10MB)
-            if file.size > 10 * 1024 * 1024:
-                raise forms.ValidationError("File size must be less than 10MB")
+            validate_upload(file.name, file.size)
 
-            # Check file extension
-            import os
+        return file
 
-            ext = os.path.splitext(file.name)[1].lower()
-            allowed_extensions = [".pdf", ".jpg", ".jpeg", ".png", ".doc", ".docx"]
-            if ext not in allowed_extensions:
-                raise forms.ValidationError(f"File type {ext} not allowed. Allowed: {', '.join(allowed_extensions)}")
 
-        return file
+class ChunkedUploadForm(forms.ModelForm):
+    """Starts a chunked upload: the file is described up front and its bytes follow"""
+
+    class Meta:
+        model = ChunkedUpload
+        fields = ["document_type", "filename", "size", "sha256"]
+
+    def clean_sha256(self):
+        sha256 = self.cleaned_data["sha256"].lower()
+        if sha256 and not re.fullmatch(r"[0-9a-f]{64}", sha256):
+            raise forms.ValidationError("Enter the file's SHA-256 as 64 hex digits")
+        return sha256
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("size") == 0:
+            self.add_error("size", "The file is empty")
+        elif cleaned_data.get("filename") and cleaned_data.get("size") is not None:
+            try:
+                validate_upload(cleaned_data["filename"], cleaned_data["size"])
+            except forms.ValidationError as e:
+                self.add_error(None, e)
+        return cleaned_data
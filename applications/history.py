@@ -0,0 +1,88 @@
+# applications/history.py
+"""
+Queries over ApplicationStatusChange: the timeline of one application, the
+recent transitions made by a staff member, and how long applications spend
+in each status.
+"""
+import datetime
+
+from django.db.models import F, Window
+from django.db.models.functions import Lead
+from django.utils import timezone
+
+from .models import Application, ApplicationStatusChange
+
+STATUS_LABELS = dict(Application.STATUS_CHOICES)
+
+
+def _actor(user):
+    if user is None:
+        return ""
+    return user.get_full_name() or user.username
+
+
+def application_timeline(application, now=None):
+    """Transitions of one application, oldest first, each with how long the status it entered lasted"""
+    now = now or timezone.now()
+    rows = list(application.status_history.select_related("changed_by"))
+    timeline = []
+    for row, following in zip(rows, rows[1:] + [None]):
+        timeline.append(
+            {
+                "from_status": row.from_status,
+                "to_status": row.to_status,
+                "to_status_display": STATUS_LABELS.get(row.to_status, row.to_status),
+                "changed_by": _actor(row.changed_by),
+                "changed_at": row.changed_at,
+                "duration": (following.changed_at if following else now) - row.changed_at,
+                "current": following is None,
+            }
+        )
+    return timeline
+
+
+def staff_timeline(user, since=None, limit=50):
+    """The latest transitions made by user, newest first (an index range read)"""
+    rows = ApplicationStatusChange.objects.filter(changed_by=user)
+    if since is not None:
+        rows = rows.filter(changed_at__gte=since)
+    rows = rows.select_related("application").order_by("-changed_at")[:limit]
+    return [
+        {
+            "application_id": row.application.application_id,
+            "application_pk": row.application_id,
+            "from_status": row.from_status,
+            "to_status": row.to_status,
+            "changed_at": row.changed_at,
+        }
+        for row in rows
+    ]
+
+
+def time_in_status(applications=None, now=None):
+    """
+    {status: {"count", "total", "average"}} over the history of applications
+    (all of them when None). Each row's end is the next row of the same
+    application, read with a window function in a single pass; a status an
+    application is still in counts up to now.
+    """
+    now = now or timezone.now()
+    history = ApplicationStatusChange.objects.all()
+    if applications is not None:
+        history = history.filter(application__in=applications)
+    rows = history.annotate(
+        left_at=Window(
+            Lead("changed_at"),
+            partition_by=[F("application_id")],
+            order_by=[F("changed_at").asc(), F("id").asc()],
+        )
+    ).values_list("to_status", "changed_at", "left_at")
+
+    stats = {}
+    for status, entered, left in rows.iterator():
+        entry = stats.setdefault(status, {"count": 0, "total": datetime.timedelta()})
+        entry["count"] += 1
+        entry["total"] += (left or now) - entered
+    for entry in stats.values():
+        entry["average"] = entry["total"] / entry["count"]
+    return stats
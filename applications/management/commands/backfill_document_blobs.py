@@ -0,0 +1,16 @@
+# applications/management/commands/backfill_document_blobs.py
+from django.core.management.base import BaseCommand
+
+from applications.blobs import backfill_blob
+from applications.models import Document
+
+
+class Command(BaseCommand):
+    help = "Moves documents uploaded before content-addressed storage into shared blobs"
+
+    def handle(self, *args, **options):
+        moved = 0
+        for document in Document.objects.filter(blob__isnull=True).only("pk").iterator():
+            if backfill_blob(document):
+                moved += 1
+        self.stdout.write(f"Moved {moved} documents into blobs")
@@ -0,0 +1,82 @@
+# applications/management/commands/benchmark_document_validation.py
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import magic
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from applications.documents import document_validator
+from utils.file_validators import mime_detector
+
+
+def per_file_checks(path):
+    """The checks as they ran before: a new libmagic handle per file and every PDF page loaded"""
+    with open(path, "rb") as fh:
+        magic.Magic(mime=True).from_buffer(fh.read(1024))
+        if path.endswith(".pdf"):
+            fh.seek(0)
+            len(PdfReader(fh).pages)
+
+
+def pipeline_checks(path):
+    with open(path, "rb") as fh:
+        document_validator.inspect(File(fh))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures document validation over a generated corpus of PDFs and images: the old per-file "
+        "checks versus the single-pass pipeline, in one process and across a process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--files", type=int, default=400)
+        parser.add_argument("--pages", type=int, default=40, help="Pages in each generated PDF")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    def corpus(self, directory, count, pages):
+        writer = PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(595, 842)
+        pdf = BytesIO()
+        writer.write(pdf)
+        image = BytesIO()
+        Image.new("RGB", (1600, 1200), (40, 90, 160)).save(image, format="JPEG")
+
+        paths = []
+        for number in range(count):
+            ext, content = (".pdf", pdf) if number % 2 else (".jpg", image)
+            path = os.path.join(directory, f"document-{number:05d}{ext}")
+            with open(path, "wb") as fh:
+                fh.write(content.getvalue())
+            paths.append(path)
+        return paths
+
+    def run(self, label, check, paths):
+        started = time.perf_counter()
+        check(paths)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<28} {len(paths):>6} files {elapsed:>8.2f}s {len(paths) / elapsed:>9.1f} files/s")
+        return elapsed
+
+    def handle(self, *args, **options):
+        def pooled(paths):
+            with ProcessPoolExecutor(options["workers"], initializer=mime_detector) as pool:
+                list(pool.map(pipeline_checks, paths, chunksize=16))
+
+        directory = tempfile.mkdtemp()
+        try:
+            paths = self.corpus(directory, options["files"], options["pages"])
+            baseline = self.run("per-file checks", lambda paths: list(map(per_file_checks, paths)), paths)
+            self.run("pipeline, one process", lambda paths: list(map(pipeline_checks, paths)), paths)
+            parallel = self.run(f"pipeline, {options['workers']} processes", pooled, paths)
+        finally:
+            shutil.rmtree(directory)
+        self.stdout.write(self.style.SUCCESS(f"The pooled pipeline is {baseline / parallel:.1f}x faster"))
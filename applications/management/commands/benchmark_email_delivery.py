@@ -0,0 +1,71 @@
+# applications/management/commands/benchmark_email_delivery.py
+import time
+
+from django.contrib.auth.models import User
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from applications.models import Application
+from applications.outbox import deliver
+from utils.email_service import EmailService
+from utils.smtp_sink import SMTP_BACKEND, SMTPSink
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures email throughput against a local SMTP sink: a new connection per message "
+        "(as EmailService.send_* does) versus the outbox worker's one connection per batch"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=200)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Seconds the sink waits before greeting each connection, standing in for TCP and TLS setup",
+        )
+
+    def messages(self, count):
+        # Unsaved objects: the benchmark renders real emails without touching the database
+        client = User(first_name="Benchmark", last_name="Client", email="client@example.com")
+        application = Application(client=client, full_name="Benchmark Client", email="client@example.com")
+        messages = []
+        for number in range(count):
+            application.application_id = f"APP-BENCH-{number:04d}"
+            messages.append(EmailService.status_update_message(application, "SUBMITTED", "UNDER_REVIEW"))
+        return messages
+
+    def run(self, label, send, sink, count):
+        before = (len(sink.messages), sink.connections)
+        started = time.perf_counter()
+        send(self.messages(count), sink)
+        elapsed = time.perf_counter() - started
+        delivered, connections = len(sink.messages) - before[0], sink.connections - before[1]
+        self.stdout.write(
+            f"{label:<24} {delivered:>6} sent {connections:>6} connections "
+            f"{elapsed:>8.2f}s {delivered / elapsed:>9.1f} msg/s"
+        )
+        return elapsed
+
+    def handle(self, *args, **options):
+        def connection(sink):
+            return get_connection(SMTP_BACKEND, host=sink.host, port=sink.port, use_tls=False, fail_silently=False)
+
+        def per_message(messages, sink):
+            for message in messages:
+                message.connection = connection(sink)
+                message.send()
+
+        def batched(messages, sink):
+            shared = connection(sink)
+            for _message, error in deliver(messages, shared):
+                if error:
+                    raise error
+            shared.close()
+
+        count = options["messages"]
+        with SMTPSink(connect_delay=options["latency"]) as sink:
+            baseline = self.run("connection per message", per_message, sink, count)
+            pooled = self.run("one connection per batch", batched, sink, count)
+        self.stdout.write(self.style.SUCCESS(f"Batched delivery is {baseline / pooled:.1f}x faster"))
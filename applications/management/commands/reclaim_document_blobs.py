@@ -0,0 +1,26 @@
+# applications/management/commands/reclaim_document_blobs.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from applications.blobs import reclaim_blobs
+
+
+class Command(BaseCommand):
+    help = "Deletes stored document files that no document references any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting it")
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=settings.DOCUMENT_BLOB_GRACE.total_seconds() / 3600,
+            help="Keep unreferenced files younger than this",
+        )
+
+    def handle(self, *args, **options):
+        count, size = reclaim_blobs(timedelta(hours=options["grace_hours"]), dry_run=options["dry_run"])
+        verb = "Would reclaim" if options["dry_run"] else "Reclaimed"
+        self.stdout.write(f"{verb} {count} files, {filesizeformat(size)}")
@@ -0,0 +1,24 @@
+# applications/management/commands/revalidate_documents.py
+import os
+
+from django.core.management.base import BaseCommand
+
+from applications.documents import revalidate_documents
+from applications.models import Document
+
+
+class Command(BaseCommand):
+    help = "Checks stored documents again, e.g. after the validation rules change"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1, help="Processes checking files in parallel"
+        )
+        parser.add_argument("--application", help="Only this application's documents, by application id")
+
+    def handle(self, *args, **options):
+        documents = Document.objects.all()
+        if options["application"]:
+            documents = documents.filter(application__application_id=options["application"])
+        checked, invalid = revalidate_documents(documents, workers=options["workers"])
+        self.stdout.write(f"Checked {checked} documents, {invalid} newly invalid")
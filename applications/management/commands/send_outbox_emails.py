@@ -0,0 +1,30 @@
+# applications/management/commands/send_outbox_emails.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from applications.outbox import send_due_emails_pooled
+
+
+class Command(BaseCommand):
+    help = "Sends emails queued in the outbox; run from cron, or as a worker with --loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Emails sent per SMTP connection")
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Threads sending in parallel, each over its own connection"
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox instead of exiting")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds between polls of an empty outbox")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent, failed = send_due_emails_pooled(options["workers"], limit=options["batch_size"])
+            if sent or failed or not options["loop"]:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed")
+            if not options["loop"]:
+                return
+            if sent + failed < options["batch_size"] * options["workers"]:
+                time.sleep(options["interval"])
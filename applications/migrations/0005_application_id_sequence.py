@@ -0,0 +1,39 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:59
+
+import re
+
+from django.db import migrations, models
+
+APPLICATION_ID_RE = re.compile(r"^APP-(\d{6})-(\d+)$")
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each month's sequence after the highest randomly drawn number already issued"""
+    Application = apps.get_model("applications", "Application")
+    ApplicationIdSequence = apps.get_model("applications", "ApplicationIdSequence")
+    highest = {}
+    for application_id in Application.objects.values_list("application_id", flat=True).iterator():
+        match = APPLICATION_ID_RE.match(application_id)
+        if match:
+            period, number = match.group(1), int(match.group(2))
+            highest[period] = max(highest.get(period, 0), number)
+    ApplicationIdSequence.objects.bulk_create(
+        [ApplicationIdSequence(period=period, last_value=value) for period, value in highest.items()]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0004_remove_application_amount_paid_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationIdSequence",
+            fields=[
+                ("period", models.CharField(help_text="YYYYMM", max_length=6, primary_key=True, serialize=False)),
+                ("last_value", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
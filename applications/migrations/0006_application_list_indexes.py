@@ -0,0 +1,32 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0005_application_id_sequence"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(fields=["-submitted_date", "-id"], name="application_submitted_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(fields=["client", "-submitted_date", "-id"], name="application_client_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(fields=["status", "-submitted_date", "-id"], name="application_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(fields=["destination", "-submitted_date", "-id"], name="application_destination_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(fields=["assigned_staff", "-submitted_date", "-id"], name="application_staff_idx"),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0006_application_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(fields=["assigned_staff", "status", "last_updated"], name="application_queue_idx"),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_history(apps, schema_editor):
+    """
+    Start each existing application's history with its submission and, if it
+    has moved on since, one transition to its current status at last_updated
+    """
+    Application = apps.get_model("applications", "Application")
+    ApplicationStatusChange = apps.get_model("applications", "ApplicationStatusChange")
+    batch = []
+    for application in Application.objects.only("status", "submitted_date", "last_updated").iterator():
+        batch.append(
+            ApplicationStatusChange(
+                application=application, from_status="", to_status="SUBMITTED", changed_at=application.submitted_date
+            )
+        )
+        if application.status != "SUBMITTED":
+            batch.append(
+                ApplicationStatusChange(
+                    application=application,
+                    from_status="SUBMITTED",
+                    to_status=application.status,
+                    changed_at=application.last_updated,
+                )
+            )
+        if len(batch) >= 1000:
+            ApplicationStatusChange.objects.bulk_create(batch)
+            batch = []
+    ApplicationStatusChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("applications", "0007_application_queue_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStatusChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "from_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("SUBMITTED", "Submitted"),
+                            ("UNDER_REVIEW", "Under Review"),
+                            ("DOCS_REQUIRED", "Additional Documents Required"),
+                            ("PROCESSING", "Processing"),
+                            ("APPROVED", "Approved"),
+                            ("REJECTED", "Rejected"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "to_status",
+                    models.CharField(
+                        choices=[
+                            ("SUBMITTED", "Submitted"),
+                            ("UNDER_REVIEW", "Under Review"),
+                            ("DOCS_REQUIRED", "Additional Documents Required"),
+                            ("PROCESSING", "Processing"),
+                            ("APPROVED", "Approved"),
+                            ("REJECTED", "Rejected"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_history",
+                        to="applications.application",
+                    ),
+                ),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="application_status_changes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["changed_at", "id"],
+                "indexes": [
+                    models.Index(fields=["application", "changed_at"], name="status_change_application_idx"),
+                    models.Index(fields=["changed_by", "-changed_at"], name="status_change_staff_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_history, migrations.RunPython.noop),
+    ]
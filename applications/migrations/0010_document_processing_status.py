@@ -0,0 +1,36 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0009_email_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="processing_error",
+            field=models.TextField(blank=True),
+        ),
+        # Documents uploaded before the checks existed count as ready
+        migrations.AddField(
+            model_name="document",
+            name="processing_status",
+            field=models.CharField(
+                choices=[("PENDING", "Checking"), ("READY", "Ready"), ("INVALID", "Rejected")],
+                default="READY",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="document",
+            name="processing_status",
+            field=models.CharField(
+                choices=[("PENDING", "Checking"), ("READY", "Ready"), ("INVALID", "Rejected")],
+                default="PENDING",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:24
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("applications", "0010_document_processing_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="sha256",
+            field=models.CharField(blank=True, help_text="SHA-256 of the file as uploaded", max_length=64),
+        ),
+        migrations.CreateModel(
+            name="ChunkedUpload",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                (
+                    "document_type",
+                    models.CharField(
+                        choices=[
+                            ("PASSPORT", "Passport"),
+                            ("PHOTO", "Photograph"),
+                            ("BANK_STATEMENT", "Bank Statement"),
+                            ("EMPLOYMENT_LETTER", "Employment Letter"),
+                            ("INVITATION_LETTER", "Invitation Letter"),
+                            ("EDUCATION_CERTIFICATE", "Education Certificate"),
+                            ("TRANSCRIPT", "Academic Transcript"),
+                            ("ENGLISH_TEST", "English Test Result"),
+                            ("POLICE_CLEARANCE", "Police Clearance"),
+                            ("MEDICAL_REPORT", "Medical Report"),
+                            ("OTHER", "Other"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255)),
+                ("size", models.PositiveBigIntegerField()),
+                ("offset", models.PositiveBigIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "application",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunked_uploads",
+                        to="applications.application",
+                    ),
+                ),
+                (
+                    "document",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="chunked_upload",
+                        to="applications.document",
+                    ),
+                ),
+                (
+                    "uploaded_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunked_uploads",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0011_chunked_uploads"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentBlob",
+            fields=[
+                ("sha256", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("file", models.FileField(max_length=255, upload_to="document_blobs/")),
+                ("size", models.PositiveBigIntegerField()),
+                ("ref_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="chunkedupload",
+            name="sha256",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(fields=["sha256"], name="document_sha256_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="documentblob",
+            index=models.Index(fields=["ref_count", "created_at"], name="document_blob_refs_idx"),
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="documents",
+                to="applications.documentblob",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:49
+
+import os
+
+from django.db import migrations, models
+
+
+def name_existing_documents(apps, schema_editor):
+    # Files uploaded before blobs existed still carry their (sanitised) upload name
+    Document = apps.get_model("applications", "Document")
+    for document in Document.objects.filter(original_name="").only("pk", "file").iterator():
+        Document.objects.filter(pk=document.pk).update(original_name=os.path.basename(document.file.name)[-255:])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0012_document_blobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="original_name",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunPython(name_existing_documents, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,59 @@
+import uuid
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 
 from study_destinations.models import StudyDestination
 
+APPLICATION_ID_PREFIX = "APP"
+
+# Application statuses still waiting on staff; the others are decisions
+OPEN_STATUSES = ["SUBMITTED", "UNDER_REVIEW", "DOCS_REQUIRED", "PROCESSING"]
+
+# status -> statuses staff may move an application to from it
+ALLOWED_TRANSITIONS = {
+    "SUBMITTED": ["UNDER_REVIEW", "DOCS_REQUIRED", "REJECTED"],
+    "UNDER_REVIEW": ["DOCS_REQUIRED", "PROCESSING", "APPROVED", "REJECTED"],
+    "DOCS_REQUIRED": ["UNDER_REVIEW", "PROCESSING", "REJECTED"],
+    "PROCESSING": ["DOCS_REQUIRED", "APPROVED", "REJECTED"],
+    "APPROVED": [],
+    # A refused application can be reopened, e.g. on appeal
+    "REJECTED": ["UNDER_REVIEW"],
+}
+
+
+class ApplicationIdSequence(models.Model):
+    """
+    Last application number handed out in each month. Numbers come from an
+    atomic increment of the month's row, so concurrent submissions never
+    draw the same one.
+    """
+
+    period = models.CharField(max_length=6, primary_key=True, help_text="YYYYMM")
+    last_value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.period}: {self.last_value}"
+
+    @classmethod
+    def next_value(cls, period):
+        with transaction.atomic():
+            # The UPDATE locks the row until commit, so the value read back is ours alone
+            if not cls.objects.filter(period=period).update(last_value=F("last_value") + 1):
+                # First number of the month; get_or_create copes with a concurrent creator
+                cls.objects.get_or_create(period=period)
+                cls.objects.filter(period=period).update(last_value=F("last_value") + 1)
+            return cls.objects.filter(period=period).values_list("last_value", flat=True).get()
+
+
+def next_application_id(when=None):
+    """APP-YYYYMM-NNNN, numbered per month from 0001 (more digits once past 9999)"""
+    period = timezone.localtime(when).strftime("%Y%m")
+    return f"{APPLICATION_ID_PREFIX}-{period}-{ApplicationIdSequence.next_value(period):04d}"
+
 
 class Application(models.Model):
     STATUS_CHOICES = [
@@ -75,22 +126,84 @@ class Application(models.Model):
     notes = models.TextField(blank=True)
     rejection_reason = models.TextField(blank=True)
 
+    # Status as loaded from the database, to detect transitions on save
+    _loaded_status = None
+    # Set by views before saving a status change so history records who made it
+    changed_by = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "status" in field_names:
+            instance._loaded_status = values[field_names.index("status")]
+        return instance
+
+    def allowed_statuses(self):
+        """Statuses this application can move to from the one it was loaded with"""
+        current = self._loaded_status or self.status
+        return ALLOWED_TRANSITIONS.get(current, [])
+
+    def transition_to(self, status, by=None):
+        """Move to status if ALLOWED_TRANSITIONS permits it; the change is recorded in status_history"""
+        if status not in self.allowed_statuses():
+            current = self._loaded_status or self.status
+            raise ValidationError(
+                {"status": f"Can't move an application from {current} to {status}"}, code="invalid_transition"
+            )
+        self.status = status
+        self.changed_by = by
+        self.save(update_fields=["status", "last_updated"])
+
     def save(self, *args, **kwargs):
         if not self.application_id:
-            import random
-            from datetime import datetime
+            self.application_id = next_application_id()
 
-            prefix = "APP"
-            year_month = datetime.now().strftime("%Y%m")
-            random_num = random.randint(1000, 9999)
-            self.application_id = f"{prefix}-{year_month}-{random_num}"
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        tracked = adding or update_fields is None or "status" in update_fields
+        with transaction.atomic():
+            previous = None
+            if tracked and not adding:
+                # Lock the row before writing it, checking the status is still the
+                # one loaded; if another save changed it since, read it under the lock
+                row = Application.objects.filter(pk=self.pk)
+                previous = self._loaded_status
+                if previous is None or not row.filter(status=previous).update(status=previous):
+                    previous = row.select_for_update().values_list("status", flat=True).first()
+            super().save(*args, **kwargs)
+            if tracked and (adding or previous != self.status):
+                # Written in the row's transaction, so history never disagrees with the status
+                ApplicationStatusChange.objects.create(
+                    application=self,
+                    from_status="" if adding else previous or "",
+                    to_status=self.status,
+                    changed_by=self.changed_by,
+                )
+                # The client is emailed by the outbox worker, outside the request, once this commits
+                OutboxEmail.objects.create(
+                    application=self,
+                    kind=OutboxEmail.APPLICATION_SUBMITTED if adding else OutboxEmail.STATUS_UPDATED,
+                    payload={} if adding else {"old_status": previous or "", "new_status": self.status},
+                )
+        self._loaded_status = self.status
+        self.changed_by = None
 
     def __str__(self):
         return f"{self.application_id} - {self.full_name or self.client.get_full_name()}"
 
     class Meta:
         ordering = ["-submitted_date"]
+        # Keyset pagination of the application lists walks (submitted_date, id),
+        # after an equality filter on one of the leading columns
+        indexes = [
+            models.Index(fields=["-submitted_date", "-id"], name="application_submitted_idx"),
+            models.Index(fields=["client", "-submitted_date", "-id"], name="application_client_idx"),
+            models.Index(fields=["status", "-submitted_date", "-id"], name="application_status_idx"),
+            models.Index(fields=["destination", "-submitted_date", "-id"], name="application_destination_idx"),
+            models.Index(fields=["assigned_staff", "-submitted_date", "-id"], name="application_staff_idx"),
+            # Staff work queues: one range per open status, and the bucket counts read only the index
+            models.Index(fields=["assigned_staff", "status", "last_updated"], name="application_queue_idx"),
+        ]
 
     @property
     def progress_percentage(self):
@@ -105,6 +218,107 @@ class Application(models.Model):
         return status_progress.get(self.status, 0)
 
 
+class ApplicationStatusChange(models.Model):
+    """
+    Append-only history of status transitions. The first row of an
+    application has an empty from_status and marks its submission.
+    """
+
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name="status_history")
+    from_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="application_status_changes"
+    )
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["changed_at", "id"]
+        indexes = [
+            models.Index(fields=["application", "changed_at"], name="status_change_application_idx"),
+            models.Index(fields=["changed_by", "-changed_at"], name="status_change_staff_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status or '-'} -> {self.to_status}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Status history is append-only")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Status history is append-only")
+
+
+class OutboxEmail(models.Model):
+    """
+    Emails to the client, written in the same transaction as the change
+    they announce and sent later by the send_outbox_emails command. A row
+    exists if and only if its change committed, and sending never holds up
+    a request.
+    """
+
+    APPLICATION_SUBMITTED = "application_submitted"
+    STATUS_UPDATED = "status_updated"
+    KIND_CHOICES = [
+        (APPLICATION_SUBMITTED, "Application submitted"),
+        (STATUS_UPDATED, "Status updated"),
+    ]
+
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+    STATE_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name="outbox_emails")
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict, blank=True)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Earliest time the row may be picked up: retry backoff while pending,
+    # the end of a worker's claim while sending
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["state", "available_at"], name="outbox_email_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.application_id} ({self.state})"
+
+
+class DocumentBlob(models.Model):
+    """
+    Stored file contents, named by their SHA-256 and shared by every Document
+    with the same bytes. ref_count tracks those documents; blobs it drops to
+    zero for are deleted by the reclaim_document_blobs command.
+    """
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(upload_to="document_blobs/", max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["ref_count", "created_at"], name="document_blob_refs_idx")]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
 class Document(models.Model):
     DOCUMENT_TYPES = [
         ("PASSPORT", "Passport"),
@@ -120,12 +334,63 @@ class Document(models.Model):
         ("OTHER", "Other"),
     ]
 
+    # Uploads are checked (and images compressed) by a background task
+    PROCESSING_PENDING = "PENDING"
+    PROCESSING_READY = "READY"
+    PROCESSING_INVALID = "INVALID"
+    PROCESSING_CHOICES = [
+        (PROCESSING_PENDING, "Checking"),
+        (PROCESSING_READY, "Ready"),
+        (PROCESSING_INVALID, "Rejected"),
+    ]
+
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name="documents")
     document_type = models.CharField(max_length=50, choices=DOCUMENT_TYPES)
     file = models.FileField(upload_to="application_documents/")
+    # The name it was uploaded with; stored files are named by their content
+    original_name = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     verified = models.BooleanField(default=False)
     verification_notes = models.TextField(blank=True)
+    processing_status = models.CharField(max_length=10, choices=PROCESSING_CHOICES, default=PROCESSING_PENDING)
+    processing_error = models.TextField(blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the file as uploaded")
+    # Where file's contents are stored; empty for files uploaded before blobs existed
+    blob = models.ForeignKey(DocumentBlob, on_delete=models.PROTECT, null=True, blank=True, related_name="documents")
+
+    class Meta:
+        indexes = [models.Index(fields=["sha256"], name="document_sha256_idx")]
 
     def __str__(self):
         return f"{self.get_document_type_display()} - {self.application.application_id}"
+
+
+class ChunkedUpload(models.Model):
+    """
+    A document upload sent in pieces. Chunks are appended to a part file
+    under CHUNKED_UPLOAD_ROOT, and offset counts the bytes acknowledged so
+    far, which is where an interrupted upload resumes. Once offset reaches
+    size the part file becomes the document's file.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name="chunked_uploads")
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chunked_uploads")
+    document_type = models.CharField(max_length=50, choices=Document.DOCUMENT_TYPES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    # SHA-256 the client says the file has; checked against the bytes received
+    sha256 = models.CharField(max_length=64, blank=True)
+    offset = models.PositiveBigIntegerField(default=0)
+    document = models.OneToOneField(
+        Document, on_delete=models.SET_NULL, null=True, blank=True, related_name="chunked_upload"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def complete(self):
+        return self.document_id is not None
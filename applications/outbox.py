@@ -0,0 +1,201 @@
+# applications/outbox.py
+"""
+Delivery of OutboxEmail rows.
+
+Workers claim due rows one at a time with a conditional UPDATE, so several
+can drain the outbox side by side without sending anything twice. A claim
+lasts CLAIM_TIMEOUT: rows left SENDING by a worker that died are picked up
+again once it runs out. Each batch goes out over a single SMTP connection
+rather than one handshake per message.
+"""
+import datetime
+import logging
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+
+from django import db
+from django.conf import settings
+from django.core import mail
+from django.db.models import F
+from django.utils import timezone
+
+from utils.email_service import EmailService
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+CLAIM_TIMEOUT = datetime.timedelta(minutes=5)
+
+
+def build_message(email):
+    """The EmailMessage an outbox row stands for"""
+    application = email.application
+    if email.kind == OutboxEmail.APPLICATION_SUBMITTED:
+        return EmailService.application_submitted_message(application)
+    if email.kind == OutboxEmail.STATUS_UPDATED:
+        return EmailService.status_update_message(
+            application, email.payload.get("old_status"), email.payload.get("new_status")
+        )
+    raise ValueError(f"Unknown outbox email kind {email.kind!r}")
+
+
+def due_emails(now=None, limit=100, shard=None):
+    """Rows waiting to be sent: pending ones past their backoff, and abandoned claims"""
+    now = now or timezone.now()
+    emails = OutboxEmail.objects.filter(
+        state__in=[OutboxEmail.PENDING, OutboxEmail.SENDING], available_at__lte=now
+    ).select_related("application__client", "application__destination")
+    if shard is not None:
+        index, count = shard
+        emails = emails.annotate(shard=F("id") % count).filter(shard=index)
+    return emails.order_by("available_at", "id")[:limit]
+
+
+def claim(email, now):
+    """Mark email as being sent by this worker; False if another worker got there first"""
+    claimed = OutboxEmail.objects.filter(pk=email.pk, state=email.state, available_at=email.available_at).update(
+        state=OutboxEmail.SENDING, available_at=now + CLAIM_TIMEOUT, attempts=F("attempts") + 1
+    )
+    email.attempts += 1
+    return bool(claimed)
+
+
+def retry_delay(attempts):
+    return datetime.timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def is_permanent(error):
+    """
+    Whether resending can't help: the server refused the message with a 5xx
+    reply. Connection problems, 4xx replies and failed logins (a settings
+    problem, not the message's) are retried.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _message in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+def mark_sent(emails):
+    OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        state=OutboxEmail.SENT, sent_at=timezone.now(), last_error=""
+    )
+
+
+def mark_failed(email, error):
+    """Schedule a retry with backoff, or give up on permanent errors and after EMAIL_OUTBOX_MAX_ATTEMPTS"""
+    if is_permanent(error) or email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        state, available_at = OutboxEmail.FAILED, timezone.now()
+        logger.error(f"Giving up on outbox email {email.pk} after {email.attempts} attempts: {error}")
+    else:
+        state, available_at = OutboxEmail.PENDING, timezone.now() + retry_delay(email.attempts)
+        logger.warning(f"Outbox email {email.pk} failed, retrying at {available_at:%H:%M:%S}: {error}")
+    OutboxEmail.objects.filter(pk=email.pk).update(state=state, available_at=available_at, last_error=str(error))
+
+
+def _dropped(error):
+    """The server closed the session (421, or a connection found dead) rather than refusing the message"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == 421
+
+
+def _send_one(message, connection):
+    """Send message, reconnecting once if the server dropped the session. Returns the error or None."""
+    for attempt in range(2):
+        try:
+            # No-op while the connection is up
+            connection.open()
+            if not connection.send_messages([message]):
+                return ValueError("No recipients")
+            return None
+        except Exception as e:
+            if not _dropped(e) or attempt:
+                return e
+            connection.close()
+
+
+def deliver(messages, connection):
+    """
+    Send messages over one connection, yielding (message, error) for each,
+    error being None once the server has accepted it. Servers that cap
+    messages per session get reconnected to mid-batch; if the connection
+    can't be opened at all, the rest of the batch fails without waiting on
+    it again.
+    """
+    messages = iter(messages)
+    for message in messages:
+        error = _send_one(message, connection)
+        yield message, error
+        if isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException):
+            connection.close()
+            try:
+                connection.open()
+            except Exception:
+                for rest in messages:
+                    yield rest, error
+                return
+
+
+def get_connection():
+    return mail.get_connection(fail_silently=False, timeout=settings.EMAIL_TIMEOUT)
+
+
+def send_due_emails(limit=100, connection=None, shard=None):
+    """
+    Send up to limit due emails over one reused SMTP connection. Returns
+    (sent, failed) counts; transient failures are retried by later runs.
+    With shard=(index, count) only rows whose id falls in that shard are
+    taken, so pooled workers don't compete for the same rows.
+    """
+    now = timezone.now()
+    emails = due_emails(now, limit, shard)
+    claimed = [email for email in emails if claim(email, now)]
+    if not claimed:
+        return 0, 0
+
+    messages, failed = [], 0
+    for email in claimed:
+        try:
+            message = build_message(email)
+        except Exception as e:
+            mark_failed(email, e)
+            failed += 1
+            continue
+        message.outbox_email = email
+        messages.append(message)
+
+    sent = []
+    connection = connection or get_connection()
+    try:
+        for message, error in deliver(messages, connection):
+            if error is None:
+                sent.append(message.outbox_email)
+            else:
+                mark_failed(message.outbox_email, error)
+                failed += 1
+    finally:
+        connection.close()
+        # Sent rows are marked together; a crash before this resends them once the claim lapses
+        mark_sent(sent)
+    return len(sent), failed
+
+
+def _pool_worker(limit, shard):
+    try:
+        return send_due_emails(limit, shard=shard)
+    finally:
+        db.connection.close()
+
+
+def send_due_emails_pooled(workers=1, limit=100):
+    """send_due_emails in workers threads, each with its own SMTP connection and shard of the outbox"""
+    if workers <= 1:
+        return send_due_emails(limit)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_pool_worker, [limit] * workers, [(index, workers) for index in range(workers)]))
+    return sum(sent for sent, _failed in results), sum(failed for _sent, failed in results)
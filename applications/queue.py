@@ -0,0 +1,89 @@
+# applications/queue.py
+"""
+Staff work queue: a staff member's open applications, oldest first, in
+buckets by how long they have sat since their last update.
+"""
+import datetime
+
+from django.db.models import Case, CharField, Count, Q, Value, When
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import OPEN_STATUSES, Application
+
+# (key, label, minimum age in days, maximum age in days or None)
+AGE_BUCKETS = [
+    ("under_2_days", "Under 2 days", 0, 2),
+    ("2_to_7_days", "2-7 days", 2, 7),
+    ("7_to_30_days", "7-30 days", 7, 30),
+    ("over_30_days", "Over 30 days", 30, None),
+]
+
+
+def open_cases(staff):
+    # Served by application_queue_idx (assigned_staff, status, last_updated)
+    return Application.objects.filter(assigned_staff=staff, status__in=OPEN_STATUSES)
+
+
+def _bucket_range(now, min_days, max_days):
+    """last_updated filter for cases aged [min_days, max_days)"""
+    condition = Q()
+    if min_days:
+        condition &= Q(last_updated__lte=now - datetime.timedelta(days=min_days))
+    if max_days is not None:
+        condition &= Q(last_updated__gt=now - datetime.timedelta(days=max_days))
+    return condition
+
+
+def bucket_counts(staff, now):
+    """{bucket key: open cases} in one grouped query"""
+    bucket = Case(
+        *[When(_bucket_range(now, low, high), then=Value(key)) for key, _label, low, high in AGE_BUCKETS],
+        output_field=CharField(),
+    )
+    rows = open_cases(staff).annotate(bucket=bucket).values("bucket").annotate(count=Count("id")).order_by()
+    counts = dict.fromkeys([key for key, *_ in AGE_BUCKETS], 0)
+    counts.update({row["bucket"]: row["count"] for row in rows})
+    return counts
+
+
+def work_queue(staff, limit=10, now=None):
+    """
+    Bucket counts plus the `limit` oldest cases of each bucket. Each list is
+    one range read on the queue index, so polling costs five small queries.
+    """
+    now = now or timezone.now()
+    counts = bucket_counts(staff, now)
+    buckets = []
+    for key, label, low, high in AGE_BUCKETS:
+        cases = []
+        if counts[key]:
+            rows = (
+                open_cases(staff)
+                .filter(_bucket_range(now, low, high))
+                .select_related("destination")
+                .only(
+                    "application_id",
+                    "full_name",
+                    "status",
+                    "destination_country",
+                    "destination__country_name",
+                    "last_updated",
+                )
+                .order_by("last_updated", "id")[:limit]
+            )
+            cases = [
+                {
+                    "application_id": app.application_id,
+                    "full_name": app.full_name,
+                    "status": app.status,
+                    "status_display": app.get_status_display(),
+                    "destination": app.destination.country_name if app.destination else app.destination_country,
+                    "last_updated": app.last_updated,
+                    "age_days": (now - app.last_updated).days,
+                    "url": reverse("dashboard:application_detail", kwargs={"pk": app.pk}),
+                }
+                for app in rows
+            ]
+        buckets.append({"key": key, "label": label, "count": counts[key], "cases": cases})
+    return {"generated_at": now, "total": sum(counts.values()), "buckets": buckets}
@@ -0,0 +1,12 @@
+# applications/signals.py
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .blobs import release_blob
+from .models import Document
+
+
+@receiver(post_delete, sender=Document)
+def document_deleted(sender, instance, **kwargs):
+    """Also runs for documents deleted along with their application"""
+    release_blob(instance.blob_id)
@@ -0,0 +1,37 @@
+# applications/tasks.py
+from celery import shared_task
+from django.conf import settings
+
+from .blobs import reclaim_blobs
+from .documents import process_document
+from .models import Document
+from .outbox import send_due_emails
+
+
+@shared_task(ignore_result=True)
+def send_outbox_emails(limit=100):
+    """Scheduled by CELERY_BEAT_SCHEDULE; rows that fail stay queued for a later run"""
+    send_due_emails(limit)
+
+
+@shared_task(ignore_result=True)
+def check_document(document_id):
+    document = Document.objects.filter(pk=document_id).first()
+    # Gone if the application was deleted before the task ran
+    if document is not None:
+        process_document(document)
+
+
+@shared_task(ignore_result=True)
+def discard_expired_uploads():
+    """Scheduled by CELERY_BEAT_SCHEDULE: drops chunked uploads abandoned part way"""
+    from .uploads import discard_upload, expired_uploads
+
+    for upload in expired_uploads().iterator():
+        discard_upload(upload)
+
+
+@shared_task(ignore_result=True)
+def reclaim_document_blobs():
+    """Scheduled by CELERY_BEAT_SCHEDULE: deletes files no document uses any more"""
+    reclaim_blobs(settings.DOCUMENT_BLOB_GRACE)
@@ -0,0 +1,214 @@
+# applications/uploads.py
+"""
+Resumable, chunked document uploads.
+
+A client starts an upload by declaring the file's name and size, then sends
+the bytes in order as raw PATCH bodies, each tagged with the offset it starts
+at. Chunks are streamed to a part file in CHUNK_READ_SIZE blocks, so memory
+use doesn't grow with the file or chunk size. If a connection drops, the
+client asks for the acknowledged offset and carries on from there.
+
+The SHA-256 is computed as chunks arrive. Hash state can't be stored in the
+database, so each process keeps it in memory per upload; a process that
+hasn't seen the earlier chunks (a restart, another worker) hashes the part
+file once to catch up.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .blobs import attach_blob, reference_blob, reusable_document, store_document_file, storing_blobs
+from .documents import validate_upload
+from .models import ChunkedUpload, Document
+from .tasks import check_document
+
+CHUNK_READ_SIZE = 64 * 1024
+# Uploads whose hash state each process keeps
+HASHER_CACHE_SIZE = 256
+
+
+class UploadError(Exception):
+    """A chunk that can't be accepted; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        self.status = status
+        super().__init__(message)
+
+
+class _PartFile(File):
+    """Lets FileSystemStorage move a finished part file into place instead of copying it"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+def part_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_ROOT, f"{upload.pk}.part")
+
+
+def _hasher_at(upload, offset):
+    """SHA-256 state over the first offset bytes of the upload"""
+    with _hashers_lock:
+        cached = _hashers.get(upload.pk)
+    if cached and cached[0] == offset:
+        return cached[1].copy()
+    hasher = hashlib.sha256()
+    remaining = offset
+    with open(part_path(upload), "rb") as fh:
+        while remaining:
+            block = fh.read(min(CHUNK_READ_SIZE, remaining))
+            if not block:
+                raise UploadError("The stored part of this upload is missing data", status=409)
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _remember_hasher(upload, offset, hasher):
+    with _hashers_lock:
+        _hashers[upload.pk] = (offset, hasher)
+        _hashers.move_to_end(upload.pk)
+        while len(_hashers) > HASHER_CACHE_SIZE:
+            _hashers.popitem(last=False)
+
+
+def _forget_hasher(upload):
+    with _hashers_lock:
+        _hashers.pop(upload.pk, None)
+
+
+def start_upload(application, user, document_type, filename, size, sha256=""):
+    """
+    Open an upload; the name and declared size are checked by ChunkedUploadForm
+    first. If the client already has a checked document with the declared
+    sha256, the upload completes at once and no bytes need to be sent.
+    """
+    upload = ChunkedUpload(
+        application=application,
+        uploaded_by=user,
+        document_type=document_type,
+        filename=os.path.basename(filename),
+        size=size,
+        sha256=sha256,
+    )
+    existing = reusable_document(application.client, sha256)
+    if existing is not None:
+        with transaction.atomic():
+            # Missing if the earlier document's checks replaced these bytes and they were reclaimed since
+            blob = reference_blob(sha256, size=size)
+            if blob is not None:
+                document = Document(application=application, document_type=document_type, sha256=sha256)
+                attach_blob(document, blob, upload.filename)
+                if existing.blob_id == blob.pk:
+                    # Checked already, and kept as they were
+                    document.processing_status = Document.PROCESSING_READY
+                else:
+                    # Checks turned them into something else, e.g. a compressed image: do that again
+                    transaction.on_commit(lambda: check_document.delay(document.pk))
+                document.save()
+                upload.offset, upload.document = size, document
+                upload.save()
+                return upload
+
+    upload.save()
+    os.makedirs(settings.CHUNKED_UPLOAD_ROOT, exist_ok=True)
+    open(part_path(upload), "wb").close()
+    return upload
+
+
+def write_chunk(upload, offset, length, stream):
+    """
+    Append length bytes read from stream at offset, which must be the
+    acknowledged offset. Returns the new offset; the upload is completed
+    once the last byte is in.
+    """
+    if upload.complete:
+        raise UploadError("This upload is already complete", status=409)
+    if offset != upload.offset:
+        raise UploadError(f"Expected offset {upload.offset}", status=409)
+    if length <= 0 or length > settings.CHUNKED_UPLOAD_MAX_CHUNK:
+        raise UploadError(f"Chunks must be 1 to {settings.CHUNKED_UPLOAD_MAX_CHUNK} bytes")
+    if offset + length > upload.size:
+        raise UploadError("Chunk runs past the declared file size")
+
+    hasher = _hasher_at(upload, offset)
+    remaining = length
+    with open(part_path(upload), "r+b") as fh:
+        fh.seek(offset)
+        while remaining:
+            block = stream.read(min(CHUNK_READ_SIZE, remaining))
+            if not block:
+                # The connection dropped mid-chunk: nothing past offset is acknowledged
+                raise UploadError("Chunk ended early")
+            fh.write(block)
+            hasher.update(block)
+            remaining -= len(block)
+
+    # Two requests racing with the same chunk: only the first one counts
+    if not ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=F("offset") + length, updated_at=timezone.now()
+    ):
+        raise UploadError("Another request already sent this chunk", status=409)
+    upload.offset = offset + length
+    if upload.offset < upload.size:
+        _remember_hasher(upload, upload.offset, hasher)
+        return upload.offset
+    complete_upload(upload, hasher.hexdigest())
+    return upload.offset
+
+
+def complete_upload(upload, sha256):
+    """Validate the assembled file and move it into place as the upload's Document"""
+    _forget_hasher(upload)
+    path = part_path(upload)
+    with open(path, "rb+") as fh:
+        # Bytes of an earlier, abandoned attempt at the last chunk may trail the file
+        fh.truncate(upload.size)
+    validate_upload(upload.filename, os.path.getsize(path))
+    if upload.sha256 and upload.sha256 != sha256:
+        raise ValidationError("The file received doesn't match the one the upload was started for")
+
+    with storing_blobs():
+        document = Document(
+            application=upload.application,
+            document_type=upload.document_type,
+            sha256=sha256,
+        )
+        with open(path, "rb") as fh:
+            # Moved into place when the bytes are new, dropped when a blob has them already
+            store_document_file(document, _PartFile(fh), upload.filename, sha256)
+        if os.path.exists(path):
+            os.remove(path)
+        document.save()
+        upload.document = document
+        upload.save(update_fields=["document", "updated_at"])
+        transaction.on_commit(lambda: check_document.delay(document.pk))
+    return document
+
+
+def expired_uploads():
+    """Uploads nobody has added to for CHUNKED_UPLOAD_EXPIRY"""
+    return ChunkedUpload.objects.filter(
+        document__isnull=True, updated_at__lt=timezone.now() - settings.CHUNKED_UPLOAD_EXPIRY
+    )
+
+
+def discard_upload(upload):
+    _forget_hasher(upload)
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
@@ -7,6 +7,7 @@ app_name = "dashboard"
 
 urlpatterns = [
     path("applications/", views.ApplicationListView.as_view(), name="application_list"),
+    path("queue/", views.WorkQueueView.as_view(), name="work_queue"),
     path(
         "applications/create/",
         views.ApplicationCreateView.as_view(),
@@ -23,4 +24,7 @@ urlpatterns = [
         name="application_update",
     ),
     path("applications/<int:pk>/upload/", views.upload_document, name="upload_document"),
+    path("applications/<int:pk>/uploads/", views.start_chunked_upload, name="start_chunked_upload"),
+    path("uploads/<uuid:upload_id>/", views.chunked_upload, name="chunked_upload"),
+    path("documents/<int:pk>/download/", views.download_document, name="download_document"),
 ]
@@ -1,32 +1,82 @@
+import os
+from functools import partial
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
 from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
-from django.views.generic import DetailView, ListView, UpdateView
+from django.urls import reverse, reverse_lazy
+from django.views.decorators.http import require_http_methods, require_POST
+from django.views.generic import DetailView, ListView, TemplateView, UpdateView
 from django.views.generic.edit import CreateView
 
 from accounts.models import StaffProfile
+from study_destinations.deadlines import closing_soon
 from study_destinations.models import StudyDestination
+from utils.pagination import InvalidCursor, KeysetPaginator
 
-from .forms import ApplicationForm, ApplicationStatusUpdateForm, DocumentUploadForm
-from .models import Application, Document
+from .blobs import content_sha256, store_document_file
+from .filters import ApplicationFilter
+from .forms import ApplicationForm, ApplicationStatusUpdateForm, ChunkedUploadForm, DocumentUploadForm
+from .history import application_timeline
+from .models import Application, ChunkedUpload, Document
+from .queue import work_queue
+from .tasks import check_document
+from .uploads import UploadError, discard_upload, start_upload, write_chunk
 
 
 class ApplicationListView(LoginRequiredMixin, ListView):
     model = Application
     template_name = "applications/application_list.html"
     context_object_name = "applications"
+    page_size = 25
+    # Keyset order; matches the (…, submitted_date, id) indexes on Application
+    page_key = ("submitted_date", "id")
 
-    def get_queryset(self):
+    def is_staff_user(self):
         user = self.request.user
-        if user.is_staff or hasattr(user, "staff_profile"):
+        return user.is_staff or hasattr(user, "staff_profile")
+
+    def get_queryset(self):
+        queryset = Application.objects.select_related("client", "destination", "assigned_staff")
+        self.filterset = None
+        if self.is_staff_user():
             # Staff can see all applications
-            return Application.objects.all().order_by("-submitted_date")
-        else:
-            # Clients can only see their own applications
-            return Application.objects.filter(client=user).order_by("-submitted_date")
+            self.filterset = ApplicationFilter(self.request.GET or None, queryset=queryset)
+            return self.filterset.qs
+        # Clients can only see their own applications
+        return queryset.filter(client=self.request.user)
+
+    def page_querystring(self, **cursor):
+        """Current filters with the page cursor replaced"""
+        query = self.request.GET.copy()
+        query.pop("after", None)
+        query.pop("before", None)
+        query.update(cursor)
+        return query.urlencode()
+
+    def get_context_data(self, **kwargs):
+        paginator = KeysetPaginator(self.object_list, self.page_key, self.page_size)
+        try:
+            page = paginator.page(after=self.request.GET.get("after"), before=self.request.GET.get("before"))
+        except InvalidCursor:
+            raise Http404("Invalid page")
+
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context["page"] = page
+        context["filter"] = self.filterset
+        if page.has_next:
+            context["next_page_query"] = self.page_querystring(after=page.next_cursor)
+        if page.has_previous:
+            context["previous_page_query"] = self.page_querystring(before=page.previous_cursor)
+        if self.is_staff_user():
+            context["closing_soon"] = closing_soon(limit=20)
+        return context
 
 
 class ApplicationDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
@@ -44,6 +94,7 @@ class ApplicationDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView)
         context["document_form"] = DocumentUploadForm()
         # ✅ MAKE SURE THIS LINE EXISTS
         context["documents"] = self.object.documents.all()
+        context["status_timeline"] = application_timeline(self.object)
         return context
 
 
@@ -92,8 +143,14 @@ def upload_document(request, pk):
         if form.is_valid():
             document = form.save(commit=False)
             document.application = application
+            upload = document.file.file
+            document.sha256 = content_sha256(upload)
+            # Bytes already stored for another document aren't written again
+            store_document_file(document, upload, upload.name, document.sha256)
             document.save()
-            messages.success(request, "Document uploaded successfully!")
+            # Checked and compressed by a worker, so the upload returns straight away
+            transaction.on_commit(partial(check_document.delay, document.pk))
+            messages.success(request, "Document uploaded successfully! We're checking it now.")
             return redirect("dashboard:application_detail", pk=pk)
         else:
             # ✅ ADD THIS ERROR HANDLING
@@ -105,6 +162,85 @@ def upload_document(request, pk):
     return redirect("dashboard:application_detail", pk=pk)
 
 
+def _can_upload(user, application):
+    return user == application.client or user.is_staff or hasattr(user, "staff_profile")
+
+
+@login_required
+def download_document(request, pk):
+    """The document's file, saved under the name it was uploaded with"""
+    document = get_object_or_404(Document.objects.select_related("application"), pk=pk)
+    if not _can_upload(request.user, document.application):
+        raise PermissionDenied
+    filename = document.original_name or os.path.basename(document.file.name)
+    return FileResponse(document.file.open("rb"), as_attachment=True, filename=filename)
+
+
+def _upload_state(upload):
+    state = {
+        "upload_id": str(upload.pk),
+        "offset": upload.offset,
+        "size": upload.size,
+        "complete": upload.complete,
+        "url": reverse("dashboard:chunked_upload", kwargs={"upload_id": upload.pk}),
+    }
+    if upload.complete:
+        state["document_id"] = upload.document_id
+    return state
+
+
+def _upload_response(upload, status=200, **extra):
+    response = JsonResponse({**_upload_state(upload), **extra}, status=status)
+    response["Upload-Offset"] = str(upload.offset)
+    return response
+
+
+@login_required
+@require_POST
+def start_chunked_upload(request, pk):
+    """Opens a resumable upload; the client then PATCHes chunks to the returned url"""
+    application = get_object_or_404(Application, pk=pk)
+    if not _can_upload(request.user, application):
+        raise PermissionDenied
+    form = ChunkedUploadForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    upload = start_upload(application, request.user, **form.cleaned_data)
+    return _upload_response(upload, status=201, chunk_size=settings.CHUNKED_UPLOAD_MAX_CHUNK)
+
+
+@login_required
+@require_http_methods(["GET", "HEAD", "PATCH", "DELETE"])
+def chunked_upload(request, upload_id):
+    """
+    GET reports the acknowledged offset to resume from. PATCH appends the raw
+    request body at the offset given in the Upload-Offset header. DELETE
+    abandons the upload.
+    """
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, uploaded_by=request.user)
+    if request.method == "DELETE":
+        if not upload.complete:
+            discard_upload(upload)
+        return HttpResponse(status=204)
+    if request.method != "PATCH":
+        return _upload_response(upload)
+
+    try:
+        offset = int(request.headers["Upload-Offset"])
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except (KeyError, ValueError):
+        return _upload_response(upload, status=400, error="Upload-Offset and Content-Length are required")
+    try:
+        write_chunk(upload, offset, length, request)
+    except UploadError as e:
+        upload.refresh_from_db(fields=["offset", "document"])
+        return _upload_response(upload, status=e.status, error=str(e))
+    except ValidationError as e:
+        discard_upload(upload)
+        return JsonResponse({"error": " ".join(e.messages)}, status=400)
+    return _upload_response(upload)
+
+
 class ApplicationUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Application
     form_class = ApplicationStatusUpdateForm
@@ -114,8 +250,30 @@ class ApplicationUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
         return self.request.user.is_staff or hasattr(self.request.user, "staff_profile")
 
     def form_valid(self, form):
+        # Recorded on the status history row written by save()
+        form.instance.changed_by = self.request.user
         messages.success(self.request, "Application updated successfully!")
         return super().form_valid(form)
 
     def get_success_url(self):
         return reverse_lazy("dashboard:application_detail", kwargs={"pk": self.object.pk})
+
+
+class WorkQueueView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """The signed-in staff member's open cases by age; ?format=json for polling"""
+
+    template_name = "applications/work_queue.html"
+    cases_per_bucket = 10
+
+    def test_func(self):
+        return self.request.user.is_staff or hasattr(self.request.user, "staff_profile")
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("format") == "json":
+            return JsonResponse(work_queue(request.user, limit=self.cases_per_bucket))
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["queue"] = work_queue(self.request.user, limit=self.cases_per_bucket)
+        return context
@@ -1,19 +0,0 @@
-# visa_consultancy/celery.py
-import os
-from celery import Celery
-
-# Set the default Django settings module
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'visa_consultancy.settings')
-
-app = Celery('visa_consultancy')
-
-# Using a string here means the worker doesn't have to serialize
-# the configuration object to child processes.
-app.config_from_object('django.conf:settings', namespace='CELERY')
-
-# Load task modules from all registered Django apps.
-app.autodiscover_tasks()
-
-@app.task(bind=True, ignore_result=True)
-def debug_task(self):
-    print(f'Request: {self.request!r}')
\ No newline at end of file
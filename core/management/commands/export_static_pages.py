@@ -0,0 +1,21 @@
+# core/management/commands/export_static_pages.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core import prerender
+
+
+class Command(BaseCommand):
+    help = "Pre-renders public pages to static HTML served by PrerenderedPageMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="*", help="Only export these URLs (default: every public page)")
+
+    def handle(self, *args, **options):
+        if not prerender.prerender_root():
+            raise CommandError("PRERENDER_ROOT is not configured")
+        try:
+            written = prerender.export_pages(options["urls"] or None)
+        except ValueError as e:
+            # ManifestStaticFilesStorage can't resolve hashed asset names yet
+            raise CommandError(f"{e}. Run collectstatic before exporting pages.")
+        self.stdout.write(self.style.SUCCESS(f"Exported {len(written)} pages to {prerender.prerender_root()}"))
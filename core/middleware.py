@@ -0,0 +1,51 @@
+# core/middleware.py
+import os
+
+from django.utils.cache import patch_vary_headers
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from utils.cache_utils import ViewCache
+
+from . import prerender
+
+
+class PrerenderedPageMiddleware(WhiteNoise):
+    """
+    Serve pages exported by `manage.py export_static_pages` to anonymous
+    visitors through WhiteNoise, bypassing the views. The file list is rescanned
+    only when an export rewrites the manifest, costing one stat per request.
+    """
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+        self.manifest_mtime = None
+        super().__init__(application=None, max_age=0, index_file=True)
+
+    def refresh_files(self):
+        root = prerender.prerender_root()
+        try:
+            mtime = os.stat(prerender.manifest_path()).st_mtime_ns if root else None
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.manifest_mtime:
+            return
+        self.manifest_mtime = mtime
+        self.files = {}
+        if mtime is not None:
+            self.update_files_dictionary(os.path.abspath(root) + os.path.sep, "/")
+
+    def __call__(self, request):
+        if ViewCache.is_public_request(request) and not request.GET and request.path_info.endswith("/"):
+            self.refresh_files()
+            static_file = self.files.get(request.path_info)
+            if static_file is not None:
+                try:
+                    response = WhiteNoiseMiddleware.serve(static_file, request)
+                except FileNotFoundError:
+                    # Removed by a re-export since the last scan
+                    return self.get_response(request)
+                # Logged-in visitors get the dynamic page; keep shared caches from mixing them up
+                patch_vary_headers(response, ["Cookie"])
+                return response
+        return self.get_response(request)
@@ -0,0 +1,142 @@
+# core/prerender.py
+"""
+Static pre-rendering of public pages.
+
+Pages are rendered as an anonymous visitor would see them and written to
+PRERENDER_ROOT as <path>/index.html (plus a gzip variant), where
+PrerenderedPageMiddleware serves them through WhiteNoise without running
+the view. Every export rewrites PRERENDER_MANIFEST, which tells the
+middleware to rescan the directory.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve, reverse
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".export-manifest.json"
+
+# Pages whose content doesn't depend on any model
+CORE_PAGES = ["core:home", "core:about", "core:faq"]
+DESTINATION_PAGES = ["core:home", "study_destinations:list"]
+TESTIMONIAL_PAGES = ["testimonials:testimonial_list", "testimonials:study_visa_testimonials"]
+
+
+def prerender_root():
+    return getattr(settings, "PRERENDER_ROOT", None)
+
+
+def manifest_path():
+    return os.path.join(prerender_root(), MANIFEST_NAME)
+
+
+def is_enabled():
+    """Pages are only re-exported on content changes once a full export has been made"""
+    return bool(prerender_root()) and os.path.isfile(manifest_path())
+
+
+def destination_urls(slugs=None):
+    from study_destinations.models import StudyDestination
+
+    if slugs is None:
+        slugs = StudyDestination.objects.filter(is_published=True).values_list("slug", flat=True)
+    return [reverse("study_destinations:detail", kwargs={"slug": slug}) for slug in slugs]
+
+
+def public_urls():
+    """Every public page that renders the same for all anonymous visitors"""
+    names = dict.fromkeys(CORE_PAGES + DESTINATION_PAGES + TESTIMONIAL_PAGES)
+    return [reverse(name) for name in names] + destination_urls()
+
+
+def _page_path(url):
+    return os.path.join(prerender_root(), url.strip("/"), "index.html")
+
+
+def render_page(url):
+    """Render url as an anonymous HTTPS request; returns the HTML bytes or None if it isn't a 200"""
+    host = getattr(settings, "PRERENDER_HOST", None) or "localhost"
+    request = RequestFactory().get(url, secure=True, HTTP_HOST=host)
+    request.user = AnonymousUser()
+    request.skip_page_cache = True
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+    if hasattr(response, "render"):
+        response.render()
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def _write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(content)
+    os.replace(tmp_path, path)
+
+
+def _remove(path):
+    for variant in (path, f"{path}.gz"):
+        try:
+            os.remove(variant)
+        except FileNotFoundError:
+            pass
+
+
+def _touch_manifest():
+    _write_atomic(
+        manifest_path(),
+        json.dumps({"exported_at": time.time(), "urls": sorted(_exported_urls())}).encode(),
+    )
+
+
+def _exported_urls():
+    root = prerender_root()
+    for dirpath, _dirnames, filenames in os.walk(root):
+        if "index.html" in filenames:
+            relative = os.path.relpath(dirpath, root).replace(os.path.sep, "/")
+            yield "/" if relative == "." else f"/{relative}/"
+
+
+def export_pages(urls=None):
+    """
+    Render urls (every public page when None) to static files. Pages that no
+    longer render (e.g. an unpublished destination) are removed so requests
+    fall through to Django. Returns the list of URLs written.
+    """
+    if urls is None:
+        urls = public_urls()
+        # Anything exported earlier that is no longer public gets removed too
+        urls += [url for url in _exported_urls() if url not in urls]
+
+    written = []
+    for url in urls:
+        path = _page_path(url)
+        content = render_page(url)
+        if content is None:
+            _remove(path)
+            continue
+        # Compress before swapping in the page so WhiteNoise never pairs a new
+        # index.html with a stale .gz
+        _write_atomic(f"{path}.gz", gzip.compress(content))
+        _write_atomic(path, content)
+        written.append(url)
+
+    _touch_manifest()
+    logger.info(f"Exported {len(written)} static pages to {prerender_root()}")
+    return written
@@ -0,0 +1,35 @@
+# core/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.urls import reverse
+
+from study_destinations.signals import content_updated
+from testimonials.models import Testimonial
+
+from . import prerender
+from .sitemaps import invalidate_sitemap
+from .tasks import export_pages
+
+
+@receiver(content_updated)
+def reexport_destination_pages(sender, slugs, **kwargs):
+    """Re-export pages that show destination content once it has been updated"""
+    invalidate_sitemap()
+    if not prerender.is_enabled():
+        return
+    urls = [reverse(name) for name in prerender.DESTINATION_PAGES]
+    # slugs=None means any destination may have changed, including ones that
+    # were unpublished; stale pages are dropped by a full export
+    if slugs is None:
+        export_pages.delay()
+    else:
+        export_pages.delay(urls + prerender.destination_urls(slugs))
+
+
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def testimonial_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_sitemap)
+    if prerender.is_enabled():
+        transaction.on_commit(lambda: export_pages.delay([reverse(name) for name in prerender.TESTIMONIAL_PAGES]))
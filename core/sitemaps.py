@@ -0,0 +1,108 @@
+# core/sitemaps.py
+"""
+sitemap.xml for the public pages: core pages, destination guides and the
+testimonial pages. The rendered XML is cached under its own version token,
+bumped whenever destination content or testimonials change, so crawlers
+hitting it repeatedly never reach the database.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps.views import sitemap
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+
+from study_destinations.cache import bump_version, get_version, version_timestamp
+from study_destinations.models import StudyDestination
+from testimonials.models import Testimonial
+from utils.cache_utils import ViewCache
+
+SITEMAP_VERSION_KEY = "core:version:sitemap"
+SITEMAP_CACHE_TIMEOUT_KEY = "sitemap"
+
+
+def sitemap_version():
+    return get_version(SITEMAP_VERSION_KEY)
+
+
+def invalidate_sitemap():
+    bump_version(SITEMAP_VERSION_KEY)
+
+
+class CorePagesSitemap(Sitemap):
+    changefreq = "monthly"
+    priority = 0.8
+
+    def items(self):
+        return ["core:home", "core:about", "core:faq", "core:contact", "study_destinations:list"]
+
+    def location(self, item):
+        return reverse(item)
+
+
+class DestinationSitemap(Sitemap):
+    changefreq = "weekly"
+    priority = 0.9
+
+    def items(self):
+        return (
+            StudyDestination.objects.filter(is_published=True)
+            .only("slug", "updated_at")
+            .order_by("order", "country_name")
+        )
+
+    def lastmod(self, destination):
+        return destination.updated_at
+
+
+class TestimonialPagesSitemap(Sitemap):
+    changefreq = "weekly"
+    priority = 0.5
+    filters = {
+        "testimonials:testimonial_list": {},
+        "testimonials:study_visa_testimonials": {"visa_category": "STUDY_VISA"},
+    }
+
+    def items(self):
+        return list(self.filters)
+
+    def location(self, item):
+        return reverse(item)
+
+    def lastmod(self, item):
+        return Testimonial.objects.filter(is_approved=True, **self.filters[item]).aggregate(
+            last_modified=Max("updated_at")
+        )["last_modified"]
+
+
+SITEMAPS = {
+    "pages": CorePagesSitemap,
+    "destinations": DestinationSitemap,
+    "testimonials": TestimonialPagesSitemap,
+}
+
+
+def sitemap_state(request, *args, **kwargs):
+    token = sitemap_version()
+    return version_timestamp(token), token
+
+
+@require_safe
+@ViewCache.conditional_public_page(sitemap_state)
+def sitemap_view(request):
+    # Absolute URLs in the XML follow the host and scheme of the request
+    key = "core:sitemap:{}:{}".format(
+        hashlib.md5(f"{request.scheme}://{request.get_host()}".encode()).hexdigest(), sitemap_version()
+    )
+    content = cache.get(key)
+    if content is None:
+        response = sitemap(request, sitemaps=SITEMAPS)
+        response.render()
+        content = response.content
+        timeout = getattr(settings, "CACHE_TIMEOUTS", {}).get(SITEMAP_CACHE_TIMEOUT_KEY, 300)
+        cache.set(key, content, timeout)
+    return HttpResponse(content, content_type="application/xml")
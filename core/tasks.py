@@ -0,0 +1,10 @@
+# core/tasks.py
+from celery import shared_task
+
+from . import prerender
+
+
+@shared_task(ignore_result=True)
+def export_pages(urls=None):
+    """Re-render static pages (every public page when urls is None) outside the request that changed them"""
+    prerender.export_pages(urls)
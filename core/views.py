@@ -1,13 +1,28 @@
 # core/views.py - Update with contact view
+import datetime
+
 from django.contrib import messages
 from django.shortcuts import redirect, render
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
+from study_destinations.cache import deadlines_version, destination_page_state, version_timestamp
+from study_destinations.deadlines import closing_soon
 from study_destinations.models import StudyDestination
+from utils.cache_utils import ViewCache
 
 from .forms import ContactForm
 
 
+def home_page_state(request, *args, **kwargs):
+    """Featured destinations plus the closing-soon feed, which also moves with the date"""
+    last_modified, fingerprint = destination_page_state(request)
+    token = deadlines_version()
+    stamps = [stamp for stamp in (last_modified, version_timestamp(token)) if stamp is not None]
+    return (max(stamps) if stamps else None), f"{fingerprint}:{token}:{datetime.date.today()}"
+
+
+@method_decorator(ViewCache.conditional_public_page(home_page_state), name="dispatch")
 class HomeView(TemplateView):
     template_name = "core/home.html"
 
@@ -16,6 +31,7 @@ class HomeView(TemplateView):
         context["featured_destinations"] = StudyDestination.objects.filter(
             is_published=True, is_featured=True
         ).order_by("order")[:6]
+        context["closing_soon"] = closing_soon(limit=6)
         return context
 
 
@@ -1,5 +1,13 @@
 # study_destinations/admin.py
 from django.contrib import admin
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.forms.models import BaseInlineFormSet
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.html import format_html
 
 from .models import (
@@ -13,16 +21,33 @@ from .models import (
 )
 
 
-class DestinationSectionInline(admin.TabularInline):
-    model = DestinationSection
+class PagedInlineFormSet(BaseInlineFormSet):
+    """Inline formset over one page of a destination's child rows"""
+
+    def __init__(self, *args, page, **kwargs):
+        self.page = page
+        super().__init__(*args, **kwargs)
+
+    def get_queryset(self):
+        return self.page.object_list
+
+
+class DestinationChildInline(admin.TabularInline):
     extra = 1
+
+    def get_queryset(self, request):
+        # __str__ of every child row reads destination.country_name
+        return super().get_queryset(request).select_related("destination")
+
+
+class DestinationSectionInline(DestinationChildInline):
+    model = DestinationSection
     fields = ["section_title", "section_type", "order", "is_active"]
     ordering = ["order"]
 
 
-class TuitionTableInline(admin.TabularInline):
+class TuitionTableInline(DestinationChildInline):
     model = TuitionTable
-    extra = 1
     fields = [
         "program_name",
         "program_level",
@@ -33,9 +58,8 @@ class TuitionTableInline(admin.TabularInline):
     ]
 
 
-class IntakeTableInline(admin.TabularInline):
+class IntakeTableInline(DestinationChildInline):
     model = IntakeTable
-    extra = 1
     fields = [
         "intake_name",
         "intake_month",
@@ -45,21 +69,18 @@ class IntakeTableInline(admin.TabularInline):
     ]
 
 
-class ScholarshipInline(admin.TabularInline):
+class ScholarshipInline(DestinationChildInline):
     model = Scholarship
-    extra = 1
     fields = ["scholarship_title", "scholarship_type", "amount", "is_active", "order"]
 
 
-class VisaRequirementInline(admin.TabularInline):
+class VisaRequirementInline(DestinationChildInline):
     model = VisaRequirement
-    extra = 1
     fields = ["visa_name", "visa_type", "processing_time", "visa_fee", "order"]
 
 
-class PostStudyWorkInline(admin.TabularInline):
+class PostStudyWorkInline(DestinationChildInline):
     model = PostStudyWork
-    extra = 1
     fields = ["visa_name", "duration", "order"]
 
 
@@ -78,6 +99,8 @@ class StudyDestinationAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("country_name",)}
     list_editable = ["is_published", "is_featured", "order"]
     readonly_fields = ["created_at", "updated_at", "preview_link"]
+    # Child rows shown per page of a lazily loaded inline table
+    inline_per_page = 25
 
     fieldsets = (
         (
@@ -120,6 +143,126 @@ class StudyDestinationAdmin(admin.ModelAdmin):
         PostStudyWorkInline,
     ]
 
+    def lazy_inlines(self, request, obj):
+        """
+        On the change page, child tables are loaded one at a time from
+        child_table_view instead of being rendered with the form; add
+        ?inlines=all for the classic page with every inline.
+        """
+        return obj is not None and request.GET.get("inlines") != "all"
+
+    def get_inline_instances(self, request, obj=None):
+        if self.lazy_inlines(request, obj):
+            return []
+        return super().get_inline_instances(request, obj)
+
+    def render_change_form(self, request, context, add=False, change=False, form_url="", obj=None):
+        if self.lazy_inlines(request, obj):
+            # Child tables arrive after the page has loaded, so the scripts
+            # their formsets and widgets need must already be on the page
+            for inline in super().get_inline_instances(request, obj):
+                context["media"] += inline.media + inline.get_formset(request, obj).form().media
+        return super().render_change_form(request, context, add, change, form_url, obj)
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<path:object_id>/children/<str:model_name>/",
+                self.admin_site.admin_view(self.child_table_view),
+                name="study_destinations_studydestination_children",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        extra_context = extra_context or {}
+        if request.GET.get("inlines") != "all":
+            extra_context["lazy_inline_tables"] = [
+                {
+                    "title": inline.verbose_name_plural,
+                    "url": reverse(
+                        "admin:study_destinations_studydestination_children",
+                        args=[object_id, inline.model._meta.model_name],
+                    ),
+                }
+                for inline in super().get_inline_instances(request)
+            ]
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def child_table_view(self, request, object_id, model_name):
+        """
+        One page of a single inline, as an HTML fragment for the change page.
+        A POST saves only this page of this inline.
+        """
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        inline = next(
+            (
+                inline
+                for inline in super().get_inline_instances(request, obj)
+                if inline.model._meta.model_name == model_name
+            ),
+            None,
+        )
+        if inline is None:
+            raise Http404
+
+        rows = inline.get_queryset(request).filter(destination=obj)
+        rows = rows.order_by(*(inline.get_ordering(request) or inline.model._meta.ordering), "pk")
+        page = Paginator(rows, self.inline_per_page).get_page(request.GET.get("page"))
+        FormSet = inline.get_formset(request, obj, formset=PagedInlineFormSet)
+        prefix = FormSet.get_default_prefix()
+        status = 200
+        saved = False
+
+        if request.method == "POST":
+            if not self.has_change_permission(request, obj):
+                raise PermissionDenied
+            formset = FormSet(request.POST, request.FILES, instance=obj, page=page, prefix=prefix)
+            if formset.is_valid():
+                # Signals of every saved row are collected into a single rebuild on commit
+                with transaction.atomic():
+                    self.save_formset(request, None, formset, change=True)
+                message = self._formset_change_message(formset)
+                if message:
+                    self.log_change(request, obj, message)
+                page = Paginator(rows, self.inline_per_page).get_page(page.number)
+                formset = FormSet(instance=obj, page=page, prefix=prefix)
+                saved = True
+            else:
+                status = 400
+        else:
+            formset = FormSet(instance=obj, page=page, prefix=prefix)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "original": obj,
+            "inline_admin_formset": self.get_inline_formsets(request, [formset], [inline], obj)[0],
+            "page_obj": page,
+            "saved": saved,
+            "can_change": self.has_change_permission(request, obj),
+        }
+        return TemplateResponse(
+            request, "admin/study_destinations/studydestination/child_table.html", context, status=status
+        )
+
+    def _formset_change_message(self, formset):
+        """The formset part of what construct_change_message logs for a full change form"""
+        message = []
+        for added in formset.new_objects:
+            message.append({"added": {"name": str(added._meta.verbose_name), "object": str(added)}})
+        for changed, fields in formset.changed_objects:
+            message.append(
+                {"changed": {"name": str(changed._meta.verbose_name), "object": str(changed), "fields": fields}}
+            )
+        for deleted in formset.deleted_objects:
+            message.append({"deleted": {"name": str(deleted._meta.verbose_name), "object": str(deleted)}})
+        return message
+
     def preview_link(self, obj):
         if obj.pk:
             return format_html(
@@ -140,6 +283,7 @@ class DestinationSectionAdmin(admin.ModelAdmin):
         "order",
         "is_active",
     ]
+    list_select_related = ["destination"]
     list_filter = ["destination", "section_type", "is_active"]
     search_fields = ["section_title", "section_content"]
     list_editable = ["order", "is_active"]
@@ -155,6 +299,7 @@ class TuitionTableAdmin(admin.ModelAdmin):
         "tuition_fee_min",
         "duration_years",
     ]
+    list_select_related = ["destination"]
     list_filter = ["destination", "program_level"]
     search_fields = ["program_name"]
     list_editable = ["program_level", "tuition_fee_min"]
@@ -169,6 +314,7 @@ class IntakeTableAdmin(admin.ModelAdmin):
         "application_deadline",
         "is_main_intake",
     ]
+    list_select_related = ["destination"]
     list_filter = ["destination", "is_main_intake"]
     search_fields = ["intake_name"]
     list_editable = ["intake_month", "application_deadline"]
@@ -183,6 +329,7 @@ class ScholarshipAdmin(admin.ModelAdmin):
         "amount",
         "is_active",
     ]
+    list_select_related = ["destination"]
     list_filter = ["destination", "scholarship_type", "is_active"]
     search_fields = ["scholarship_title"]
     list_editable = ["is_active"]
@@ -197,6 +344,7 @@ class VisaRequirementAdmin(admin.ModelAdmin):
         "processing_time",
         "visa_fee",
     ]
+    list_select_related = ["destination"]
     list_filter = ["destination", "visa_type"]
     search_fields = ["visa_name"]
     list_editable = ["visa_type"]
@@ -205,5 +353,6 @@ class VisaRequirementAdmin(admin.ModelAdmin):
 @admin.register(PostStudyWork)
 class PostStudyWorkAdmin(admin.ModelAdmin):
     list_display = ["destination", "visa_name", "duration"]
+    list_select_related = ["destination"]
     list_filter = ["destination"]
     search_fields = ["visa_name"]
@@ -1,5 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def create_search_table(sender, using, **kwargs):
+    from django.db import connections
+
+    from .search import ensure_search_table
+
+    ensure_search_table(connections[using])
 
 
 class StudyDestinationsConfig(AppConfig):
     name = "study_destinations"
+
+    def ready(self):
+        import study_destinations.checks  # noqa: F401
+        import study_destinations.signals  # noqa: F401
+
+        # Also covers test databases built without running migrations
+        post_migrate.connect(create_search_table, sender=self)
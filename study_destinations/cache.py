@@ -0,0 +1,169 @@
+# study_destinations/cache.py
+import datetime
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+
+from utils.cache_utils import ViewCache
+
+ALL_DESTINATIONS_VERSION_KEY = "study_destinations:version:all"
+DESTINATION_LIST_VERSION_KEY = "study_destinations:version:list"
+TUITION_VERSION_KEY = "study_destinations:version:tuition"
+DEADLINES_VERSION_KEY = "study_destinations:version:deadlines"
+PAGE_CACHE_TIMEOUT_KEY = "destination_pages"
+# Cache alias holding the version tokens; see version_cache()
+VERSION_CACHE = "versions"
+
+
+def _destination_version_key(slug):
+    return f"study_destinations:version:destination:{slug}"
+
+
+def _new_token():
+    # Prefixed with the bump time so a version doubles as a Last-Modified date
+    return f"{int(time.time())}-{uuid.uuid4().hex}"
+
+
+def version_timestamp(token):
+    """When the version token was minted, or None for tokens without a timestamp"""
+    stamp, _, _ = token.partition("-")
+    if not stamp.isdigit():
+        return None
+    return datetime.datetime.fromtimestamp(int(stamp), tz=datetime.timezone.utc)
+
+
+def version_cache():
+    """
+    Version tokens live in a cache every process shares (web workers, the
+    Celery worker, management commands), so a bump made in any of them
+    reaches all of them. What is cached under the tokens stays in each
+    process's own default cache.
+    """
+    return caches[VERSION_CACHE]
+
+
+def get_version(key):
+    """Return the current version token stored under key, creating one if missing"""
+    versions = version_cache()
+    token = versions.get(key)
+    if token is None:
+        # add() so that two concurrent first readers agree on the same token
+        versions.add(key, _new_token(), None)
+        token = versions.get(key)
+    return token
+
+
+def bump_version(key):
+    """Move key to a fresh token; everything cached under the old one becomes unreachable"""
+    version_cache().set(key, _new_token(), None)
+
+
+def destinations_version():
+    """Version shared by every destination page (list, featured and related blocks)"""
+    return get_version(ALL_DESTINATIONS_VERSION_KEY)
+
+
+def destination_version(slug):
+    """Version of a single destination's child content"""
+    return get_version(_destination_version_key(slug))
+
+
+def invalidate_all_destinations():
+    bump_version(ALL_DESTINATIONS_VERSION_KEY)
+
+
+def invalidate_destination(slug):
+    bump_version(_destination_version_key(slug))
+
+
+def destination_list_version():
+    """Version of the child rows the list page's facets and filters read, across every destination"""
+    return get_version(DESTINATION_LIST_VERSION_KEY)
+
+
+def invalidate_destination_list():
+    bump_version(DESTINATION_LIST_VERSION_KEY)
+
+
+def tuition_version():
+    """Version of every tuition row across all published destinations"""
+    return get_version(TUITION_VERSION_KEY)
+
+
+def invalidate_tuition():
+    bump_version(TUITION_VERSION_KEY)
+
+
+def deadlines_version():
+    """Version of every parsed intake and scholarship deadline"""
+    return get_version(DEADLINES_VERSION_KEY)
+
+
+def invalidate_deadlines():
+    bump_version(DEADLINES_VERSION_KEY)
+
+
+def page_cache_key(request, versions):
+    url = f"{request.get_host()}{request.get_full_path()}"
+    return "study_destinations:page:{}:{}".format(hashlib.md5(url.encode()).hexdigest(), ":".join(versions))
+
+
+class VersionedPageCacheMixin:
+    """
+    Serve the rendered HTML of a public page from cache, keyed on content
+    versions instead of a TTL. Only anonymous visitors without a session or
+    pending messages are served from cache, so a hit needs no database work.
+    """
+
+    def get_page_versions(self):
+        return [destinations_version()]
+
+    def page_is_cacheable(self, request):
+        # Static exports always render afresh: the process running them (a
+        # Celery worker) needn't share this process's page cache
+        return ViewCache.is_public_request(request) and not getattr(request, "skip_page_cache", False)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.page_is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request, self.get_page_versions())
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, "add_post_render_callback"):
+            timeout = getattr(settings, "CACHE_TIMEOUTS", {}).get(PAGE_CACHE_TIMEOUT_KEY, 300)
+            response.add_post_render_callback(lambda r: cache.set(key, r.content, timeout))
+        return response
+
+
+def _versions_state(versions):
+    stamps = [stamp for stamp in map(version_timestamp, versions) if stamp is not None]
+    return (max(stamps) if stamps else None), ":".join(versions)
+
+
+def destination_page_state(request, *args, **kwargs):
+    """
+    Validator for pages rendering destinations: the content versions the page
+    cache is keyed on, and the newest time one of them was bumped. Reading it
+    costs cache lookups only, so a 304 never touches the database.
+    """
+    versions = [destinations_version()]
+    if "slug" in kwargs:
+        versions.append(destination_version(kwargs["slug"]))
+    return _versions_state(versions)
+
+
+def destination_list_state(request, *args, **kwargs):
+    """Validator for the list page, whose facets count child rows of every destination"""
+    return _versions_state([destinations_version(), destination_list_version()])
+
+
+conditional_destination_page = ViewCache.conditional_public_page(destination_page_state)
+conditional_destination_list_page = ViewCache.conditional_public_page(destination_list_state)
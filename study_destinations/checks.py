@@ -0,0 +1,38 @@
+# study_destinations/checks.py
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from .cache import VERSION_CACHE
+
+# Backends whose entries only the process that wrote them can see
+PROCESS_LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches)
+def check_version_cache(app_configs, **kwargs):
+    """
+    Content is changed outside the web process (Celery tasks, import and
+    refresh commands), so version bumps must reach the web workers.
+    """
+    backend = settings.CACHES.get(VERSION_CACHE, {}).get("BACKEND")
+    if backend is None:
+        return [
+            Error(
+                f'No "{VERSION_CACHE}" cache is configured for content version tokens.',
+                hint="Add one to CACHES that every process can reach, e.g. FileBasedCache.",
+                id="study_destinations.E001",
+            )
+        ]
+    if backend in PROCESS_LOCAL_BACKENDS and not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        return [
+            Error(
+                f'The "{VERSION_CACHE}" cache is local to each process, so content changed by Celery '
+                "tasks or management commands would leave other processes serving stale pages.",
+                hint="Use a shared backend such as FileBasedCache, DatabaseCache or Redis.",
+                id="study_destinations.E002",
+            )
+        ]
+    return []
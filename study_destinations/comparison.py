@@ -0,0 +1,190 @@
+# study_destinations/comparison.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+
+from . import cache as destination_cache
+from .models import TuitionTable, VisaRequirement
+
+COMPARISON_CACHE_TIMEOUT_KEY = "tuition_comparison"
+
+# Min/median/max per destination in one grouped statement. The median is taken
+# over each program's midpoint fee, picking the middle row(s) with window
+# functions since SQLite has no MEDIAN aggregate.
+COUNTRY_AGGREGATES_SQL = """
+WITH matched AS (
+    SELECT t.destination_id,
+           t.tuition_fee_min,
+           t.tuition_fee_max,
+           (t.tuition_fee_min + t.tuition_fee_max) / 2.0 AS midpoint
+    FROM study_destinations_tuitiontable AS t
+    JOIN study_destinations_studydestination AS d ON d.id = t.destination_id
+    WHERE {where}
+),
+ranked AS (
+    SELECT matched.*,
+           ROW_NUMBER() OVER (PARTITION BY destination_id ORDER BY midpoint) AS position,
+           COUNT(*) OVER (PARTITION BY destination_id) AS programs
+    FROM matched
+)
+SELECT d.slug,
+       d.country_name,
+       d.country_code,
+       MAX(ranked.programs),
+       MIN(ranked.tuition_fee_min),
+       AVG(CASE WHEN ranked.position IN ((ranked.programs + 1) / 2, (ranked.programs + 2) / 2)
+                THEN ranked.midpoint END) AS median_fee,
+       MAX(ranked.tuition_fee_max)
+FROM ranked
+JOIN study_destinations_studydestination AS d ON d.id = ranked.destination_id
+GROUP BY d.id, d.slug, d.country_name, d.country_code
+ORDER BY median_fee, d.country_name
+"""
+
+
+def _money(value):
+    return None if value is None else round(float(value), 2)
+
+
+def _country_aggregates(program_level, budget_min, budget_max):
+    where = ["d.is_published", "t.program_level = %s"]
+    params = [program_level]
+    # A program matches when its fee range overlaps the budget range
+    if budget_min is not None:
+        where.append("t.tuition_fee_max >= %s")
+        params.append(budget_min)
+    if budget_max is not None:
+        where.append("t.tuition_fee_min <= %s")
+        params.append(budget_max)
+
+    with connection.cursor() as cursor:
+        cursor.execute(COUNTRY_AGGREGATES_SQL.format(where=" AND ".join(where)), params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "slug": slug,
+            "country_name": country_name,
+            "country_code": country_code,
+            "programs": programs,
+            "min_fee": _money(min_fee),
+            "median_fee": _money(median_fee),
+            "max_fee": _money(max_fee),
+        }
+        for slug, country_name, country_code, programs, min_fee, median_fee, max_fee in rows
+    ]
+
+
+def _programs(program_level, budget_min, budget_max):
+    programs = TuitionTable.objects.filter(program_level=program_level, destination__is_published=True)
+    if budget_min is not None:
+        programs = programs.filter(tuition_fee_max__gte=budget_min)
+    if budget_max is not None:
+        programs = programs.filter(tuition_fee_min__lte=budget_max)
+    programs = programs.order_by("tuition_fee_min", "tuition_fee_max").values(
+        "program_name",
+        "duration_years",
+        "tuition_fee_min",
+        "tuition_fee_max",
+        "destination__slug",
+        "destination__country_name",
+    )
+    return [
+        {
+            "program_name": program["program_name"],
+            "duration_years": program["duration_years"],
+            "tuition_fee_min": _money(program["tuition_fee_min"]),
+            "tuition_fee_max": _money(program["tuition_fee_max"]),
+            "slug": program["destination__slug"],
+            "country_name": program["destination__country_name"],
+        }
+        for program in programs
+    ]
+
+
+def compare_tuition(program_level, budget_min=None, budget_max=None):
+    """
+    Programs of program_level whose fee range overlaps [budget_min, budget_max]
+    across all published destinations, plus min/median/max fees per country.
+    Results are cached per query shape until any tuition row changes.
+    """
+    key = "study_destinations:tuition:{}:{}:{}:{}".format(
+        destination_cache.tuition_version(), program_level, budget_min, budget_max
+    )
+    result = cache.get(key)
+    if result is None:
+        result = {
+            "program_level": program_level,
+            "budget_min": _money(budget_min),
+            "budget_max": _money(budget_max),
+            "programs": _programs(program_level, budget_min, budget_max),
+            "countries": _country_aggregates(program_level, budget_min, budget_max),
+        }
+        timeout = getattr(settings, "CACHE_TIMEOUTS", {}).get(COMPARISON_CACHE_TIMEOUT_KEY, 300)
+        cache.set(key, result, timeout)
+    return result
+
+
+# sort -> columns ordered on; fees only compare within a currency, so the
+# currency leads (matching the (visa_type, currency, min) indexes)
+VISA_SORTS = {
+    "fastest": ["processing_days_min", "processing_days_max"],
+    "cheapest": ["visa_fee_currency", "visa_fee_min", "visa_fee_max"],
+    "lowest_funds": ["financial_requirement_currency", "financial_requirement_min", "financial_requirement_max"],
+}
+
+
+def compare_visas(visa_type, sort="fastest", max_processing_weeks=None, currency="", max_fee=None):
+    """
+    Visa requirements of visa_type across published destinations, ordered in
+    SQL on the parsed numeric columns. Rows whose text couldn't be parsed
+    sort last. max_fee only applies within a currency.
+    """
+    visas = VisaRequirement.objects.filter(visa_type=visa_type, destination__is_published=True)
+    if max_processing_weeks is not None:
+        visas = visas.filter(processing_days_min__lte=max_processing_weeks * 7)
+    if currency:
+        visas = visas.filter(visa_fee_currency=currency)
+        if max_fee is not None:
+            visas = visas.filter(visa_fee_min__lte=max_fee)
+    ordering = [F(column).asc(nulls_last=True) for column in VISA_SORTS[sort]] + ["destination__country_name"]
+    visas = visas.order_by(*ordering).values(
+        "visa_name",
+        "processing_time",
+        "processing_days_min",
+        "processing_days_max",
+        "visa_fee",
+        "visa_fee_min",
+        "visa_fee_max",
+        "visa_fee_currency",
+        "financial_requirement",
+        "financial_requirement_min",
+        "financial_requirement_max",
+        "financial_requirement_currency",
+        "destination__slug",
+        "destination__country_name",
+    )
+    return {
+        "visa_type": visa_type,
+        "sort": sort,
+        "visas": [
+            {
+                "visa_name": visa["visa_name"],
+                "slug": visa["destination__slug"],
+                "country_name": visa["destination__country_name"],
+                "processing_time": visa["processing_time"],
+                "processing_days_min": visa["processing_days_min"],
+                "processing_days_max": visa["processing_days_max"],
+                "visa_fee": visa["visa_fee"],
+                "visa_fee_min": _money(visa["visa_fee_min"]),
+                "visa_fee_max": _money(visa["visa_fee_max"]),
+                "visa_fee_currency": visa["visa_fee_currency"],
+                "financial_requirement": visa["financial_requirement"],
+                "financial_requirement_min": _money(visa["financial_requirement_min"]),
+                "financial_requirement_max": _money(visa["financial_requirement_max"]),
+                "financial_requirement_currency": visa["financial_requirement_currency"],
+            }
+            for visa in visas
+        ],
+    }
@@ -0,0 +1,81 @@
+# study_destinations/deadlines.py
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Value
+from django.urls import reverse
+
+from .cache import deadlines_version
+from .models import IntakeTable, Scholarship
+
+CLOSING_SOON_TIMEOUT_KEY = "closing_soon"
+
+# (model, date field, label, title field, extra filters)
+DEADLINE_SOURCES = [
+    (IntakeTable, "application_deadline_date", "Application deadline", "intake_name", {}),
+    (IntakeTable, "visa_deadline_date", "Visa deadline", "intake_name", {}),
+    (Scholarship, "application_deadline_date", "Scholarship deadline", "scholarship_title", {"is_active": True}),
+]
+
+
+def _closing_soon_rows(start, end, limit):
+    parts = []
+    for model, field, label, title_field, extra in DEADLINE_SOURCES:
+        parts.append(
+            model.objects.filter(destination__is_published=True, **{f"{field}__range": (start, end)}, **extra)
+            .order_by()
+            .annotate(deadline=F(field), kind=Value(label), title=F(title_field))
+            .values_list("deadline", "kind", "title", "destination__country_name", "destination__slug")
+        )
+    # Each part is a range scan on its date index; one round trip for all of them
+    return parts[0].union(*parts[1:], all=True).order_by("deadline", "destination__country_name")[:limit]
+
+
+def closing_soon(days=30, limit=10, today=None):
+    """
+    Intake and scholarship deadlines of published destinations falling in
+    the next `days` days, soonest first. Cached per day until a deadline changes.
+    """
+    today = today or datetime.date.today()
+    key = f"study_destinations:closing_soon:{deadlines_version()}:{today.isoformat()}:{days}:{limit}"
+    entries = cache.get(key)
+    if entries is not None:
+        return entries
+
+    entries = [
+        {
+            "date": deadline,
+            "days_left": (deadline - today).days,
+            "kind": kind,
+            "title": title,
+            "country_name": country_name,
+            "url": reverse("study_destinations:detail", kwargs={"slug": slug}),
+        }
+        for deadline, kind, title, country_name, slug in _closing_soon_rows(
+            today, today + datetime.timedelta(days=days), limit
+        )
+    ]
+    timeout = getattr(settings, "CACHE_TIMEOUTS", {}).get(CLOSING_SOON_TIMEOUT_KEY, 3600)
+    cache.set(key, entries, timeout)
+    return entries
+
+
+def refresh_deadline_dates(today=None):
+    """
+    Re-parse every stored deadline. Dates without a year and deadlines
+    relative to an intake roll forward once they pass, so this runs daily.
+    Returns the number of rows whose dates changed.
+    """
+    changed = 0
+    for model in (IntakeTable, Scholarship):
+        fields = model.deadline_date_fields
+        updated = []
+        for row in model.objects.all():
+            stored = [getattr(row, field) for field in fields]
+            row.derive_deadline_dates(today)
+            if stored != [getattr(row, field) for field in fields]:
+                updated.append(row)
+        model.objects.bulk_update(updated, fields, batch_size=200)
+        changed += len(updated)
+    return changed
@@ -0,0 +1,76 @@
+# study_destinations/filters.py
+import django_filters
+from django.db.models import Count, F, Value
+
+from .models import IntakeTable, Scholarship, StudyDestination, TuitionTable, VisaRequirement
+
+
+class StudyDestinationFilter(django_filters.FilterSet):
+    country_code = django_filters.ChoiceFilter(choices=StudyDestination.COUNTRY_CHOICES)
+    program_level = django_filters.ChoiceFilter(
+        field_name="tuition_fees__program_level",
+        choices=TuitionTable.PROGRAM_LEVELS,
+        distinct=True,
+    )
+    scholarship_type = django_filters.ChoiceFilter(
+        choices=Scholarship.SCHOLARSHIP_TYPES,
+        method="filter_scholarship_type",
+    )
+    visa_type = django_filters.ChoiceFilter(
+        field_name="visa_requirements__visa_type",
+        choices=VisaRequirement.VISA_TYPES,
+        distinct=True,
+    )
+    intake_month = django_filters.CharFilter(method="filter_intake_month")
+
+    class Meta:
+        model = StudyDestination
+        fields = ["country_code", "program_level", "scholarship_type", "visa_type", "intake_month"]
+
+    def filter_scholarship_type(self, queryset, name, value):
+        return queryset.filter(
+            pk__in=Scholarship.objects.filter(is_active=True, scholarship_type=value).values("destination")
+        )
+
+    def filter_intake_month(self, queryset, name, value):
+        return queryset.filter(
+            pk__in=IntakeTable.objects.filter(is_main_intake=True, intake_month__iexact=value).values("destination")
+        )
+
+
+# facet name -> (model, value field, extra filters, labels)
+FACETS = {
+    "country_code": (StudyDestination, "country_code", {}, dict(StudyDestination.COUNTRY_CHOICES)),
+    "program_level": (TuitionTable, "program_level", {}, dict(TuitionTable.PROGRAM_LEVELS)),
+    "scholarship_type": (Scholarship, "scholarship_type", {"is_active": True}, dict(Scholarship.SCHOLARSHIP_TYPES)),
+    "visa_type": (VisaRequirement, "visa_type", {}, dict(VisaRequirement.VISA_TYPES)),
+    "intake_month": (IntakeTable, "intake_month", {"is_main_intake": True}, {}),
+}
+
+
+def facet_counts(destinations):
+    """
+    Number of destinations in the destinations queryset per value of every
+    facet, as {facet: {value: count}}. All facets are counted in a single
+    UNION ALL query over the (already filtered) destination ids.
+    """
+    destination_ids = destinations.order_by().values("pk")
+    parts = []
+    for facet, (model, field, extra, _labels) in FACETS.items():
+        if model is StudyDestination:
+            rows = model.objects.filter(pk__in=destination_ids)
+            counted = "pk"
+        else:
+            rows = model.objects.filter(destination__in=destination_ids, **extra)
+            counted = "destination"
+        parts.append(
+            rows.order_by()
+            .values(value=F(field))
+            .annotate(facet=Value(facet), count=Count(counted, distinct=True))
+            .values_list("facet", "value", "count")
+        )
+
+    counts = {facet: {} for facet in FACETS}
+    for facet, value, count in parts[0].union(*parts[1:], all=True):
+        counts[facet][value] = count
+    return counts
@@ -0,0 +1,83 @@
+# study_destinations/forms.py
+from django import forms
+
+from .models import TuitionTable, VisaRequirement
+from .parsers import CURRENCIES
+
+
+class TuitionComparisonForm(forms.Form):
+    program_level = forms.ChoiceField(
+        choices=TuitionTable.PROGRAM_LEVELS,
+        initial="UNDERGRADUATE",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    budget_min = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_digits=10,
+        decimal_places=2,
+        widget=forms.NumberInput(attrs={"class": "form-control", "placeholder": "Min (USD / year)"}),
+    )
+    budget_max = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_digits=10,
+        decimal_places=2,
+        widget=forms.NumberInput(attrs={"class": "form-control", "placeholder": "Max (USD / year)"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        budget_min = cleaned_data.get("budget_min")
+        budget_max = cleaned_data.get("budget_max")
+
+        if budget_min is not None and budget_max is not None and budget_min > budget_max:
+            self.add_error("budget_max", "Maximum budget must be greater than the minimum")
+
+        return cleaned_data
+
+
+class VisaComparisonForm(forms.Form):
+    SORT_CHOICES = [
+        ("fastest", "Fastest processing"),
+        ("cheapest", "Lowest visa fee"),
+        ("lowest_funds", "Lowest funds required"),
+    ]
+    CURRENCY_CHOICES = [("", "Any currency")] + [(code, code) for code in sorted(set(CURRENCIES.values()))]
+
+    visa_type = forms.ChoiceField(
+        choices=VisaRequirement.VISA_TYPES,
+        initial="STUDENT",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    sort = forms.ChoiceField(
+        choices=SORT_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    max_processing_weeks = forms.IntegerField(
+        required=False,
+        min_value=1,
+        widget=forms.NumberInput(attrs={"class": "form-control", "placeholder": "Max processing (weeks)"}),
+    )
+    currency = forms.ChoiceField(
+        choices=CURRENCY_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    max_fee = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_digits=12,
+        decimal_places=2,
+        widget=forms.NumberInput(attrs={"class": "form-control", "placeholder": "Max visa fee"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        cleaned_data["sort"] = cleaned_data.get("sort") or "fastest"
+
+        if cleaned_data.get("max_fee") is not None and not cleaned_data.get("currency"):
+            self.add_error("currency", "Choose a currency to filter by visa fee")
+
+        return cleaned_data
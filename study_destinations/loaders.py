@@ -0,0 +1,52 @@
+# study_destinations/loaders.py
+from django.db.models import Prefetch
+
+from .models import (
+    DestinationSection,
+    IntakeTable,
+    PostStudyWork,
+    Scholarship,
+    StudyDestination,
+    TuitionTable,
+    VisaRequirement,
+)
+
+# (related_name, queryset, attribute the evaluated list is stored on)
+DESTINATION_PREFETCHES = [
+    ("sections", DestinationSection.objects.filter(is_active=True).order_by("order"), "active_sections"),
+    ("tuition_fees", TuitionTable.objects.order_by("order"), "ordered_tuition_fees"),
+    ("intakes", IntakeTable.objects.order_by("order"), "ordered_intakes"),
+    ("scholarships", Scholarship.objects.filter(is_active=True).order_by("order"), "active_scholarships"),
+    ("visa_requirements", VisaRequirement.objects.order_by("order"), "ordered_visa_requirements"),
+    ("post_study_work", PostStudyWork.objects.order_by("order"), "ordered_post_study_work"),
+]
+
+
+def destination_graph_queryset(queryset=None):
+    """Published destinations with every child table prefetched (one query per table)"""
+    if queryset is None:
+        queryset = StudyDestination.objects.filter(is_published=True)
+    return queryset.prefetch_related(
+        *[Prefetch(lookup, queryset=child_qs, to_attr=to_attr) for lookup, child_qs, to_attr in DESTINATION_PREFETCHES]
+    )
+
+
+def destination_context(destination):
+    """Template context for a destination loaded through destination_graph_queryset"""
+    return {
+        "sections": destination.active_sections,
+        "tuition_fees": destination.ordered_tuition_fees,
+        "intakes": destination.ordered_intakes,
+        "scholarships": destination.active_scholarships,
+        "visa_requirements": destination.ordered_visa_requirements,
+        "post_study_work": destination.ordered_post_study_work,
+    }
+
+
+def load_destination(slug):
+    """
+    Load a published destination and all of its child rows in a fixed number
+    of queries (1 for the destination + 1 per child table), regardless of how
+    many child rows exist.
+    """
+    return destination_graph_queryset().get(slug=slug)
@@ -0,0 +1,20 @@
+# study_destinations/management/commands/backfill_visa_numbers.py
+from django.core.management.base import BaseCommand
+
+from study_destinations.models import VisaRequirement
+
+
+class Command(BaseCommand):
+    help = "Parses processing times, visa fees and financial requirements into their numeric columns"
+
+    def handle(self, *args, **kwargs):
+        visas = list(VisaRequirement.objects.all())
+        for visa in visas:
+            visa.derive_numeric_fields()
+        # bulk_update skips save() and its signals; only derived columns change
+        VisaRequirement.objects.bulk_update(visas, VisaRequirement.numeric_fields, batch_size=200)
+
+        unparsed = sum(1 for visa in visas if visa.processing_days_min is None or visa.visa_fee_min is None)
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled {len(visas)} visa requirements ({unparsed} with unreadable values)")
+        )
@@ -0,0 +1,38 @@
+# study_destinations/management/commands/destinations_export.py
+from functools import partial
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from study_destinations.transfer import export_csv, export_json
+
+
+class Command(BaseCommand):
+    help = "Exports destinations with all of their child tables as JSON or a directory of CSV files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Only export these destinations (default: all)")
+        parser.add_argument("--format", choices=["json", "csv"], default="json")
+        parser.add_argument(
+            "--output",
+            help="File to write JSON to (default: stdout), or the directory for CSV files",
+        )
+
+    def handle(self, *args, **options):
+        slugs = options["slugs"] or None
+        output = options["output"]
+
+        if options["format"] == "csv":
+            if not output:
+                raise CommandError("--output is required for CSV exports")
+            counts = export_csv(output, slugs)
+            self.stderr.write(self.style.SUCCESS(f"Exported {counts['destinations']} destinations to {output}"))
+            return
+
+        if output:
+            with open(output, "w", encoding="utf-8") as fh:
+                count = export_json(fh, slugs)
+        else:
+            # OutputWrapper appends a newline to every write unless told otherwise
+            count = export_json(SimpleNamespace(write=partial(self.stdout.write, ending="")), slugs)
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} destinations"))
@@ -0,0 +1,44 @@
+# study_destinations/management/commands/destinations_import.py
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from study_destinations.transfer import ImportValidationError, import_records, read_csv, read_json
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports destinations with all of their child tables from a JSON file or a directory of CSV files "
+        "written by destinations_export. Every row is validated before anything is written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON file or CSV directory")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and report changes without saving")
+        parser.add_argument(
+            "--no-prune",
+            action="store_true",
+            help="Keep child rows that are missing from the file (by default they are deleted)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist")
+
+        try:
+            records = read_csv(path) if os.path.isdir(path) else read_json(path)
+            summary = import_records(records, prune=not options["no_prune"], dry_run=options["dry_run"])
+        except ImportValidationError as e:
+            for error in e.errors:
+                self.stderr.write(error)
+            raise CommandError(f"Import aborted: {e}")
+        except ValueError as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        for table, counts in summary.items():
+            self.stdout.write(
+                f"{table}: {counts['created']} created, {counts['updated']} updated, {counts['deleted']} deleted"
+            )
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(records)} destinations"))
@@ -0,0 +1,16 @@
+# study_destinations/management/commands/rebuild_destination_snapshots.py
+from django.core.management.base import BaseCommand
+
+from study_destinations.cache import invalidate_all_destinations
+from study_destinations.related import rebuild_related_index
+from study_destinations.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the related-destination index and the precomputed snapshot of every published study destination"
+
+    def handle(self, *args, **kwargs):
+        rebuild_related_index()
+        snapshots = rebuild_snapshots()
+        invalidate_all_destinations()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(snapshots)} destination snapshots"))
@@ -0,0 +1,12 @@
+# study_destinations/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from study_destinations.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index over all study destination content"
+
+    def handle(self, *args, **kwargs):
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} rows"))
@@ -0,0 +1,15 @@
+# study_destinations/management/commands/refresh_deadline_dates.py
+from django.core.management.base import BaseCommand
+
+from study_destinations.tasks import refresh_deadlines
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-parses intake and scholarship deadlines so passed dates roll forward. "
+        "Celery beat runs this daily; the command runs it now."
+    )
+
+    def handle(self, *args, **kwargs):
+        changed = refresh_deadlines()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed deadline dates ({changed} rows changed)"))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("study_destinations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DestinationSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("slug", models.SlugField(max_length=100, unique=True)),
+                ("document", models.JSONField()),
+                ("built_at", models.DateTimeField(auto_now=True)),
+                (
+                    "destination",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot",
+                        to="study_destinations.studydestination",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Destination Snapshot",
+                "verbose_name_plural": "Destination Snapshots",
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def build_search_index(apps, schema_editor):
+    from study_destinations.search import rebuild_index
+
+    rebuild_index(apps=apps, connection=schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from study_destinations.search import SEARCH_TABLE, is_supported
+
+    if is_supported(schema_editor.connection):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("study_destinations", "0002_destinationsnapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("study_destinations", "0003_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tuitiontable",
+            index=models.Index(
+                fields=["program_level", "tuition_fee_min", "tuition_fee_max", "destination"],
+                name="tuition_level_fee_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+# model -> (rich-text fields, {excerpt field: source field}), as of this migration
+RICH_TEXT_FIELDS = {
+    "studydestination": (["intro_description"], {"intro_excerpt": "intro_description"}),
+    "destinationsection": (["section_content"], {}),
+    "scholarship": (["eligibility"], {}),
+    "visarequirement": (["documents_required", "eligibility_criteria"], {}),
+    "poststudywork": (["eligibility", "application_process", "work_rights", "pathway_to_pr"], {}),
+}
+
+
+def render_existing_rich_text(apps, schema_editor):
+    from study_destinations.richtext import make_excerpt, render_rich_text
+
+    for model_name, (fields, excerpts) in RICH_TEXT_FIELDS.items():
+        model = apps.get_model("study_destinations", model_name)
+        rows = list(model.objects.all())
+        for row in rows:
+            for field in fields:
+                setattr(row, f"{field}_html", render_rich_text(getattr(row, field)))
+            for excerpt_field, source in excerpts.items():
+                setattr(row, excerpt_field, make_excerpt(getattr(row, source)))
+        model.objects.bulk_update(rows, [f"{field}_html" for field in fields] + list(excerpts), batch_size=200)
+
+    # Snapshots are rebuilt from the stored variants on the next request
+    apps.get_model("study_destinations", "DestinationSnapshot").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("study_destinations", "0004_tuition_level_fee_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="destinationsection",
+            name="section_content_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="poststudywork",
+            name="application_process_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="poststudywork",
+            name="eligibility_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="poststudywork",
+            name="pathway_to_pr_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="poststudywork",
+            name="work_rights_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="scholarship",
+            name="eligibility_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studydestination",
+            name="intro_description_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studydestination",
+            name="intro_excerpt",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="documents_required_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="eligibility_criteria_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_existing_rich_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_related_index(apps, schema_editor):
+    from study_destinations.related import rebuild_related_index
+
+    rebuild_related_index(apps=apps)
+    # Snapshots are rebuilt with the new related destinations on the next request
+    apps.get_model("study_destinations", "DestinationSnapshot").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("study_destinations", "0005_rendered_rich_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedDestination",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("score", models.FloatField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "destination",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_links",
+                        to="study_destinations.studydestination",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="study_destinations.studydestination",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Related Destination",
+                "verbose_name_plural": "Related Destinations",
+                "ordering": ["destination", "rank"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="relateddestination",
+            constraint=models.UniqueConstraint(fields=("destination", "related"), name="unique_related_destination"),
+        ),
+        migrations.RunPython(build_related_index, migrations.RunPython.noop),
+    ]
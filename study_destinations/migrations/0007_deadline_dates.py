@@ -0,0 +1,53 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+
+def parse_existing_deadlines(apps, schema_editor):
+    from study_destinations.parsers import parse_deadline, parse_intake_date
+
+    IntakeTable = apps.get_model("study_destinations", "IntakeTable")
+    intakes = list(IntakeTable.objects.all())
+    for intake in intakes:
+        intake.intake_date = parse_intake_date(intake.intake_month)
+        intake.application_deadline_date = parse_deadline(intake.application_deadline, intake.intake_date)
+        intake.visa_deadline_date = parse_deadline(intake.visa_deadline, intake.intake_date)
+    IntakeTable.objects.bulk_update(
+        intakes, ["intake_date", "application_deadline_date", "visa_deadline_date"], batch_size=200
+    )
+
+    Scholarship = apps.get_model("study_destinations", "Scholarship")
+    scholarships = list(Scholarship.objects.all())
+    for scholarship in scholarships:
+        scholarship.application_deadline_date = parse_deadline(scholarship.application_deadline)
+    Scholarship.objects.bulk_update(scholarships, ["application_deadline_date"], batch_size=200)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("study_destinations", "0006_related_destination"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="intaketable",
+            name="application_deadline_date",
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="intaketable",
+            name="intake_date",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="intaketable",
+            name="visa_deadline_date",
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="scholarship",
+            name="application_deadline_date",
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(parse_existing_deadlines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("study_destinations", "0007_deadline_dates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="visarequirement",
+            name="financial_requirement_currency",
+            field=models.CharField(blank=True, editable=False, max_length=3),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="financial_requirement_max",
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="financial_requirement_min",
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="processing_days_max",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="processing_days_min",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="visa_fee_currency",
+            field=models.CharField(blank=True, editable=False, max_length=3),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="visa_fee_max",
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name="visarequirement",
+            name="visa_fee_min",
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="visarequirement",
+            index=models.Index(fields=["visa_type", "processing_days_min"], name="visa_type_processing_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visarequirement",
+            index=models.Index(fields=["visa_type", "visa_fee_currency", "visa_fee_min"], name="visa_type_fee_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visarequirement",
+            index=models.Index(
+                fields=["visa_type", "financial_requirement_currency", "financial_requirement_min"],
+                name="visa_type_funds_idx",
+            ),
+        ),
+    ]
@@ -4,8 +4,11 @@ from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
 
+from .parsers import parse_amount, parse_deadline, parse_duration_days, parse_intake_date
+from .richtext import RenderedRichTextMixin
 
-class StudyDestination(models.Model):
+
+class StudyDestination(RenderedRichTextMixin, models.Model):
     COUNTRY_CHOICES = [
         ("UK", "United Kingdom"),
         ("USA", "United States"),
@@ -25,6 +28,9 @@ class StudyDestination(models.Model):
     banner_image = models.ImageField(upload_to="study_destinations/banners/")
     intro_title = models.CharField(max_length=200)
     intro_description = RichTextField()
+    # Sanitized copies written on save (see RenderedRichTextMixin)
+    intro_description_html = models.TextField(blank=True, editable=False)
+    intro_excerpt = models.CharField(max_length=200, blank=True, editable=False)
 
     # Quick facts
     quick_fact_1 = models.CharField(max_length=100, blank=True)
@@ -44,6 +50,9 @@ class StudyDestination(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    rich_text_fields = ("intro_description",)
+    excerpt_fields = {"intro_excerpt": "intro_description"}
+
     class Meta:
         ordering = ["order", "country_name"]
         verbose_name = "Study Destination"
@@ -75,7 +84,7 @@ class StudyDestination(models.Model):
         return flag_map.get(self.country_code, "🌍")
 
 
-class DestinationSection(models.Model):
+class DestinationSection(RenderedRichTextMixin, models.Model):
     SECTION_TYPES = [
         ("WHY_STUDY", "Why Study Here"),
         ("EDUCATION_SYSTEM", "Education System"),
@@ -93,9 +102,12 @@ class DestinationSection(models.Model):
     section_title = models.CharField(max_length=200)
     section_type = models.CharField(max_length=50, choices=SECTION_TYPES, default="OTHER")
     section_content = RichTextField()
+    section_content_html = models.TextField(blank=True, editable=False)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
+    rich_text_fields = ("section_content",)
+
     class Meta:
         ordering = ["order", "section_title"]
 
@@ -124,6 +136,13 @@ class TuitionTable(models.Model):
 
     class Meta:
         ordering = ["order", "program_level", "program_name"]
+        indexes = [
+            # Serves the cross-destination comparison: level equality, fee range scan
+            models.Index(
+                fields=["program_level", "tuition_fee_min", "tuition_fee_max", "destination"],
+                name="tuition_level_fee_idx",
+            ),
+        ]
         verbose_name = "Tuition Fee"
         verbose_name_plural = "Tuition Fees"
 
@@ -140,14 +159,34 @@ class IntakeTable(models.Model):
     is_main_intake = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
 
+    # Parsed from the text fields on save (see derive_deadline_dates)
+    intake_date = models.DateField(null=True, blank=True, editable=False)
+    application_deadline_date = models.DateField(null=True, blank=True, editable=False, db_index=True)
+    visa_deadline_date = models.DateField(null=True, blank=True, editable=False, db_index=True)
+
+    deadline_date_fields = ("intake_date", "application_deadline_date", "visa_deadline_date")
+
     class Meta:
         ordering = ["order", "intake_name"]
 
     def __str__(self):
         return f"{self.destination.country_name} - {self.intake_name}"
 
+    def derive_deadline_dates(self, today=None):
+        """Refresh the parsed date columns; returns the names of the fields written"""
+        self.intake_date = parse_intake_date(self.intake_month, today)
+        self.application_deadline_date = parse_deadline(self.application_deadline, self.intake_date, today)
+        self.visa_deadline_date = parse_deadline(self.visa_deadline, self.intake_date, today)
+        return list(self.deadline_date_fields)
+
+    def save(self, *args, **kwargs):
+        written = self.derive_deadline_dates()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | set(written)
+        super().save(*args, **kwargs)
+
 
-class Scholarship(models.Model):
+class Scholarship(RenderedRichTextMixin, models.Model):
     SCHOLARSHIP_TYPES = [
         ("MERIT", "Merit-based"),
         ("NEED", "Need-based"),
@@ -163,19 +202,37 @@ class Scholarship(models.Model):
     scholarship_type = models.CharField(max_length=50, choices=SCHOLARSHIP_TYPES, default="MERIT")
     amount = models.CharField(max_length=200, help_text="e.g., $10,000, Full Tuition, 50% off")
     eligibility = RichTextField()
+    eligibility_html = models.TextField(blank=True, editable=False)
     application_deadline = models.CharField(max_length=100, blank=True)
     website_link = models.URLField(blank=True)
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0)
 
+    # Parsed from application_deadline on save
+    application_deadline_date = models.DateField(null=True, blank=True, editable=False, db_index=True)
+
+    deadline_date_fields = ("application_deadline_date",)
+    rich_text_fields = ("eligibility",)
+
     class Meta:
         ordering = ["order", "scholarship_title"]
 
     def __str__(self):
         return f"{self.destination.country_name} - {self.scholarship_title}"
 
+    def derive_deadline_dates(self, today=None):
+        """Refresh the parsed date column; returns the names of the fields written"""
+        self.application_deadline_date = parse_deadline(self.application_deadline, today=today)
+        return list(self.deadline_date_fields)
+
+    def save(self, *args, **kwargs):
+        written = self.derive_deadline_dates()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | set(written)
+        super().save(*args, **kwargs)
 
-class VisaRequirement(models.Model):
+
+class VisaRequirement(RenderedRichTextMixin, models.Model):
     VISA_TYPES = [
         ("STUDENT", "Student Visa"),
         ("WORK_PERMIT", "Work Permit"),
@@ -191,28 +248,88 @@ class VisaRequirement(models.Model):
     visa_fee = models.CharField(max_length=100, help_text="e.g., $350")
     financial_requirement = models.CharField(max_length=200, help_text="e.g., Proof of $15,000 minimum")
     documents_required = RichTextField()
+    documents_required_html = models.TextField(blank=True, editable=False)
     eligibility_criteria = RichTextField()
+    eligibility_criteria_html = models.TextField(blank=True, editable=False)
     order = models.IntegerField(default=0)
 
+    # Parsed from the text fields on save (see derive_numeric_fields)
+    processing_days_min = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    processing_days_max = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    visa_fee_min = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    visa_fee_max = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    visa_fee_currency = models.CharField(max_length=3, blank=True, editable=False)
+    financial_requirement_min = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True, editable=False
+    )
+    financial_requirement_max = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True, editable=False
+    )
+    financial_requirement_currency = models.CharField(max_length=3, blank=True, editable=False)
+
+    numeric_fields = (
+        "processing_days_min",
+        "processing_days_max",
+        "visa_fee_min",
+        "visa_fee_max",
+        "visa_fee_currency",
+        "financial_requirement_min",
+        "financial_requirement_max",
+        "financial_requirement_currency",
+    )
+    rich_text_fields = ("documents_required", "eligibility_criteria")
+
     class Meta:
         ordering = ["order", "visa_type"]
+        indexes = [
+            # Serve the visa comparison sorts within a visa type
+            models.Index(fields=["visa_type", "processing_days_min"], name="visa_type_processing_idx"),
+            models.Index(fields=["visa_type", "visa_fee_currency", "visa_fee_min"], name="visa_type_fee_idx"),
+            models.Index(
+                fields=["visa_type", "financial_requirement_currency", "financial_requirement_min"],
+                name="visa_type_funds_idx",
+            ),
+        ]
         verbose_name = "Visa Requirement"
         verbose_name_plural = "Visa Requirements"
 
     def __str__(self):
         return f"{self.destination.country_name} - {self.visa_name}"
 
+    def derive_numeric_fields(self):
+        """Refresh the parsed numeric columns; returns the names of the fields written"""
+        self.processing_days_min, self.processing_days_max = parse_duration_days(self.processing_time)
+        self.visa_fee_min, self.visa_fee_max, self.visa_fee_currency = parse_amount(self.visa_fee)
+        (
+            self.financial_requirement_min,
+            self.financial_requirement_max,
+            self.financial_requirement_currency,
+        ) = parse_amount(self.financial_requirement)
+        return list(self.numeric_fields)
+
+    def save(self, *args, **kwargs):
+        written = self.derive_numeric_fields()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | set(written)
+        super().save(*args, **kwargs)
+
 
-class PostStudyWork(models.Model):
+class PostStudyWork(RenderedRichTextMixin, models.Model):
     destination = models.ForeignKey(StudyDestination, on_delete=models.CASCADE, related_name="post_study_work")
     visa_name = models.CharField(max_length=200, help_text="e.g., Post-Study Work Visa (PSW)")
     duration = models.CharField(max_length=100, help_text="e.g., 2 years, 3 years")
     eligibility = RichTextField(help_text="Who can apply?")
+    eligibility_html = models.TextField(blank=True, editable=False)
     application_process = RichTextField()
+    application_process_html = models.TextField(blank=True, editable=False)
     work_rights = RichTextField(help_text="What type of work is allowed?")
+    work_rights_html = models.TextField(blank=True, editable=False)
     pathway_to_pr = RichTextField(blank=True, help_text="Pathway to Permanent Residency")
+    pathway_to_pr_html = models.TextField(blank=True, editable=False)
     order = models.IntegerField(default=0)
 
+    rich_text_fields = ("eligibility", "application_process", "work_rights", "pathway_to_pr")
+
     class Meta:
         ordering = ["order"]
         verbose_name = "Post-Study Work Option"
@@ -220,3 +337,47 @@ class PostStudyWork(models.Model):
 
     def __str__(self):
         return f"{self.destination.country_name} - {self.visa_name}"
+
+
+class DestinationSnapshot(models.Model):
+    """
+    Render-ready copy of a published destination and all of its active child
+    rows, rebuilt whenever anything under the destination changes so the
+    detail page can be served from a single row.
+    """
+
+    destination = models.OneToOneField(StudyDestination, on_delete=models.CASCADE, related_name="snapshot")
+    slug = models.SlugField(unique=True, max_length=100)
+    document = models.JSONField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Destination Snapshot"
+        verbose_name_plural = "Destination Snapshots"
+
+    def __str__(self):
+        return f"Snapshot - {self.slug}"
+
+
+class RelatedDestination(models.Model):
+    """
+    Precomputed "similar destinations" for a published destination, ranked
+    by similarity score. Rebuilt from the destinations' tuition, programs,
+    intakes, scholarships and post-study work whenever content changes.
+    """
+
+    destination = models.ForeignKey(StudyDestination, on_delete=models.CASCADE, related_name="related_links")
+    related = models.ForeignKey(StudyDestination, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["destination", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["destination", "related"], name="unique_related_destination"),
+        ]
+        verbose_name = "Related Destination"
+        verbose_name_plural = "Related Destinations"
+
+    def __str__(self):
+        return f"{self.destination.country_name} - {self.related.country_name}"
@@ -0,0 +1,218 @@
+# study_destinations/parsers.py
+"""
+Parsing of the free text entered in the admin into values that can be
+stored, indexed and queried: intake months and deadlines ("September",
+"15 January 2025", "3-6 months before intake") into dates, and visa
+processing times and fees ("3-8 weeks", "Main Applicant: 60€-90€") into
+numbers.
+
+Anything that can't be read confidently ("Rolling", "Varies", "-") parses
+to None rather than a guess.
+"""
+import calendar
+import datetime
+import re
+from decimal import Decimal
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+
+_MONTH = r"(?P<month>{})\.?".format("|".join(sorted(MONTHS, key=len, reverse=True)))
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?P<year>\d{4})"
+
+# Tried in order; the first usable match wins
+_ABSOLUTE_PATTERNS = [
+    re.compile(r"\b(?P<year>\d{4})-(?P<month_number>\d{1,2})-(?P<day>\d{1,2})\b"),
+    # Day first, as written in Pakistan and the UK
+    re.compile(r"\b(?P<day>\d{1,2})[/.](?P<month_number>\d{1,2})[/.](?P<year>\d{4})\b"),
+    re.compile(rf"\b{_DAY}(?:\s+of)?\s+{_MONTH}(?:,?\s+{_YEAR})?\b", re.IGNORECASE),
+    re.compile(rf"\b{_MONTH}\s+{_DAY}(?:,?\s+{_YEAR})?\b", re.IGNORECASE),
+    re.compile(
+        rf"\b(?P<position>early|mid|late|end of|beginning of|start of)[\s-]+{_MONTH}(?:\s+{_YEAR})?\b", re.IGNORECASE
+    ),
+    re.compile(rf"\b{_MONTH}(?:\s+{_YEAR})?\b", re.IGNORECASE),
+]
+_RELATIVE_PATTERN = re.compile(
+    r"(?P<low>\d+)(?:\s*(?:-|–|to)\s*(?P<high>\d+))?\s*(?P<unit>day|week|month)s?\s+(?:before|prior to|ahead of)\b",
+    re.IGNORECASE,
+)
+
+
+def _safe_date(year, month, day):
+    """date(year, month, day) with day clamped to the month's length"""
+    return datetime.date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def _next_occurrence(month, day, after):
+    """First date with the given month and day on or after `after`"""
+    candidate = _safe_date(after.year, month, day)
+    if candidate < after:
+        candidate = _safe_date(after.year + 1, month, day)
+    return candidate
+
+
+def _day_for_position(position, year, month):
+    position = (position or "").lower()
+    if position == "mid":
+        return 15
+    if position in ("late", "end of"):
+        return calendar.monthrange(year, month)[1]
+    return 1
+
+
+def parse_month(text):
+    """Number of the first month named in text ("October/ November" -> 10), or None"""
+    match = re.search(rf"\b{_MONTH}", text or "", re.IGNORECASE)
+    return MONTHS[match.group("month").lower()] if match else None
+
+
+def parse_intake_date(intake_month, today=None):
+    """Start of the next intake in the named month, on or after today"""
+    month = parse_month(intake_month)
+    if month is None:
+        return None
+    return _next_occurrence(month, 1, today or datetime.date.today())
+
+
+def parse_absolute_date(text, today=None):
+    """
+    A calendar date written in text. Dates without a year are taken as the
+    next occurrence on or after today.
+    """
+    today = today or datetime.date.today()
+    matches = (match for pattern in _ABSOLUTE_PATTERNS for match in pattern.finditer(text or ""))
+    for match in matches:
+        parts = match.groupdict()
+        is_may = (parts.get("month") or "").lower() == "may"
+        if is_may and not (parts.get("day") or parts.get("year") or parts.get("position")):
+            # "Students may apply" is not a date; "May 2027" and "late May" are
+            continue
+        month = int(parts["month_number"]) if parts.get("month_number") else MONTHS[parts["month"].lower()]
+        if not 1 <= month <= 12:
+            continue
+        year = int(parts["year"]) if parts.get("year") else today.year
+        if parts.get("day"):
+            day = int(parts["day"])
+        else:
+            day = _day_for_position(parts.get("position"), year, month)
+        if not 1 <= day <= 31:
+            continue
+        if parts.get("year"):
+            return _safe_date(year, month, day)
+        return _next_occurrence(month, day, today)
+    return None
+
+
+def parse_relative_deadline(text, reference):
+    """
+    A deadline given relative to the intake ("3-6 months before intake").
+    For a range, the shorter offset is used: it is the last date an
+    application is still accepted.
+    """
+    match = _RELATIVE_PATTERN.search(text or "")
+    if not match or reference is None:
+        return None
+    amount = int(match.group("low"))
+    if match.group("high"):
+        amount = min(amount, int(match.group("high")))
+    unit = match.group("unit").lower()
+    if unit == "day":
+        return reference - datetime.timedelta(days=amount)
+    if unit == "week":
+        return reference - datetime.timedelta(weeks=amount)
+    month_index = reference.year * 12 + reference.month - 1 - amount
+    return _safe_date(month_index // 12, month_index % 12 + 1, reference.day)
+
+
+def parse_deadline(text, intake_date=None, today=None):
+    """
+    Date of a free-text deadline: relative to intake_date when phrased that
+    way, otherwise a calendar date. Returns None when text can't be read.
+    """
+    if not text or not re.search(r"\w", text):
+        return None
+    if _RELATIVE_PATTERN.search(text):
+        return parse_relative_deadline(text, intake_date)
+    return parse_absolute_date(text, today)
+
+
+DURATION_UNIT_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_DURATION_PATTERN = re.compile(
+    rf"(?P<low>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<high>{_NUMBER}))?\s*"
+    r"(?:working\s+|business\s+|calendar\s+)?(?P<unit>day|week|month|year)s?\b",
+    re.IGNORECASE,
+)
+
+# Currency markers, longest first so "NZ$" wins over "$"
+CURRENCIES = {
+    "nz$": "NZD",
+    "us$": "USD",
+    "a$": "AUD",
+    "c$": "CAD",
+    "$": "USD",
+    "£": "GBP",
+    "€": "EUR",
+    "usd": "USD",
+    "gbp": "GBP",
+    "eur": "EUR",
+    "euros": "EUR",
+    "euro": "EUR",
+    "cad": "CAD",
+    "aud": "AUD",
+    "nzd": "NZD",
+    "pkr": "PKR",
+    "rs.": "PKR",
+    "rs": "PKR",
+}
+# Codes may be glued to the number ("2000AUD") but not part of a word
+_CURRENCY_PATTERN = re.compile(
+    "|".join(rf"(?<![a-z]){re.escape(marker)}(?![a-z])" for marker in sorted(CURRENCIES, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+_AMOUNT = rf"(?:{_NUMBER})(?:\s*k\b)?"
+_AMOUNT_PATTERN = re.compile(rf"(?P<a>{_AMOUNT})(?:\s*(?P<op>[-–+]|to)\s*(?P<b>{_AMOUNT}))?", re.IGNORECASE)
+
+
+def _number(text):
+    text = text.strip().lower()
+    multiplier = 1000 if text.endswith("k") else 1
+    return Decimal(text.rstrip("k").strip().replace(",", "")) * multiplier
+
+
+def parse_duration_days(text):
+    """
+    (min, max) length in days of a duration such as "3-8 weeks" or
+    "2 Months" (months count as 30 days), or (None, None)
+    """
+    match = _DURATION_PATTERN.search(text or "")
+    if not match:
+        return None, None
+    days = DURATION_UNIT_DAYS[match.group("unit").lower()]
+    low = _number(match.group("low"))
+    high = _number(match.group("high")) if match.group("high") else low
+    return int(low * days), int(high * days)
+
+
+def parse_amount(text):
+    """
+    (min, max, currency) of the first amount in text: "$350", "60€-90€" (a
+    range) or "9000+3000PKR" (a sum). Only the first amount is read, so
+    "Main Applicant: 450€, Spouse: 530€" is the main applicant's fee.
+    Returns (None, None, "") when there is no amount.
+    """
+    text = text or ""
+    currency_match = _CURRENCY_PATTERN.search(text)
+    currency = CURRENCIES[currency_match.group(0).lower()] if currency_match else ""
+    match = _AMOUNT_PATTERN.search(_CURRENCY_PATTERN.sub(" ", text))
+    if not match:
+        return None, None, ""
+    low = _number(match.group("a"))
+    if not match.group("op"):
+        return low, low, currency
+    other = _number(match.group("b"))
+    if match.group("op") == "+":
+        return low + other, low + other, currency
+    return min(low, other), max(low, other), currency
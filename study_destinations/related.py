@@ -0,0 +1,144 @@
+# study_destinations/related.py
+"""
+Related-destination index.
+
+Every published destination is described by a small feature set (tuition
+range, program levels, main intake months, scholarship types, post-study
+work availability); pairwise similarity over those features picks the top
+few related destinations, which are stored in RelatedDestination so pages
+never compute them at request time.
+"""
+from collections import defaultdict
+from functools import partial
+
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Max, Min
+
+RELATED_DESTINATIONS_LIMIT = 3
+
+# feature -> weight in the similarity score (weights sum to 1)
+WEIGHTS = {
+    "tuition": 0.3,
+    "program_levels": 0.25,
+    "intake_months": 0.15,
+    "scholarship_types": 0.15,
+    "post_study_work": 0.15,
+}
+
+
+def _jaccard(a, b):
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _range_overlap(a, b):
+    """Overlap of two (low, high) fee ranges relative to their combined span"""
+    if a is None or b is None:
+        return 0.0
+    low, high = max(a[0], b[0]), min(a[1], b[1])
+    span = max(a[1], b[1]) - min(a[0], b[0])
+    if high < low:
+        return 0.0
+    if not span:
+        return 1.0
+    return float((high - low) / span)
+
+
+def destination_features(apps=django_apps):
+    """{destination id: features} for every published destination, in one query per child table"""
+    model = partial(apps.get_model, "study_destinations")
+    published = model("StudyDestination").objects.filter(is_published=True)
+    ids = list(published.order_by("order", "country_name").values_list("pk", flat=True))
+    features = {
+        pk: {
+            "tuition": None,
+            "program_levels": set(),
+            "intake_months": set(),
+            "scholarship_types": set(),
+            "post_study_work": False,
+        }
+        for pk in ids
+    }
+
+    tuition = model("TuitionTable").objects.filter(destination__in=ids)
+    for row in (
+        tuition.order_by().values("destination").annotate(low=Min("tuition_fee_min"), high=Max("tuition_fee_max"))
+    ):
+        features[row["destination"]]["tuition"] = (row["low"], row["high"])
+    for destination_id, level in tuition.order_by().values_list("destination", "program_level").distinct():
+        features[destination_id]["program_levels"].add(level)
+    intakes = model("IntakeTable").objects.filter(destination__in=ids, is_main_intake=True)
+    for destination_id, month in intakes.values_list("destination", "intake_month"):
+        features[destination_id]["intake_months"].add(month.strip().lower())
+    scholarships = model("Scholarship").objects.filter(destination__in=ids, is_active=True)
+    for destination_id, scholarship_type in scholarships.values_list("destination", "scholarship_type").distinct():
+        features[destination_id]["scholarship_types"].add(scholarship_type)
+    post_study_work = model("PostStudyWork").objects.filter(destination__in=ids)
+    for destination_id in post_study_work.values_list("destination", flat=True).distinct():
+        features[destination_id]["post_study_work"] = True
+    return features
+
+
+def similarity(a, b):
+    """Weighted similarity in [0, 1] between two destinations' features"""
+    return (
+        WEIGHTS["tuition"] * _range_overlap(a["tuition"], b["tuition"])
+        + WEIGHTS["program_levels"] * _jaccard(a["program_levels"], b["program_levels"])
+        + WEIGHTS["intake_months"] * _jaccard(a["intake_months"], b["intake_months"])
+        + WEIGHTS["scholarship_types"] * _jaccard(a["scholarship_types"], b["scholarship_types"])
+        + WEIGHTS["post_study_work"] * (a["post_study_work"] == b["post_study_work"])
+    )
+
+
+def compute_related(features, limit=RELATED_DESTINATIONS_LIMIT):
+    """{destination id: [(related id, score), ...]} best first; ties keep the destinations' display order"""
+    related = {}
+    ids = list(features)
+    for pk in ids:
+        scores = [(other, similarity(features[pk], features[other])) for other in ids if other != pk]
+        # sorted() is stable, so equal scores stay in display order
+        related[pk] = sorted(scores, key=lambda item: -item[1])[:limit]
+    return related
+
+
+def rebuild_related_index(apps=django_apps):
+    """
+    Recompute the whole index (similarity is pairwise, so any change can move
+    other destinations' rankings). Returns the ids of destinations whose list
+    of related destinations changed.
+    """
+    RelatedDestination = apps.get_model("study_destinations", "RelatedDestination")
+    related = compute_related(destination_features(apps))
+
+    previous = defaultdict(list)
+    for destination_id, related_id in RelatedDestination.objects.order_by("destination", "rank").values_list(
+        "destination", "related"
+    ):
+        previous[destination_id].append(related_id)
+    changed = {
+        pk for pk in set(related) | set(previous) if [other for other, _ in related.get(pk, [])] != previous.get(pk, [])
+    }
+
+    with transaction.atomic():
+        RelatedDestination.objects.all().delete()
+        RelatedDestination.objects.bulk_create(
+            RelatedDestination(destination_id=pk, related_id=other, score=score, rank=rank)
+            for pk, links in related.items()
+            for rank, (other, score) in enumerate(links)
+        )
+    return changed
+
+
+def related_ids(destination_ids=None):
+    """{destination id: [related ids, best first]} read from the index"""
+    from .models import RelatedDestination
+
+    links = RelatedDestination.objects.order_by("destination", "rank")
+    if destination_ids is not None:
+        links = links.filter(destination__in=destination_ids)
+    result = defaultdict(list)
+    for destination_id, related_id in links.values_list("destination", "related"):
+        result[destination_id].append(related_id)
+    return result
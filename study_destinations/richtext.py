@@ -0,0 +1,210 @@
+# study_destinations/richtext.py
+"""
+Save-time processing of CKEditor content.
+
+Rich-text fields are run through an allowlist sanitizer that also minifies
+the markup, and the result is stored next to the source field so templates
+can emit it as-is. The same pass yields the plain text used for excerpts.
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 160
+
+# tag -> attributes kept on it
+ALLOWED_TAGS = {
+    "a": {"href", "title", "target", "rel"},
+    "b": set(),
+    "blockquote": set(),
+    "br": set(),
+    "caption": set(),
+    "code": set(),
+    "div": set(),
+    "em": set(),
+    "h2": set(),
+    "h3": set(),
+    "h4": set(),
+    "h5": set(),
+    "h6": set(),
+    "hr": set(),
+    "i": set(),
+    "img": {"src", "alt", "width", "height"},
+    "li": set(),
+    "ol": set(),
+    "p": set(),
+    "pre": set(),
+    "s": set(),
+    "span": set(),
+    "strong": set(),
+    "sub": set(),
+    "sup": set(),
+    "table": set(),
+    "tbody": set(),
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan"},
+    "thead": set(),
+    "tr": set(),
+    "u": set(),
+    "ul": set(),
+}
+VOID_TAGS = {"br", "hr", "img"}
+# Dropped together with everything inside them
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "noscript", "template", "svg", "math"}
+# Whitespace next to these never renders, so it's removed when minifying
+BLOCK_TAGS = {
+    "blockquote", "caption", "div", "h2", "h3", "h4", "h5", "h6", "hr", "li", "ol", "p",
+    "pre", "table", "tbody", "td", "th", "thead", "tr", "ul",
+}  # fmt: skip
+URL_ATTRIBUTES = {"href", "src"}
+ALLOWED_SCHEMES = {"http", "https", "mailto", "tel"}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SCHEME_RE = re.compile(r"^([a-z][a-z0-9+.-]*):", re.IGNORECASE)
+
+
+def _safe_url(value):
+    # Browsers ignore control characters and whitespace inside the scheme
+    compact = re.sub(r"[\x00-\x20]+", "", value)
+    match = _SCHEME_RE.match(compact)
+    return match is None or match.group(1).lower() in ALLOWED_SCHEMES
+
+
+class _RichTextParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.text = []
+        self.open_tags = []
+        self.dropping = 0
+        self.pre_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+
+        kept = []
+        for name, value in attrs:
+            if name not in ALLOWED_TAGS[tag] or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not _safe_url(value):
+                continue
+            kept.append(f' {name}="{escape(value)}"')
+        if tag == "a" and ("target", "_blank") in attrs:
+            kept = [attr for attr in kept if not attr.startswith(" rel=")] + [' rel="noopener noreferrer"']
+
+        if tag in BLOCK_TAGS:
+            self._trim_trailing_space()
+            self.text.append(" ")
+        self.parts.append(f"<{tag}{''.join(kept)}>")
+        if tag == "pre":
+            self.pre_depth += 1
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping -= 1
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Close anything left open inside tag so the output stays well formed
+        while self.open_tags:
+            current = self.open_tags.pop()
+            if current in BLOCK_TAGS:
+                self._trim_trailing_space()
+                self.text.append(" ")
+            self.parts.append(f"</{current}>")
+            if current == "pre":
+                self.pre_depth -= 1
+            if current == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.text.append(data)
+        if not self.pre_depth:
+            data = _WHITESPACE_RE.sub(" ", data)
+            if data == " " and (not self.parts or self._after_block()):
+                return
+            if self._after_block():
+                data = data.lstrip()
+        self.parts.append(escape(data, quote=False))
+
+    def _after_block(self):
+        last = self.parts[-1] if self.parts else ""
+        match = re.match(r"</?([a-z0-9]+)", last)
+        return bool(match) and last.startswith("<") and match.group(1) in BLOCK_TAGS
+
+    def _trim_trailing_space(self):
+        if self.parts and not self.parts[-1].startswith("<") and not self.pre_depth:
+            self.parts[-1] = self.parts[-1].rstrip()
+
+    def close(self):
+        super().close()
+        for tag in reversed(self.open_tags):
+            self.parts.append(f"</{tag}>")
+        self.open_tags = []
+
+
+def process_rich_text(value):
+    """(sanitized and minified HTML, plain text) for a rich-text field value"""
+    parser = _RichTextParser()
+    parser.feed(value or "")
+    parser.close()
+    html = "".join(parser.parts).strip()
+    text = _WHITESPACE_RE.sub(" ", "".join(parser.text)).strip()
+    return html, text
+
+
+def render_rich_text(value):
+    return process_rich_text(value)[0]
+
+
+def make_excerpt(value, length=EXCERPT_LENGTH):
+    """Plain-text excerpt of a rich-text value for cards and meta descriptions"""
+    return Truncator(process_rich_text(value)[1]).chars(length)
+
+
+class RenderedRichTextMixin:
+    """
+    Keeps a pre-rendered "<field>_html" column next to each field named in
+    rich_text_fields, plus the plain-text excerpts in excerpt_fields
+    (excerpt field -> source field), refreshed on every save. Code writing
+    rows without save() (bulk_create, update) must call render_rich_text().
+    """
+
+    rich_text_fields = ()
+    excerpt_fields = {}
+
+    def render_rich_text(self):
+        """Refresh the stored variants; returns the names of the fields written"""
+        written = []
+        texts = {}
+        for field in self.rich_text_fields:
+            html, texts[field] = process_rich_text(getattr(self, field))
+            setattr(self, f"{field}_html", html)
+            written.append(f"{field}_html")
+        for excerpt_field, source in self.excerpt_fields.items():
+            text = texts[source] if source in texts else process_rich_text(getattr(self, source))[1]
+            setattr(self, excerpt_field, Truncator(text).chars(EXCERPT_LENGTH))
+            written.append(excerpt_field)
+        return written
+
+    def save(self, *args, **kwargs):
+        written = self.render_rich_text()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | set(written)
+        super().save(*args, **kwargs)
@@ -0,0 +1,215 @@
+# study_destinations/search.py
+"""
+Full-text search over study destination content, backed by an SQLite FTS5
+table that is kept current row by row from model signals.
+
+Each indexed row gets a deterministic rowid derived from its model and
+primary key, so updates and deletes are rowid lookups instead of scans.
+"""
+import html
+import re
+
+from django.apps import apps as django_apps
+from django.db import connection as default_connection
+from django.utils.html import escape, strip_tags
+
+SEARCH_TABLE = "study_destinations_search"
+
+# model_name -> code folded into the FTS rowid (rowid = pk * KIND_SLOTS + code)
+KIND_CODES = {
+    "studydestination": 1,
+    "destinationsection": 2,
+    "scholarship": 3,
+    "visarequirement": 4,
+    "poststudywork": 5,
+}
+KIND_SLOTS = 8
+KIND_LABELS = {
+    "studydestination": "Overview",
+    "destinationsection": "Guide",
+    "scholarship": "Scholarship",
+    "visarequirement": "Visa Requirement",
+    "poststudywork": "Post-Study Work",
+}
+
+# Private-use markers wrapped around matches by FTS5; swapped for <mark>
+# only after the surrounding text has been escaped
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+_TOKEN_RE = re.compile(r"\w+(?:[.,]\w+)*")
+
+
+def is_supported(connection=default_connection):
+    return connection.vendor == "sqlite"
+
+
+def ensure_search_table(connection=default_connection):
+    """Create the FTS5 table if it doesn't exist yet (safe to call repeatedly)"""
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "title, body, kind UNINDEXED, destination_id UNINDEXED, tokenize='porter unicode61')"
+        )
+
+
+def _text(*values):
+    """Plain text from rich-text/char fields"""
+    return " ".join(html.unescape(strip_tags(value)) for value in values if value)
+
+
+def build_document(instance):
+    """
+    (title, body) to index for instance, or None if it shouldn't be searchable.
+    Only plain field access is used so migrations can index historical models.
+    """
+    model_name = instance._meta.model_name
+    if model_name == "studydestination":
+        return (
+            _text(instance.country_name, instance.intro_title),
+            _text(
+                instance.intro_description,
+                instance.quick_fact_1,
+                instance.quick_fact_2,
+                instance.quick_fact_3,
+                instance.quick_fact_4,
+            ),
+        )
+    if model_name == "destinationsection":
+        if not instance.is_active:
+            return None
+        return _text(instance.section_title), _text(instance.section_content)
+    if model_name == "scholarship":
+        if not instance.is_active:
+            return None
+        return _text(instance.scholarship_title), _text(instance.amount, instance.eligibility)
+    if model_name == "visarequirement":
+        return (
+            _text(instance.visa_name),
+            _text(
+                instance.processing_time,
+                instance.visa_fee,
+                instance.financial_requirement,
+                instance.documents_required,
+                instance.eligibility_criteria,
+            ),
+        )
+    if model_name == "poststudywork":
+        return (
+            _text(instance.visa_name),
+            _text(
+                instance.duration,
+                instance.eligibility,
+                instance.application_process,
+                instance.work_rights,
+                instance.pathway_to_pr,
+            ),
+        )
+    return None
+
+
+def _rowid(instance):
+    return instance.pk * KIND_SLOTS + KIND_CODES[instance._meta.model_name]
+
+
+def _destination_id(instance):
+    if instance._meta.model_name == "studydestination":
+        return instance.pk
+    return instance.destination_id
+
+
+def index_instance(instance, connection=default_connection):
+    """Insert or replace the index row for instance"""
+    if not is_supported(connection):
+        return
+    document = build_document(instance)
+    if document is None:
+        remove_instance(instance, connection)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(instance)])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, body, kind, destination_id) VALUES (%s, %s, %s, %s, %s)",
+            [_rowid(instance), document[0], document[1], instance._meta.model_name, _destination_id(instance)],
+        )
+
+
+def remove_instance(instance, connection=default_connection):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(instance)])
+
+
+def rebuild_index(apps=django_apps, connection=default_connection):
+    """Re-index every searchable row from scratch. Returns the number of rows indexed."""
+    if not is_supported(connection):
+        return 0
+    ensure_search_table(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    indexed = 0
+    for model_name in KIND_CODES:
+        model = apps.get_model("study_destinations", model_name)
+        for instance in model.objects.using(connection.alias).order_by().iterator():
+            index_instance(instance, connection)
+            indexed += 1
+    return indexed
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 query: every word must match, quoted so user
+    input can't inject FTS syntax, and the last word matches as a prefix.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return ""
+    terms = ['"{}"'.format(token.replace('"', "")) for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _highlight(text):
+    return escape(text).replace(_MATCH_START, "<mark>").replace(_MATCH_END, "</mark>")
+
+
+def search(query, limit=20, connection=default_connection):
+    """
+    Ranked results for query across published destinations. Each result has
+    escaped, <mark>-highlighted title and snippet strings.
+    """
+    match = build_match_query(query)
+    if not match or not is_supported(connection):
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT {SEARCH_TABLE}.kind,
+                   d.slug,
+                   d.country_name,
+                   highlight({SEARCH_TABLE}, 0, %s, %s),
+                   snippet({SEARCH_TABLE}, 1, %s, %s, '…', 24)
+            FROM {SEARCH_TABLE}
+            JOIN study_destinations_studydestination AS d ON d.id = {SEARCH_TABLE}.destination_id
+            WHERE {SEARCH_TABLE} MATCH %s AND d.is_published
+            ORDER BY bm25({SEARCH_TABLE}, 5.0, 1.0)
+            LIMIT %s
+            """,
+            [_MATCH_START, _MATCH_END, _MATCH_START, _MATCH_END, match, limit],
+        )
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "kind": KIND_LABELS[kind],
+            "slug": slug,
+            "country_name": country_name,
+            "title": _highlight(title),
+            "snippet": _highlight(snippet),
+        }
+        for kind, slug, country_name, title, snippet in rows
+    ]
@@ -0,0 +1,136 @@
+# study_destinations/signals.py
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import cache, search
+from .models import (
+    DestinationSection,
+    IntakeTable,
+    PostStudyWork,
+    Scholarship,
+    StudyDestination,
+    TuitionTable,
+    VisaRequirement,
+)
+from .related import rebuild_related_index
+from .snapshots import rebuild_snapshots
+
+CHILD_MODELS = [
+    DestinationSection,
+    TuitionTable,
+    IntakeTable,
+    Scholarship,
+    VisaRequirement,
+    PostStudyWork,
+]
+
+SEARCHABLE_MODELS = [
+    StudyDestination,
+    DestinationSection,
+    Scholarship,
+    VisaRequirement,
+    PostStudyWork,
+]
+
+# Sent once derived data (snapshots, page caches) is current after a commit.
+# slugs is the set of destinations whose pages changed, or None for all of them.
+content_updated = Signal()
+
+# Destinations touched in the current transaction. None stands for "every
+# destination", used when a change can show up on other destinations' pages.
+_pending = threading.local()
+
+
+def _pending_ids():
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    return _pending.ids
+
+
+def destination_content_changed(destination_id=None):
+    """
+    Rebuild derived data once the current transaction commits. Saving a
+    destination with its inlines fires one signal per row, so the work is
+    collected and done a single time per destination.
+    """
+    _pending_ids().add(destination_id)
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending():
+    ids = _pending_ids()
+    if not ids:
+        # Already handled by an earlier callback of the same transaction
+        return
+    pending, _pending.ids = set(ids), set()
+
+    # Similarity is pairwise, so a change to one destination can reorder the
+    # related destinations of others; their snapshots are rebuilt as well
+    changed = rebuild_related_index()
+
+    if None in pending:
+        rebuild_snapshots()
+        cache.invalidate_all_destinations()
+        content_updated.send(sender=StudyDestination, slugs=None)
+        return
+
+    # Page caches are bumped only after the snapshots they render from are current
+    slugs = set()
+    for snapshot in rebuild_snapshots(pending | changed):
+        cache.invalidate_destination(snapshot.slug)
+        slugs.add(snapshot.slug)
+    # The list page's facets count child rows of every destination
+    cache.invalidate_destination_list()
+    content_updated.send(sender=StudyDestination, slugs=slugs)
+
+
+@receiver(post_save, sender=StudyDestination)
+@receiver(post_delete, sender=StudyDestination)
+def destination_changed(sender, instance, **kwargs):
+    """A destination's own fields show up on every destination page (list, featured, related)"""
+    destination_content_changed()
+    # Publishing or renaming a destination changes tuition comparison results
+    # and the closing-soon feed too
+    transaction.on_commit(cache.invalidate_tuition)
+    transaction.on_commit(cache.invalidate_deadlines)
+
+
+@receiver(post_save, sender=TuitionTable)
+@receiver(post_delete, sender=TuitionTable)
+def tuition_changed(sender, instance, **kwargs):
+    transaction.on_commit(cache.invalidate_tuition)
+
+
+@receiver(post_save, sender=IntakeTable)
+@receiver(post_delete, sender=IntakeTable)
+@receiver(post_save, sender=Scholarship)
+@receiver(post_delete, sender=Scholarship)
+def deadlines_changed(sender, instance, **kwargs):
+    transaction.on_commit(cache.invalidate_deadlines)
+
+
+def child_content_changed(sender, instance, **kwargs):
+    """A child row only affects the page of the destination it belongs to"""
+    destination_content_changed(instance.destination_id)
+
+
+for model in CHILD_MODELS:
+    post_save.connect(child_content_changed, sender=model, dispatch_uid=f"{model.__name__}_content_saved")
+    post_delete.connect(child_content_changed, sender=model, dispatch_uid=f"{model.__name__}_content_deleted")
+
+
+def update_search_index(sender, instance, **kwargs):
+    """Search rows are written in the same transaction as the content they index"""
+    search.index_instance(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+for model in SEARCHABLE_MODELS:
+    post_save.connect(update_search_index, sender=model, dispatch_uid=f"{model.__name__}_search_saved")
+    post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f"{model.__name__}_search_deleted")
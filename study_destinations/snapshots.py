@@ -0,0 +1,162 @@
+# study_destinations/snapshots.py
+from .loaders import destination_context, destination_graph_queryset
+from .models import DestinationSnapshot, StudyDestination
+from .related import related_ids
+
+
+def _summary(destination):
+    """Fields needed wherever a destination is linked from another page"""
+    return {
+        "country_name": destination.country_name,
+        "country_code": destination.country_code,
+        "country_code_display": destination.get_country_code_display(),
+        "flag_emoji": destination.get_flag_emoji(),
+        "slug": destination.slug,
+        "url": destination.get_absolute_url(),
+    }
+
+
+def serialize_destination(destination, related_destinations=()):
+    """
+    Render-ready document for a destination loaded through
+    destination_graph_queryset. Choice displays, URLs and the flag are
+    resolved here so the template never calls back into the models.
+    """
+    children = destination_context(destination)
+    document = _summary(destination)
+    document.update(
+        {
+            "banner_image_url": destination.banner_image.url if destination.banner_image else "",
+            "intro_title": destination.intro_title,
+            "intro_description_html": destination.intro_description_html,
+            "intro_excerpt": destination.intro_excerpt,
+            "quick_facts": [
+                fact
+                for fact in (
+                    destination.quick_fact_1,
+                    destination.quick_fact_2,
+                    destination.quick_fact_3,
+                    destination.quick_fact_4,
+                )
+                if fact
+            ],
+            "meta_title": destination.meta_title,
+            "meta_description": destination.meta_description,
+            "sections": [
+                {
+                    "id": section.id,
+                    "section_title": section.section_title,
+                    "section_type": section.section_type,
+                    "section_content_html": section.section_content_html,
+                }
+                for section in children["sections"]
+            ],
+            "tuition_fees": [
+                {
+                    "program_name": fee.program_name,
+                    "program_level": fee.program_level,
+                    "program_level_display": fee.get_program_level_display(),
+                    "tuition_fee_min": str(fee.tuition_fee_min),
+                    "tuition_fee_max": str(fee.tuition_fee_max),
+                    "duration_years": fee.duration_years,
+                    "notes": fee.notes,
+                }
+                for fee in children["tuition_fees"]
+            ],
+            "intakes": [
+                {
+                    "intake_name": intake.intake_name,
+                    "intake_month": intake.intake_month,
+                    "application_deadline": intake.application_deadline,
+                    "visa_deadline": intake.visa_deadline,
+                    "is_main_intake": intake.is_main_intake,
+                }
+                for intake in children["intakes"]
+            ],
+            "scholarships": [
+                {
+                    "scholarship_title": scholarship.scholarship_title,
+                    "scholarship_type": scholarship.scholarship_type,
+                    "scholarship_type_display": scholarship.get_scholarship_type_display(),
+                    "amount": scholarship.amount,
+                    "eligibility_html": scholarship.eligibility_html,
+                    "application_deadline": scholarship.application_deadline,
+                    "website_link": scholarship.website_link,
+                }
+                for scholarship in children["scholarships"]
+            ],
+            "visa_requirements": [
+                {
+                    "visa_name": visa.visa_name,
+                    "visa_type": visa.visa_type,
+                    "visa_type_display": visa.get_visa_type_display(),
+                    "processing_time": visa.processing_time,
+                    "visa_fee": visa.visa_fee,
+                    "financial_requirement": visa.financial_requirement,
+                    "documents_required_html": visa.documents_required_html,
+                    "eligibility_criteria_html": visa.eligibility_criteria_html,
+                }
+                for visa in children["visa_requirements"]
+            ],
+            "post_study_work": [
+                {
+                    "visa_name": psw.visa_name,
+                    "duration": psw.duration,
+                    "eligibility_html": psw.eligibility_html,
+                    "application_process_html": psw.application_process_html,
+                    "work_rights_html": psw.work_rights_html,
+                    "pathway_to_pr_html": psw.pathway_to_pr_html,
+                }
+                for psw in children["post_study_work"]
+            ],
+            "related_destinations": [_summary(related) for related in related_destinations],
+        }
+    )
+    return document
+
+
+def rebuild_snapshots(destination_ids=None):
+    """
+    Rebuild snapshots for the given destinations (all published ones when
+    destination_ids is None) and drop snapshots of destinations that are no
+    longer published. Returns the list of rebuilt snapshots.
+    """
+    # Summaries of related destinations come from the published set, loaded
+    # once instead of per destination
+    published = (
+        StudyDestination.objects.filter(is_published=True).only("country_name", "country_code", "slug").in_bulk()
+    )
+    related = related_ids(destination_ids)
+
+    queryset = destination_graph_queryset()
+    stale = DestinationSnapshot.objects.exclude(destination__is_published=True)
+    if destination_ids is not None:
+        queryset = queryset.filter(pk__in=destination_ids)
+        stale = stale.filter(destination_id__in=destination_ids)
+    stale.delete()
+
+    snapshots = []
+    for destination in queryset:
+        related_destinations = [published[pk] for pk in related[destination.pk] if pk in published]
+        snapshot, _ = DestinationSnapshot.objects.update_or_create(
+            destination=destination,
+            defaults={"slug": destination.slug, "document": serialize_destination(destination, related_destinations)},
+        )
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def get_snapshot_document(slug):
+    """
+    Document for a published destination, read from its snapshot row. A
+    missing snapshot (e.g. right after a deploy) is built on the spot.
+    Raises StudyDestination.DoesNotExist if there is no such published destination.
+    """
+    snapshot = DestinationSnapshot.objects.filter(slug=slug).only("document").first()
+    if snapshot is not None:
+        return snapshot.document
+
+    destination_id = StudyDestination.objects.filter(is_published=True, slug=slug).values_list("pk", flat=True).first()
+    if destination_id is None:
+        raise StudyDestination.DoesNotExist(f"No published destination with slug {slug!r}")
+    return rebuild_snapshots([destination_id])[0].document
@@ -0,0 +1,104 @@
+# study_destinations/structured_data.py
+"""
+schema.org JSON-LD for destination pages: the consultancy as an
+EducationalOrganization, each tuition row as a Course it advises on, and the
+guide's sections as a FAQPage. Built from the snapshot document and cached
+under the destination's content versions, so it is generated once per change.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import PAGE_CACHE_TIMEOUT_KEY, destination_version, destinations_version
+from .richtext import process_rich_text
+
+# Tuition fees are entered in USD (see TuitionTable.tuition_fee_min)
+TUITION_CURRENCY = "USD"
+
+# Characters that could end the <script> element or open a comment in it
+_SCRIPT_ESCAPES = {ord("<"): "\\u003C", ord(">"): "\\u003E", ord("&"): "\\u0026"}
+
+
+def organization(site):
+    """The consultancy, from the site_settings context"""
+    return {
+        "@type": "EducationalOrganization",
+        "@id": f"{site['site_url']}/#organization",
+        "name": site["site_name"],
+        "description": site["site_description"],
+        "url": f"{site['site_url']}/",
+        "email": site["contact_email"],
+        "telephone": site["contact_phone"],
+        "address": {
+            "@type": "PostalAddress",
+            "streetAddress": site["contact_address"],
+            "addressLocality": site["office_city"],
+            "addressCountry": site["office_country"],
+        },
+    }
+
+
+def course(fee, document, page_url, provider_id):
+    return {
+        "@type": "Course",
+        "name": fee["program_name"],
+        "description": f"{fee['program_level_display']} study in {document['country_name']}"
+        + (f", {fee['duration_years']}" if fee["duration_years"] else ""),
+        "educationalLevel": fee["program_level_display"],
+        "url": page_url,
+        "provider": {"@id": provider_id},
+        "offers": {
+            "@type": "Offer",
+            "category": "Tuition",
+            "priceSpecification": {
+                "@type": "PriceSpecification",
+                "minPrice": fee["tuition_fee_min"],
+                "maxPrice": fee["tuition_fee_max"],
+                "priceCurrency": TUITION_CURRENCY,
+            },
+        },
+    }
+
+
+def faq_page(document, page_url):
+    """The guide's sections as questions; None when there are none"""
+    questions = [
+        {
+            "@type": "Question",
+            "name": section["section_title"],
+            "acceptedAnswer": {"@type": "Answer", "text": process_rich_text(section["section_content_html"])[1]},
+        }
+        for section in document["sections"]
+    ]
+    if not questions:
+        return None
+    return {"@type": "FAQPage", "@id": f"{page_url}#faq", "url": page_url, "mainEntity": questions}
+
+
+def destination_graph(document, page_url, site):
+    org = organization(site)
+    graph = [org] + [course(fee, document, page_url, org["@id"]) for fee in document["tuition_fees"]]
+    faq = faq_page(document, page_url)
+    if faq is not None:
+        graph.append(faq)
+    return {"@context": "https://schema.org", "@graph": graph}
+
+
+def to_script_json(data):
+    """JSON safe to place inside <script type="application/ld+json">"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).translate(_SCRIPT_ESCAPES)
+
+
+def destination_json_ld(request, document, site):
+    """Cached JSON-LD for a destination page; absolute URLs depend on the host, so it is part of the key"""
+    versions = [destinations_version(), destination_version(document["slug"])]
+    host = hashlib.md5(request.get_host().encode()).hexdigest()
+    key = f"study_destinations:json_ld:{document['slug']}:{host}:{':'.join(versions)}"
+    data = cache.get(key)
+    if data is None:
+        data = to_script_json(destination_graph(document, request.build_absolute_uri(document["url"]), site))
+        timeout = getattr(settings, "CACHE_TIMEOUTS", {}).get(PAGE_CACHE_TIMEOUT_KEY, 300)
+        cache.set(key, data, timeout)
+    return data
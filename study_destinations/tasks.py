@@ -0,0 +1,21 @@
+# study_destinations/tasks.py
+from celery import shared_task
+
+from .cache import invalidate_deadlines
+from .deadlines import refresh_deadline_dates
+from .models import StudyDestination
+from .signals import content_updated
+
+
+@shared_task(ignore_result=True)
+def refresh_deadlines():
+    """
+    Scheduled daily by CELERY_BEAT_SCHEDULE: re-parses intake and scholarship
+    deadlines so passed dates roll forward. Returns the number of rows changed.
+    """
+    changed = refresh_deadline_dates()
+    # The closing-soon feed on the home page moves with the date even when
+    # no deadline changed, so it is re-rendered (and re-exported) daily
+    invalidate_deadlines()
+    content_updated.send(sender=StudyDestination, slugs=set())
+    return changed
@@ -0,0 +1,367 @@
+# study_destinations/transfer.py
+"""
+Bulk export and import of destinations with all of their child tables.
+
+A destination is identified by its slug and child rows by a natural key
+within their destination, so files can move between environments. JSON
+holds one record per destination with its children nested; CSV is a
+directory with one file per table, child rows naming their destination's
+slug in a "destination" column.
+"""
+import csv
+import json
+import os
+from itertools import groupby
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from . import cache, search
+from .models import (
+    DestinationSection,
+    IntakeTable,
+    PostStudyWork,
+    Scholarship,
+    StudyDestination,
+    TuitionTable,
+    VisaRequirement,
+)
+from .signals import destination_content_changed
+
+DESTINATIONS_TABLE = "destinations"
+
+# table -> (model, natural key fields within a destination)
+CHILD_TABLES = {
+    "sections": (DestinationSection, ("section_title",)),
+    "tuition_fees": (TuitionTable, ("program_level", "program_name")),
+    "intakes": (IntakeTable, ("intake_name",)),
+    "scholarships": (Scholarship, ("scholarship_title",)),
+    "visa_requirements": (VisaRequirement, ("visa_type", "visa_name")),
+    "post_study_work": (PostStudyWork, ("visa_name",)),
+}
+
+# Save-time derivations of each model, replayed for rows written in bulk
+DERIVATIONS = ("render_rich_text", "derive_deadline_dates", "derive_numeric_fields")
+
+
+class ImportValidationError(Exception):
+    """Raised with every problem found in an import file; nothing is written"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid values")
+
+
+def exported_fields(model):
+    """Fields staff edit: derived (editable=False) columns are rebuilt on import instead"""
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.editable and not field.primary_key and field.name != "destination"
+    ]
+
+
+def _export_value(instance, field):
+    value = field.value_from_object(instance)
+    if isinstance(value, FieldFile):
+        return value.name or ""
+    return value
+
+
+def _serialize(instance):
+    return {field.name: _export_value(instance, field) for field in exported_fields(type(instance))}
+
+
+def _destinations(slugs=None):
+    destinations = StudyDestination.objects.order_by("pk")
+    if slugs:
+        destinations = destinations.filter(slug__in=slugs)
+    return destinations
+
+
+def iter_destination_records(slugs=None):
+    """
+    Yield one dict per destination with its child rows nested under the
+    table names. Every table is streamed with iterator() in destination
+    order and merged as it goes, so memory stays flat and the export costs
+    seven queries however many destinations there are.
+    """
+    destinations = _destinations(slugs)
+    groups = {}
+    current = {}
+    for table, (model, _key) in CHILD_TABLES.items():
+        rows = model.objects.filter(destination__in=destinations).order_by(
+            "destination_id", *model._meta.ordering, "pk"
+        )
+        groups[table] = groupby(rows.iterator(), key=attrgetter("destination_id"))
+        current[table] = next(groups[table], None)
+
+    for destination in destinations.iterator():
+        record = _serialize(destination)
+        for table in CHILD_TABLES:
+            rows = []
+            if current[table] is not None and current[table][0] == destination.pk:
+                rows = [_serialize(row) for row in current[table][1]]
+                current[table] = next(groups[table], None)
+            record[table] = rows
+        yield record
+
+
+def export_json(stream, slugs=None):
+    """Write destinations to stream as a JSON array, one record at a time. Returns the number written."""
+    count = 0
+    stream.write("[")
+    for record in iter_destination_records(slugs):
+        stream.write(",\n" if count else "\n")
+        stream.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False))
+        count += 1
+    stream.write("\n]\n")
+    return count
+
+
+def _csv_value(value):
+    return "" if value is None else value
+
+
+def export_csv(directory, slugs=None):
+    """Write one CSV file per table into directory. Returns {table: rows written}."""
+    os.makedirs(directory, exist_ok=True)
+    destinations = _destinations(slugs)
+    counts = {}
+
+    tables = [(DESTINATIONS_TABLE, StudyDestination, destinations)] + [
+        (
+            table,
+            model,
+            model.objects.filter(destination__in=destinations)
+            .annotate(destination_slug=F("destination__slug"))
+            .order_by("destination_id", *model._meta.ordering, "pk"),
+        )
+        for table, (model, _key) in CHILD_TABLES.items()
+    ]
+    for table, model, rows in tables:
+        fields = exported_fields(model)
+        is_child = model is not StudyDestination
+        with open(os.path.join(directory, f"{table}.csv"), "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow((["destination"] if is_child else []) + [field.name for field in fields])
+            counts[table] = 0
+            for row in rows.iterator():
+                values = [_csv_value(_export_value(row, field)) for field in fields]
+                writer.writerow(([row.destination_slug] if is_child else []) + values)
+                counts[table] += 1
+    return counts
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as fh:
+        records = json.load(fh)
+    if not isinstance(records, list):
+        raise ImportValidationError(["The JSON file must hold a list of destinations"])
+    return records
+
+
+def read_csv(directory):
+    """Rebuild nested destination records from a directory written by export_csv"""
+
+    def rows(table):
+        path = os.path.join(directory, f"{table}.csv")
+        if not os.path.exists(path):
+            return []
+        with open(path, newline="", encoding="utf-8") as fh:
+            return list(csv.DictReader(fh))
+
+    records = rows(DESTINATIONS_TABLE)
+    by_slug = {record.get("slug"): record for record in records}
+    for record in records:
+        for table in CHILD_TABLES:
+            record[table] = []
+    errors = []
+    for table in CHILD_TABLES:
+        for line, row in enumerate(rows(table), start=2):
+            slug = row.pop("destination", None)
+            if slug not in by_slug:
+                errors.append(f"{table}.csv line {line}: unknown destination {slug!r}")
+                continue
+            by_slug[slug][table].append(row)
+    if errors:
+        raise ImportValidationError(errors)
+    return records
+
+
+def _build(model, values, location, errors, instance=None):
+    """
+    Instance of model populated from values as found in an import file, or
+    None with problems added to errors
+    """
+    fields = {field.name: field for field in exported_fields(model)}
+    unknown = set(values) - set(fields)
+    if unknown:
+        errors.append(f"{location}: unknown fields {', '.join(sorted(unknown))}")
+        return None
+
+    instance = instance or model()
+    problems = {}
+    for name, raw in values.items():
+        field = fields[name]
+        try:
+            if raw is None or (raw == "" and field.null):
+                value = None
+            elif isinstance(field, models.FileField):
+                value = raw  # the stored file's name
+            else:
+                value = field.to_python(raw)
+        except ValidationError as e:
+            problems[name] = e.messages
+            continue
+        setattr(instance, field.attname, value)
+
+    try:
+        instance.full_clean(exclude=["destination"] + list(problems), validate_unique=model is StudyDestination)
+    except ValidationError as e:
+        problems.update(e.message_dict)
+    for name, messages in problems.items():
+        errors.append(f"{location}.{name}: {' '.join(messages)}")
+    return None if problems else instance
+
+
+def _derive(instance):
+    for derivation in DERIVATIONS:
+        if hasattr(instance, derivation):
+            getattr(instance, derivation)()
+
+
+def _derived_fields(model):
+    return [field.name for field in model._meta.concrete_fields if not field.editable and not field.primary_key]
+
+
+def _changed(existing, incoming, model):
+    return any(
+        field.value_from_object(existing) != field.value_from_object(incoming) for field in exported_fields(model)
+    )
+
+
+def validate_records(records):
+    """
+    Build (destination, {table: [rows]}) pairs from file records, matching
+    destinations to existing ones by slug. Raises ImportValidationError
+    listing every problem in the file.
+    """
+    errors = []
+    existing = StudyDestination.objects.in_bulk([record.get("slug") for record in records], field_name="slug")
+    plan = []
+    seen_slugs = set()
+    for index, record in enumerate(records):
+        values = dict(record)
+        children = {table: values.pop(table, []) for table in CHILD_TABLES}
+        slug = values.get("slug")
+        location = f"destinations[{slug or index}]"
+        if slug in seen_slugs:
+            errors.append(f"{location}: duplicate destination")
+            continue
+        seen_slugs.add(slug)
+
+        current = existing.get(slug)
+        instance = None
+        if current:
+            instance = StudyDestination(pk=current.pk, created_at=current.created_at)
+            instance._state.adding = False  # so unique checks skip the row itself
+        destination = _build(StudyDestination, values, location, errors, instance)
+
+        rows = {}
+        for table, (model, key) in CHILD_TABLES.items():
+            rows[table] = []
+            seen_keys = set()
+            for position, row_values in enumerate(children[table] or []):
+                row = _build(model, row_values, f"{location}.{table}[{position}]", errors)
+                if row is None:
+                    continue
+                natural_key = tuple(getattr(row, field) for field in key)
+                if natural_key in seen_keys:
+                    errors.append(f"{location}.{table}[{position}]: duplicate {', '.join(key)} {natural_key}")
+                seen_keys.add(natural_key)
+                rows[table].append(row)
+        if destination is not None:
+            plan.append((destination, current, rows))
+
+    if errors:
+        raise ImportValidationError(errors)
+    return plan
+
+
+def import_records(records, prune=True, dry_run=False):
+    """
+    Validate every record, then apply the differences with bulk writes in
+    one transaction. With prune, child rows missing from a destination's
+    record are deleted: the file describes each destination it names
+    completely. Returns {table: {"created": n, "updated": n, "deleted": n}}.
+    """
+    plan = validate_records(records)
+    summary = {table: {"created": 0, "updated": 0, "deleted": 0} for table in [DESTINATIONS_TABLE] + list(CHILD_TABLES)}
+
+    with transaction.atomic():
+        now = timezone.now()
+        created, updated = [], []
+        for destination, current, _rows in plan:
+            if current is None:
+                created.append(destination)
+            elif _changed(current, destination, StudyDestination):
+                destination.updated_at = now
+                updated.append(destination)
+        for destination in created + updated:
+            _derive(destination)
+        # bulk_create sets primary keys on SQLite and PostgreSQL, which the children need
+        StudyDestination.objects.bulk_create(created)
+        StudyDestination.objects.bulk_update(
+            updated,
+            [field.name for field in exported_fields(StudyDestination)] + _derived_fields(StudyDestination),
+            batch_size=200,
+        )
+        summary[DESTINATIONS_TABLE].update(created=len(created), updated=len(updated))
+        indexed = created + updated
+
+        destination_ids = [destination.pk for destination, _current, _rows in plan]
+        for table, (model, key) in CHILD_TABLES.items():
+            existing = {
+                (row.destination_id, tuple(getattr(row, field) for field in key)): row
+                for row in model.objects.filter(destination__in=destination_ids)
+            }
+            to_create, to_update = [], []
+            for destination, _current, rows in plan:
+                for row in rows[table]:
+                    row.destination_id = destination.pk
+                    current_row = existing.pop((destination.pk, tuple(getattr(row, field) for field in key)), None)
+                    if current_row is None:
+                        to_create.append(row)
+                    elif _changed(current_row, row, model):
+                        row.pk = current_row.pk
+                        to_update.append(row)
+            for row in to_create + to_update:
+                _derive(row)
+            model.objects.bulk_create(to_create, batch_size=500)
+            model.objects.bulk_update(
+                to_update, [field.name for field in exported_fields(model)] + _derived_fields(model), batch_size=200
+            )
+            if prune and existing:
+                # Deletes still go through signals, which also drop the rows from the search index
+                model.objects.filter(pk__in=[row.pk for row in existing.values()]).delete()
+            summary[table].update(created=len(to_create), updated=len(to_update), deleted=len(existing) if prune else 0)
+            indexed += to_create + to_update
+
+        if dry_run:
+            transaction.set_rollback(True)
+            return summary
+
+        # Bulk writes skip the post_save signals; replay their effects once
+        for instance in indexed:
+            if instance._meta.model_name in search.KIND_CODES:
+                search.index_instance(instance)
+        destination_content_changed()
+        transaction.on_commit(cache.invalidate_tuition)
+        transaction.on_commit(cache.invalidate_deadlines)
+    return summary
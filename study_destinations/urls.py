@@ -7,5 +7,8 @@ app_name = "study_destinations"
 
 urlpatterns = [
     path("", views.StudyDestinationListView.as_view(), name="list"),
+    path("search/", views.DestinationSearchView.as_view(), name="search"),
+    path("compare/tuition/", views.TuitionComparisonView.as_view(), name="compare_tuition"),
+    path("compare/visas/", views.VisaComparisonView.as_view(), name="compare_visas"),
     path("<slug:slug>/", views.StudyDestinationDetailView.as_view(), name="detail"),
 ]
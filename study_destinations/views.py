@@ -1,50 +1,184 @@
 # study_destinations/views.py
-from django.shortcuts import get_object_or_404, render
-from django.views.generic import DetailView, ListView
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.safestring import mark_safe
+from django.views.generic import DetailView, ListView, TemplateView
 
+from core.context_processors import site_settings
+
+from .cache import (
+    VersionedPageCacheMixin,
+    conditional_destination_list_page,
+    conditional_destination_page,
+    destination_list_version,
+    destination_version,
+    destinations_version,
+)
+from .comparison import compare_tuition, compare_visas
+from .filters import FACETS, StudyDestinationFilter, facet_counts
+from .forms import TuitionComparisonForm, VisaComparisonForm
 from .models import StudyDestination
+from .search import search
+from .snapshots import get_snapshot_document
+from .structured_data import destination_json_ld
 
 
-class StudyDestinationListView(ListView):
+@method_decorator(conditional_destination_list_page, name="dispatch")
+class StudyDestinationListView(VersionedPageCacheMixin, ListView):
     model = StudyDestination
     template_name = "study_destinations/destination_list.html"
     context_object_name = "destinations"
 
+    def get_page_versions(self):
+        return [destinations_version(), destination_list_version()]
+
     def get_queryset(self):
-        return StudyDestination.objects.filter(is_published=True).order_by("order", "country_name")
+        # Cards show the stored excerpt, so the rich-text bodies are never loaded
+        queryset = (
+            StudyDestination.objects.filter(is_published=True)
+            .defer("intro_description", "intro_description_html")
+            .order_by("order", "country_name")
+        )
+        self.filterset = StudyDestinationFilter(self.request.GET or None, queryset=queryset)
+        return self.filterset.qs
+
+    def get_facets(self, destinations):
+        """Facet values with destination counts and toggle links for the template"""
+        counts = facet_counts(destinations)
+        params = self.filterset.form.cleaned_data if self.filterset.is_bound else {}
+        facets = []
+        for name, (_model, _field, _extra, labels) in FACETS.items():
+            selected = params.get(name) or ""
+            values = []
+            for value, count in sorted(counts[name].items(), key=lambda item: str(labels.get(item[0], item[0]))):
+                query = self.request.GET.copy()
+                query.pop("page", None)
+                is_selected = str(value).lower() == str(selected).lower()
+                if is_selected:
+                    query.pop(name, None)
+                else:
+                    query[name] = value
+                values.append(
+                    {
+                        "value": value,
+                        "label": labels.get(value, value),
+                        "count": count,
+                        "selected": is_selected,
+                        "querystring": query.urlencode(),
+                    }
+                )
+            facets.append({"name": name, "label": name.replace("_", " ").title(), "values": values})
+        return facets
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context["filter"] = self.filterset
+        context["facets"] = self.get_facets(self.object_list)
         context["featured_destinations"] = StudyDestination.objects.filter(
             is_published=True, is_featured=True
         ).order_by("order")[:4]
         return context
 
 
-class StudyDestinationDetailView(DetailView):
-    model = StudyDestination
+@method_decorator(conditional_destination_page, name="dispatch")
+class StudyDestinationDetailView(VersionedPageCacheMixin, DetailView):
     template_name = "study_destinations/destination_detail.html"
     context_object_name = "destination"
-    slug_field = "slug"
 
-    def get_queryset(self):
-        return StudyDestination.objects.filter(is_published=True)
+    def get_page_versions(self):
+        return [destinations_version(), destination_version(self.kwargs["slug"])]
+
+    def get_object(self, queryset=None):
+        # The page renders from the destination's precomputed snapshot: one
+        # row instead of the destination plus six child tables
+        try:
+            return get_snapshot_document(self.kwargs["slug"])
+        except StudyDestination.DoesNotExist:
+            raise Http404("No study destination found matching the query")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        destination = self.object
+        document = self.object
 
         # Get all related data
-        context["sections"] = destination.sections.filter(is_active=True).order_by("order")
-        context["tuition_fees"] = destination.tuition_fees.all().order_by("order")
-        context["intakes"] = destination.intakes.all().order_by("order")
-        context["scholarships"] = destination.scholarships.filter(is_active=True).order_by("order")
-        context["visa_requirements"] = destination.visa_requirements.all().order_by("order")
-        context["post_study_work"] = destination.post_study_work.all().order_by("order")
-
-        # Related destinations
-        context["related_destinations"] = (
-            StudyDestination.objects.filter(is_published=True).exclude(id=destination.id).order_by("order")[:3]
-        )
+        for key in (
+            "sections",
+            "tuition_fees",
+            "intakes",
+            "scholarships",
+            "visa_requirements",
+            "post_study_work",
+            "related_destinations",
+        ):
+            context[key] = document[key]
+
+        context["structured_data"] = mark_safe(destination_json_ld(self.request, document, site_settings(self.request)))
+        return context
+
+
+class DestinationSearchView(TemplateView):
+    template_name = "study_destinations/search_results.html"
+    results_limit = 20
+
+    def get_results(self):
+        query = self.request.GET.get("q", "").strip()
+        return query, search(query, limit=self.results_limit)
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("format") == "json":
+            query, results = self.get_results()
+            return JsonResponse({"query": query, "results": results})
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"], context["results"] = self.get_results()
+        return context
+
+
+class TuitionComparisonView(TemplateView):
+    template_name = "study_destinations/tuition_comparison.html"
+
+    def get_form(self):
+        data = self.request.GET if "program_level" in self.request.GET else None
+        return TuitionComparisonForm(data)
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("format") == "json":
+            form = self.get_form()
+            if not form.is_valid():
+                return JsonResponse({"errors": form.errors}, status=400)
+            return JsonResponse(compare_tuition(**form.cleaned_data))
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = self.get_form()
+        context["form"] = form
+        if form.is_bound and form.is_valid():
+            context["comparison"] = compare_tuition(**form.cleaned_data)
+        return context
+
+
+class VisaComparisonView(TemplateView):
+    template_name = "study_destinations/visa_comparison.html"
 
+    def get_form(self):
+        data = self.request.GET if "visa_type" in self.request.GET else None
+        return VisaComparisonForm(data)
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("format") == "json":
+            form = self.get_form()
+            if not form.is_valid():
+                return JsonResponse({"errors": form.errors}, status=400)
+            return JsonResponse(compare_visas(**form.cleaned_data))
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = self.get_form()
+        context["form"] = form
+        if form.is_bound and form.is_valid():
+            context["comparison"] = compare_visas(**form.cleaned_data)
         return context
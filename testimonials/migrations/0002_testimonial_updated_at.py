@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-18 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("testimonials", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testimonial",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
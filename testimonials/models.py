@@ -32,6 +32,7 @@ class Testimonial(models.Model):
     is_approved = models.BooleanField(default=False)
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.client_name} - {self.get_visa_category_display()}"
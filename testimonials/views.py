@@ -1,9 +1,24 @@
 # testimonials/views.py
+from django.db.models import Count, Max
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 
+from utils.cache_utils import ViewCache
+
 from .models import Testimonial
 
 
+def approved_testimonials_state(request, *args, **kwargs):
+    """
+    Validator for testimonial pages: the newest edit plus the number of
+    approved testimonials, which also catches deletions and unapproving
+    """
+    state = Testimonial.objects.filter(is_approved=True).aggregate(last_modified=Max("updated_at"), count=Count("id"))
+    last_modified = state["last_modified"]
+    return last_modified, f"{state['count']}-{last_modified.timestamp() if last_modified else 0}"
+
+
+@method_decorator(ViewCache.conditional_public_page(approved_testimonials_state), name="dispatch")
 class TestimonialListView(ListView):
     model = Testimonial
     template_name = "testimonials/testimonial_list.html"
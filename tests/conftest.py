@@ -1,5 +1,6 @@
 # tests/conftest.py
 import os
+import tempfile
 
 import django
 from model_bakery import baker
@@ -8,11 +9,20 @@ from model_bakery.random_gen import gen_text
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "visa_consultancy.settings")
 django.setup()
 
-import pytest
-from django.contrib.auth.models import User
+import pytest  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import caches  # noqa: E402
 
-from applications.models import Application
-from study_destinations.models import StudyDestination
+from applications.models import Application  # noqa: E402
+from study_destinations.models import StudyDestination  # noqa: E402
+
+# Celery tasks run inline, when they are queued. Set before the Celery app
+# first reads its configuration from settings.
+settings.CELERY_TASK_ALWAYS_EAGER = True
+
+# Version tokens go to a throwaway directory, not the working tree's
+settings.CACHES["versions"]["LOCATION"] = tempfile.mkdtemp(prefix="versions-")
 
 # Add generator for RichTextField
 baker.generators.add("ckeditor.fields.RichTextField", gen_text)
@@ -56,3 +66,37 @@ def visa_application(client_user, study_destination):
         preferred_course="CS",
         status="SUBMITTED",
     )
+
+
+@pytest.fixture(autouse=True)
+def plain_static_storage(settings):
+    """Templates use {% static %}; don't require a collectstatic manifest in tests"""
+    settings.STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Versioned page caches live in locmem and would otherwise leak between tests"""
+    for alias in ("default", "versions"):
+        caches[alias].clear()
+    yield
+    for alias in ("default", "versions"):
+        caches[alias].clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_prerender_root(settings, tmp_path):
+    """Never serve or overwrite pages exported in the working tree"""
+    settings.PRERENDER_ROOT = str(tmp_path / "prerendered")
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix, tmp_path_factory):
+    """
+    Keep the test database in a file. In-memory SQLite locks whole tables and
+    fails at once instead of waiting for a busy writer, so tests writing from
+    several threads couldn't run against it.
+    """
+    from django.conf import settings
+
+    settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = str(tmp_path_factory.mktemp("db") / "test.sqlite3")
@@ -1,8 +1,26 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from django.contrib.auth.models import User
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from model_bakery import baker
 
-from applications.models import Application, Document
+from applications.forms import ApplicationStatusUpdateForm
+from applications.history import application_timeline, staff_timeline, time_in_status
+from applications.models import (
+    Application,
+    ApplicationIdSequence,
+    ApplicationStatusChange,
+    Document,
+    OutboxEmail,
+    next_application_id,
+)
+from applications.outbox import send_due_emails
 from study_destinations.models import StudyDestination
 
 
@@ -44,6 +62,170 @@ class TestApplicationModel:
             assert visa_application.progress_percentage == expected_progress
 
 
+@pytest.mark.django_db
+class TestApplicationIds:
+    def test_numbered_per_month(self):
+        january = datetime.datetime(2026, 1, 31, 12, tzinfo=datetime.timezone.utc)
+        february = datetime.datetime(2026, 2, 1, 12, tzinfo=datetime.timezone.utc)
+
+        assert next_application_id(january) == "APP-202601-0001"
+        assert next_application_id(january) == "APP-202601-0002"
+        assert next_application_id(february) == "APP-202602-0001"
+
+        ApplicationIdSequence.objects.filter(period="202601").update(last_value=9999)
+        assert next_application_id(january) == "APP-202601-10000"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_submissions_get_unique_ids(client_user):
+    """Test thousands of applications submitted from many threads all save with distinct IDs"""
+    total, workers = 2000, 8
+
+    def submit(_):
+        try:
+            return baker.make(Application, client=client_user, destination=None, application_id="").application_id
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        ids = list(executor.map(submit, range(total)))
+
+    assert len(set(ids)) == total
+    assert Application.objects.count() == total
+    assert ApplicationIdSequence.objects.get().last_value == total
+
+
+@pytest.mark.django_db
+class TestStatusTransitions:
+    @pytest.fixture
+    def staff(self):
+        return User.objects.create_user("agent", "agent@test.com", "pass", is_staff=True)
+
+    def transitions(self, application):
+        return list(application.status_history.values_list("from_status", "to_status", "changed_by__username"))
+
+    def test_history_written_with_each_transition(self, visa_application, staff):
+        visa_application.transition_to("UNDER_REVIEW", by=staff)
+        visa_application.transition_to("APPROVED", by=staff)
+
+        assert self.transitions(visa_application) == [
+            ("", "SUBMITTED", None),
+            ("SUBMITTED", "UNDER_REVIEW", "agent"),
+            ("UNDER_REVIEW", "APPROVED", "agent"),
+        ]
+        timeline = application_timeline(visa_application)
+        assert [entry["current"] for entry in timeline] == [False, False, True]
+        assert staff_timeline(staff)[0]["to_status"] == "APPROVED"
+
+    def test_disallowed_transition_writes_nothing(self, visa_application, staff):
+        visa_application.transition_to("UNDER_REVIEW", by=staff)
+        visa_application.transition_to("APPROVED", by=staff)
+
+        with pytest.raises(ValidationError):
+            Application.objects.get(pk=visa_application.pk).transition_to("PROCESSING", by=staff)
+
+        assert Application.objects.get(pk=visa_application.pk).status == "APPROVED"
+        assert len(self.transitions(visa_application)) == 3
+
+    def test_saves_without_status_change_add_no_history(self, visa_application):
+        application = Application.objects.get(pk=visa_application.pk)
+        application.notes = "Called the client"
+        application.save()
+
+        assert len(self.transitions(application)) == 1
+
+    def test_history_records_the_status_saved_over(self, visa_application, staff):
+        """Test a save from a stale instance records the status in the row, not the one it loaded"""
+        stale = Application.objects.get(pk=visa_application.pk)
+        visa_application.transition_to("UNDER_REVIEW", by=staff)
+
+        stale.notes = "Called the client"
+        stale.save()
+
+        assert self.transitions(visa_application)[-1] == ("UNDER_REVIEW", "SUBMITTED", None)
+
+    def test_status_form_only_offers_allowed_moves(self, visa_application):
+        form = ApplicationStatusUpdateForm(instance=visa_application)
+        assert [value for value, _label in form.fields["status"].choices] == [
+            "SUBMITTED",
+            "UNDER_REVIEW",
+            "DOCS_REQUIRED",
+            "REJECTED",
+        ]
+
+        form = ApplicationStatusUpdateForm({"status": "APPROVED", "notes": ""}, instance=visa_application)
+        assert "status" in form.errors
+
+    def test_history_is_append_only(self, visa_application):
+        row = visa_application.status_history.get()
+        with pytest.raises(ValueError):
+            row.save()
+
+    def test_time_in_status(self, visa_application, staff):
+        start = timezone.now() - datetime.timedelta(days=10)
+        ApplicationStatusChange.objects.filter(application=visa_application).update(changed_at=start)
+        visa_application.transition_to("UNDER_REVIEW", by=staff)
+        ApplicationStatusChange.objects.filter(to_status="UNDER_REVIEW").update(
+            changed_at=start + datetime.timedelta(days=4)
+        )
+
+        stats = time_in_status(now=start + datetime.timedelta(days=10))
+
+        assert stats["SUBMITTED"]["average"] == datetime.timedelta(days=4)
+        assert stats["UNDER_REVIEW"]["total"] == datetime.timedelta(days=6)
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    def test_transition_queues_email_without_reading_the_row_again(self, visa_application):
+        application = Application.objects.get(pk=visa_application.pk)
+        application.status = "UNDER_REVIEW"
+        with CaptureQueriesContext(connection) as queries:
+            application.save()
+
+        assert not [query for query in queries if query["sql"].startswith("SELECT")]
+        email = application.outbox_emails.get(kind=OutboxEmail.STATUS_UPDATED)
+        assert email.payload == {"old_status": "SUBMITTED", "new_status": "UNDER_REVIEW"}
+
+    def test_saves_without_status_change_queue_nothing(self, visa_application):
+        application = Application.objects.get(pk=visa_application.pk)
+        application.notes = "Called the client"
+        application.save()
+
+        assert list(application.outbox_emails.values_list("kind", flat=True)) == [OutboxEmail.APPLICATION_SUBMITTED]
+
+    def test_worker_sends_and_marks_emails(self, visa_application):
+        visa_application.transition_to("UNDER_REVIEW")
+
+        assert send_due_emails() == (2, 0)
+        assert [message.subject.split(" - ")[0] for message in mail.outbox] == [
+            "Visa Application Submitted",
+            "Application Status Updated",
+        ]
+        assert mail.outbox[1].to == ["john@test.com"]
+        assert "Under Review" in mail.outbox[1].body
+        assert set(OutboxEmail.objects.values_list("state", flat=True)) == {OutboxEmail.SENT}
+        assert send_due_emails() == (0, 0)
+
+    def test_failed_sends_back_off_then_give_up(self, visa_application, settings, monkeypatch):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+
+        def fail(backend, messages):
+            raise OSError("Connection refused")
+
+        monkeypatch.setattr("django.core.mail.backends.locmem.EmailBackend.send_messages", fail)
+        assert send_due_emails() == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.state == OutboxEmail.PENDING
+        assert email.available_at > timezone.now()
+        assert send_due_emails() == (0, 0)
+
+        OutboxEmail.objects.update(available_at=timezone.now())
+        assert send_due_emails() == (0, 1)
+        email.refresh_from_db()
+        assert (email.state, email.attempts, email.last_error) == (OutboxEmail.FAILED, 2, "Connection refused")
+
+
 @pytest.mark.django_db
 class TestDocumentModel:
     def test_document_creation(self, visa_application):
@@ -0,0 +1,78 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from model_bakery import baker
+
+from core import prerender
+from study_destinations.models import StudyDestination
+
+
+@pytest.fixture
+def published_destination(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return baker.make(StudyDestination, country_name="Ireland", slug="ireland", is_published=True)
+
+
+@pytest.mark.django_db
+class TestStaticExport:
+    def test_export_writes_public_pages(self, settings, published_destination):
+        """Test every public page is written with a gzip variant"""
+        call_command("export_static_pages", stdout=StringIO())
+
+        root = settings.PRERENDER_ROOT
+        for url in ["/", "/about/", "/faq/", "/study-destinations/", "/study-destinations/ireland/"]:
+            path = os.path.join(root, url.strip("/"), "index.html")
+            assert os.path.isfile(path), url
+            assert os.path.isfile(f"{path}.gz"), url
+        with open(os.path.join(root, "study-destinations", "ireland", "index.html")) as fh:
+            assert "Ireland" in fh.read()
+
+    def test_exported_page_bypasses_django(self, published_destination, django_assert_num_queries):
+        """Test anonymous visitors get the exported file without any view or query"""
+        call_command("export_static_pages", stdout=StringIO())
+        url = reverse("study_destinations:detail", kwargs={"slug": "ireland"})
+
+        with django_assert_num_queries(0):
+            response = Client().get(url, secure=True)
+
+        assert response.status_code == 200
+        assert "Cookie" in response["Vary"]
+        assert b"Ireland" in b"".join(response.streaming_content)
+
+    def test_visitors_with_session_use_views(self, published_destination):
+        """Test requests carrying a session cookie skip the exported files"""
+        call_command("export_static_pages", stdout=StringIO())
+        client = Client()
+        client.cookies["sessionid"] = "abc"
+
+        response = client.get(reverse("core:about"), secure=True)
+
+        assert not getattr(response, "streaming", False)
+        assert response.status_code == 200
+
+    def test_content_change_reexports(self, settings, published_destination, django_capture_on_commit_callbacks):
+        """Test unpublishing a destination removes its exported page"""
+        call_command("export_static_pages", stdout=StringIO())
+        assert prerender.is_enabled()
+
+        published_destination.is_published = False
+        with django_capture_on_commit_callbacks(execute=True):
+            published_destination.save()
+
+        path = os.path.join(settings.PRERENDER_ROOT, "study-destinations", "ireland", "index.html")
+        assert not os.path.exists(path)
+        assert Client().get("/study-destinations/ireland/", secure=True).status_code == 404
+
+    def test_export_skips_the_page_cache(self, settings, published_destination):
+        """Test exports render afresh rather than from HTML cached under versions that didn't move"""
+        url = reverse("study_destinations:list")
+        assert b"Ireland" in prerender.render_page(url)
+
+        # A queryset update fires no signals, like a change this process's cache never heard of
+        StudyDestination.objects.filter(pk=published_destination.pk).update(country_name="Eire")
+
+        assert b"Eire" in prerender.render_page(url)
@@ -0,0 +1,843 @@
+import datetime
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from study_destinations import cache
+from study_destinations.checks import check_version_cache
+from study_destinations.comparison import compare_tuition, compare_visas
+from study_destinations.deadlines import closing_soon
+from study_destinations.filters import StudyDestinationFilter, facet_counts
+from study_destinations.loaders import load_destination
+from study_destinations.models import (
+    DestinationSection,
+    DestinationSnapshot,
+    IntakeTable,
+    PostStudyWork,
+    RelatedDestination,
+    Scholarship,
+    StudyDestination,
+    TuitionTable,
+    VisaRequirement,
+)
+from study_destinations.parsers import parse_amount, parse_deadline, parse_duration_days, parse_intake_date
+from study_destinations.related import rebuild_related_index
+from study_destinations.richtext import process_rich_text
+from study_destinations.search import search
+from study_destinations.tasks import refresh_deadlines
+
+CHILD_MODELS = [DestinationSection, TuitionTable, IntakeTable, Scholarship, VisaRequirement, PostStudyWork]
+
+
+def make_destination(slug, children):
+    destination = baker.make(StudyDestination, country_name=slug.title(), slug=slug, is_published=True)
+    for model in CHILD_MODELS if children else []:
+        extra = {"is_active": True} if model in (DestinationSection, Scholarship) else {}
+        baker.make(model, destination=destination, _quantity=children, **extra)
+    return destination
+
+
+def count_detail_queries(destination):
+    client = Client()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("study_destinations:detail", kwargs={"slug": destination.slug}), secure=True)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestDestinationDetailQueries:
+    def test_loader_evaluates_each_child_table_once(self, django_assert_num_queries):
+        """Test one query for the destination plus one per child table"""
+        make_destination("small", 5)
+
+        with django_assert_num_queries(1 + len(CHILD_MODELS)):
+            destination = load_destination("small")
+            assert len(destination.active_sections) == 5
+            assert len(destination.ordered_post_study_work) == 5
+
+    def test_loader_keeps_filters_and_ordering(self):
+        """Test inactive rows are dropped and rows come back by order"""
+        destination = make_destination("ordered", 0)
+        baker.make(DestinationSection, destination=destination, section_title="Second", order=2, is_active=True)
+        baker.make(DestinationSection, destination=destination, section_title="First", order=1, is_active=True)
+        baker.make(DestinationSection, destination=destination, section_title="Hidden", order=0, is_active=False)
+
+        loaded = load_destination("ordered")
+        assert [s.section_title for s in loaded.active_sections] == ["First", "Second"]
+
+    def test_query_count_independent_of_child_rows(self):
+        """Test the detail page costs the same with 5 or 500 child rows"""
+        small = make_destination("small", 5)
+        large = make_destination("large", 500)
+
+        assert count_detail_queries(small) == count_detail_queries(large)
+
+
+@pytest.mark.django_db
+class TestDestinationPageCache:
+    def test_cached_detail_page_needs_no_queries(self, django_assert_num_queries):
+        """Test a repeat anonymous hit is served from cache"""
+        destination = make_destination("cached", 2)
+        url = reverse("study_destinations:detail", kwargs={"slug": destination.slug})
+        client = Client()
+        client.get(url, secure=True)
+
+        with django_assert_num_queries(0):
+            response = client.get(url, secure=True)
+        assert response.status_code == 200
+
+    def test_child_edit_invalidates_detail_page(self, django_capture_on_commit_callbacks):
+        """Test saving a child row shows up on the next request"""
+        destination = make_destination("edited", 0)
+        section = baker.make(DestinationSection, destination=destination, section_title="Old title", is_active=True)
+        url = reverse("study_destinations:detail", kwargs={"slug": destination.slug})
+        client = Client()
+        assert b"Old title" in client.get(url, secure=True).content
+
+        section.section_title = "New title"
+        with django_capture_on_commit_callbacks(execute=True):
+            section.save()
+
+        assert b"New title" in client.get(url, secure=True).content
+
+    def test_destination_edit_invalidates_list_page(self, django_capture_on_commit_callbacks):
+        """Test saving a destination shows up on the list page"""
+        destination = make_destination("listed", 0)
+        url = reverse("study_destinations:list")
+        client = Client()
+        assert b"Listed" in client.get(url, secure=True).content
+
+        destination.country_name = "Renamed"
+        with django_capture_on_commit_callbacks(execute=True):
+            destination.save()
+
+        assert b"Renamed" in client.get(url, secure=True).content
+
+
+@pytest.mark.django_db
+class TestDestinationSnapshots:
+    def test_snapshot_rebuilt_on_commit(self, django_capture_on_commit_callbacks):
+        """Test child edits are materialized into the destination snapshot"""
+        destination = make_destination("snap", 0)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(TuitionTable, destination=destination, program_name="MSc Data", program_level="POSTGRADUATE")
+
+        document = DestinationSnapshot.objects.get(slug="snap").document
+        assert document["tuition_fees"][0]["program_name"] == "MSc Data"
+        assert document["tuition_fees"][0]["program_level_display"] == "Postgraduate"
+
+    def test_unpublishing_drops_snapshot(self, django_capture_on_commit_callbacks):
+        """Test unpublished destinations have no snapshot and a 404 page"""
+        destination = make_destination("hidden", 0)
+        with django_capture_on_commit_callbacks(execute=True):
+            destination.save()
+        assert DestinationSnapshot.objects.filter(slug="hidden").exists()
+
+        destination.is_published = False
+        with django_capture_on_commit_callbacks(execute=True):
+            destination.save()
+
+        assert not DestinationSnapshot.objects.filter(slug="hidden").exists()
+        response = Client().get(reverse("study_destinations:detail", kwargs={"slug": "hidden"}), secure=True)
+        assert response.status_code == 404
+
+    def test_detail_page_reads_one_row(self, django_capture_on_commit_callbacks, django_assert_num_queries):
+        """Test the detail view renders from the snapshot alone"""
+        destination = make_destination("single", 3)
+        with django_capture_on_commit_callbacks(execute=True):
+            destination.save()
+
+        with django_assert_num_queries(1):
+            response = Client().get(reverse("study_destinations:detail", kwargs={"slug": "single"}), secure=True)
+        assert response.status_code == 200
+
+    def test_rebuild_command(self):
+        """Test the management command rebuilds every published destination"""
+        make_destination("one", 1)
+        make_destination("two", 1)
+
+        call_command("rebuild_destination_snapshots", stdout=StringIO())
+
+        assert set(DestinationSnapshot.objects.values_list("slug", flat=True)) == {"one", "two"}
+
+
+@pytest.mark.django_db
+class TestDestinationSearch:
+    def test_search_is_ranked_and_highlighted(self):
+        """Test matches come back with <mark> highlights"""
+        destination = make_destination("uk", 0)
+        baker.make(
+            PostStudyWork,
+            destination=destination,
+            visa_name="Graduate Route",
+            duration="2 years",
+            work_rights="<p>Post study work for 2 years in any job</p>",
+        )
+
+        results = search("post study work 2 years")
+
+        assert results[0]["slug"] == "uk"
+        assert results[0]["kind"] == "Post-Study Work"
+        assert "<mark>" in results[0]["snippet"]
+
+    def test_index_tracks_edits_and_deletes(self):
+        """Test saving and deleting rows updates the index incrementally"""
+        destination = make_destination("canada", 0)
+        section = baker.make(
+            DestinationSection, destination=destination, section_content="IELTS 6.0 overall", is_active=True
+        )
+        assert search("IELTS 6.0")
+
+        section.section_content = "Duolingo accepted"
+        section.save()
+        assert not search("IELTS 6.0")
+        assert search("duolingo")
+
+        section.delete()
+        assert not search("duolingo")
+
+    def test_search_escapes_content_and_query(self):
+        """Test indexed text is escaped and FTS syntax in the query is neutralised"""
+        destination = make_destination("escaped", 0)
+        baker.make(
+            DestinationSection, destination=destination, section_content="&lt;script&gt; scholarship", is_active=True
+        )
+
+        results = search('scholarship" OR "x')
+        assert not results
+        results = search("scholarship")
+        assert "<script>" not in results[0]["snippet"]
+
+    def test_search_endpoint_json(self):
+        """Test the public endpoint answers JSON"""
+        destination = make_destination("germany", 0)
+        baker.make(Scholarship, destination=destination, eligibility="DAAD merit award", is_active=True)
+
+        response = Client().get(reverse("study_destinations:search"), {"q": "DAAD", "format": "json"}, secure=True)
+
+        assert response.status_code == 200
+        assert response.json()["results"][0]["slug"] == "germany"
+
+
+@pytest.mark.django_db
+class TestTuitionComparison:
+    def make_fees(self, slug, fees, level="POSTGRADUATE"):
+        destination = make_destination(slug, 0)
+        for fee_min, fee_max in fees:
+            baker.make(
+                TuitionTable,
+                destination=destination,
+                program_level=level,
+                tuition_fee_min=fee_min,
+                tuition_fee_max=fee_max,
+            )
+        return destination
+
+    def test_country_aggregates(self):
+        """Test min, median and max per country"""
+        self.make_fees("uk", [(10000, 12000), (20000, 22000), (30000, 40000)])
+        self.make_fees("germany", [(0, 1000), (1000, 3000)])
+
+        result = compare_tuition("POSTGRADUATE")
+        countries = {country["slug"]: country for country in result["countries"]}
+
+        assert countries["uk"]["programs"] == 3
+        assert countries["uk"]["min_fee"] == 10000
+        assert countries["uk"]["median_fee"] == 21000
+        assert countries["uk"]["max_fee"] == 40000
+        # Even count: mean of the two middle midpoints (500 and 2000)
+        assert countries["germany"]["median_fee"] == 1250
+        assert [country["slug"] for country in result["countries"]] == ["germany", "uk"]
+
+    def test_budget_range_filters_programs(self):
+        """Test only programs overlapping the budget match"""
+        self.make_fees("uk", [(10000, 12000), (30000, 40000)])
+        self.make_fees("canada", [(15000, 18000)], level="UNDERGRADUATE")
+
+        result = compare_tuition("POSTGRADUATE", budget_min=0, budget_max=15000)
+
+        assert [program["tuition_fee_max"] for program in result["programs"]] == [12000]
+        assert result["countries"][0]["programs"] == 1
+
+    def test_results_cached_until_tuition_changes(self, django_assert_num_queries, django_capture_on_commit_callbacks):
+        """Test repeat queries are cached and tuition edits invalidate them"""
+        destination = self.make_fees("uk", [(10000, 12000)])
+        compare_tuition("POSTGRADUATE")
+        with django_assert_num_queries(0):
+            compare_tuition("POSTGRADUATE")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(
+                TuitionTable,
+                destination=destination,
+                program_level="POSTGRADUATE",
+                tuition_fee_min=5000,
+                tuition_fee_max=6000,
+            )
+
+        assert compare_tuition("POSTGRADUATE")["countries"][0]["programs"] == 2
+
+    def test_json_endpoint(self):
+        """Test the JSON endpoint validates and answers"""
+        self.make_fees("uk", [(10000, 12000)])
+        url = reverse("study_destinations:compare_tuition")
+
+        response = Client().get(url, {"program_level": "POSTGRADUATE", "format": "json"}, secure=True)
+        assert response.status_code == 200
+        assert response.json()["countries"][0]["slug"] == "uk"
+
+        response = Client().get(
+            url, {"program_level": "POSTGRADUATE", "budget_min": 5, "budget_max": 1, "format": "json"}, secure=True
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestDestinationFacets:
+    @pytest.fixture
+    def destinations(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            uk = make_destination("uk", 0)
+            uk.country_code = "UK"
+            uk.save()
+            canada = make_destination("canada", 0)
+            canada.country_code = "CANADA"
+            canada.save()
+            baker.make(TuitionTable, destination=uk, program_level="POSTGRADUATE", _quantity=2)
+            baker.make(TuitionTable, destination=canada, program_level="POSTGRADUATE")
+            baker.make(TuitionTable, destination=canada, program_level="DIPLOMA")
+            baker.make(Scholarship, destination=uk, scholarship_type="GOVERNMENT", is_active=True)
+            baker.make(Scholarship, destination=canada, scholarship_type="GOVERNMENT", is_active=False)
+            baker.make(IntakeTable, destination=canada, intake_month="September", is_main_intake=True)
+        return uk, canada
+
+    def test_facet_counts_in_one_query(self, destinations, django_assert_num_queries):
+        """Test every facet is counted by distinct destination in a single query"""
+        with django_assert_num_queries(1):
+            counts = facet_counts(StudyDestination.objects.all())
+
+        assert counts["country_code"] == {"UK": 1, "CANADA": 1}
+        assert counts["program_level"] == {"POSTGRADUATE": 2, "DIPLOMA": 1}
+        assert counts["scholarship_type"] == {"GOVERNMENT": 1}
+        assert counts["intake_month"] == {"September": 1}
+
+    def test_counts_follow_current_filters(self, destinations):
+        """Test counts only cover destinations matching the current filters"""
+        filterset = StudyDestinationFilter({"program_level": "DIPLOMA"}, queryset=StudyDestination.objects.all())
+
+        assert [destination.slug for destination in filterset.qs] == ["canada"]
+        counts = facet_counts(filterset.qs)
+        assert counts["country_code"] == {"CANADA": 1}
+        assert counts["program_level"] == {"POSTGRADUATE": 1, "DIPLOMA": 1}
+
+    def test_list_view_filters(self, destinations):
+        """Test the list page applies facet filters"""
+        response = Client().get(reverse("study_destinations:list"), {"intake_month": "september"}, secure=True)
+
+        assert response.status_code == 200
+        assert [destination.slug for destination in response.context["destinations"]] == ["canada"]
+
+    def test_cached_list_follows_child_edits(self, destinations, django_capture_on_commit_callbacks):
+        """Test a new child row shows up in the cached list page's facets and ETag"""
+        uk, _canada = destinations
+        url = reverse("study_destinations:list")
+        client = Client()
+
+        def diploma_count(response):
+            facet = next(facet for facet in response.context["facets"] if facet["name"] == "program_level")
+            return {value["value"]: value["count"] for value in facet["values"]}["DIPLOMA"]
+
+        response = client.get(url, secure=True)
+        assert diploma_count(response) == 1
+        etag = response["ETag"]
+        assert client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(TuitionTable, destination=uk, program_level="DIPLOMA")
+
+        response = client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert diploma_count(response) == 2
+
+
+@pytest.mark.django_db
+class TestConditionalResponses:
+    def test_unchanged_detail_page_is_not_modified(self, django_assert_num_queries):
+        """Test a repeat request with the ETag gets a 304 without queries"""
+        make_destination("etag", 2)
+        url = reverse("study_destinations:detail", kwargs={"slug": "etag"})
+        client = Client()
+        response = client.get(url, secure=True)
+        assert response.status_code == 200
+        assert response.has_header("Last-Modified")
+
+        with django_assert_num_queries(0):
+            response = client.get(url, secure=True, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+
+    def test_child_edit_changes_etag(self, django_capture_on_commit_callbacks):
+        """Test editing a child row gives the detail page a new ETag"""
+        destination = make_destination("etag", 1)
+        url = reverse("study_destinations:detail", kwargs={"slug": "etag"})
+        client = Client()
+        etag = client.get(url, secure=True)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(Scholarship, destination=destination, is_active=True)
+
+        response = client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_home_and_list_share_destination_validator(self):
+        """Test the home and list pages answer If-None-Match"""
+        make_destination("home", 0)
+        client = Client()
+        for url in (reverse("core:home"), reverse("study_destinations:list")):
+            etag = client.get(url, secure=True)["ETag"]
+            assert client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_session_requests_always_render(self):
+        """Test requests carrying a session get no validators"""
+        make_destination("session", 0)
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = "abc"
+        response = client.get(reverse("study_destinations:list"), secure=True)
+
+        assert response.status_code == 200
+        assert not response.has_header("ETag")
+
+
+@pytest.mark.django_db
+class TestRenderedRichText:
+    def test_sanitizes_and_minifies(self):
+        """Test disallowed markup is dropped and whitespace collapsed"""
+        html, text = process_rich_text(
+            "<p>Study\n\n  <strong>here</strong></p>\n<script>alert(1)</script>"
+            '<p onclick="x"><a href="javascript:alert(1)">link</a></p>'
+        )
+
+        assert html == "<p>Study <strong>here</strong></p><p><a>link</a></p>"
+        assert text == "Study here link"
+
+    def test_save_stores_variants_and_excerpt(self):
+        """Test saving a destination writes the HTML variant and excerpt"""
+        destination = make_destination("rich", 0)
+        destination.intro_description = "<p>" + "word " * 100 + "</p><img src=x onerror=alert(1)>"
+        destination.save(update_fields=["intro_description"])
+
+        destination.refresh_from_db()
+        assert destination.intro_description_html.startswith("<p>word word")
+        assert destination.intro_description_html.endswith('</p><img src="x">')
+        assert len(destination.intro_excerpt) <= 160
+        assert destination.intro_excerpt.endswith("…")
+
+    def test_detail_page_renders_stored_variants(self, django_capture_on_commit_callbacks):
+        """Test the detail page emits the sanitized variants"""
+        destination = make_destination("rendered", 0)
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(
+                DestinationSection,
+                destination=destination,
+                is_active=True,
+                section_content="<p>Safe</p><script>document.cookie</script>",
+            )
+
+        response = Client().get(reverse("study_destinations:detail", kwargs={"slug": "rendered"}), secure=True)
+        assert b"<p>Safe</p>" in response.content
+        assert b"document.cookie" not in response.content
+
+
+@pytest.mark.django_db
+class TestRelatedDestinations:
+    @pytest.fixture
+    def destinations(self):
+        uk, canada, japan = (make_destination(slug, 0) for slug in ("uk", "canada", "japan"))
+        for destination, low, high in ((uk, 15000, 30000), (canada, 14000, 28000), (japan, 3000, 6000)):
+            baker.make(
+                TuitionTable,
+                destination=destination,
+                program_level="POSTGRADUATE",
+                tuition_fee_min=low,
+                tuition_fee_max=high,
+            )
+        for destination in (uk, canada):
+            baker.make(IntakeTable, destination=destination, intake_month="September", is_main_intake=True)
+            baker.make(PostStudyWork, destination=destination)
+        return uk, canada, japan
+
+    def test_ranked_by_similarity(self, destinations):
+        """Test the most similar destination is recommended first"""
+        uk, canada, japan = destinations
+        rebuild_related_index()
+
+        assert [link.related for link in RelatedDestination.objects.filter(destination=uk)] == [canada, japan]
+
+    def test_change_updates_other_snapshots(self, destinations, django_capture_on_commit_callbacks):
+        """Test a destination becoming more similar reorders other destinations' snapshots"""
+        uk, canada, japan = destinations
+        with django_capture_on_commit_callbacks(execute=True):
+            uk.save()
+        assert DestinationSnapshot.objects.get(slug="canada").document["related_destinations"][0]["slug"] == "uk"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            TuitionTable.objects.filter(destination=japan).update(tuition_fee_min=14000, tuition_fee_max=28000)
+            baker.make(IntakeTable, destination=japan, intake_month="September", is_main_intake=True)
+            baker.make(PostStudyWork, destination=japan)
+
+        related = DestinationSnapshot.objects.get(slug="canada").document["related_destinations"]
+        assert related[0]["slug"] == "japan"
+
+
+@pytest.mark.django_db
+class TestDeadlineDates:
+    TODAY = datetime.date(2026, 10, 18)
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("15 January 2027", datetime.date(2027, 1, 15)),
+            ("March 3rd", datetime.date(2027, 3, 3)),
+            ("01/11/2026", datetime.date(2026, 11, 1)),
+            ("end of November", datetime.date(2026, 11, 30)),
+            ("3-6 months before intake", datetime.date(2026, 12, 1)),
+            ("6 weeks prior to the intake", datetime.date(2027, 1, 18)),
+            ("May 2027", datetime.date(2027, 5, 1)),
+            ("late May", datetime.date(2027, 5, 31)),
+            ("May apply before the intake", None),
+            ("Applicants May apply at any time", None),
+            ("Rolling admissions", None),
+            ("-", None),
+        ],
+    )
+    def test_parse_deadline(self, text, expected):
+        """Test the common deadline phrasings"""
+        intake = parse_intake_date("March", today=self.TODAY)
+        assert intake == datetime.date(2027, 3, 1)
+        assert parse_deadline(text, intake, today=self.TODAY) == expected
+
+    def test_dates_derived_on_save(self):
+        """Test saving an intake stores its parsed dates"""
+        destination = make_destination("dated", 0)
+        intake = baker.make(
+            IntakeTable, destination=destination, intake_month="September", application_deadline="2 months before"
+        )
+
+        intake.refresh_from_db()
+        assert intake.intake_date.month == 9
+        assert intake.application_deadline_date.month == 7
+
+    def test_daily_refresh_is_scheduled(self):
+        """Test beat runs the refresh and its bump reaches other processes"""
+        assert settings.CELERY_BEAT_SCHEDULE["refresh-deadline-dates"]["task"] == refresh_deadlines.name
+        before = cache.deadlines_version()
+
+        refresh_deadlines.delay()
+
+        assert caches.create_connection(cache.VERSION_CACHE).get(cache.DEADLINES_VERSION_KEY) != before
+
+    def test_closing_soon_feed(self, django_capture_on_commit_callbacks, django_assert_num_queries):
+        """Test the feed lists upcoming deadlines soonest first and is cached until one changes"""
+        destination = make_destination("soon", 0)
+        hidden = baker.make(StudyDestination, slug="hidden", is_published=False)
+        today = datetime.date.today()
+
+        def in_days(days):
+            return (today + datetime.timedelta(days=days)).isoformat()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(
+                Scholarship, destination=destination, scholarship_title="Later", application_deadline=in_days(20)
+            )
+            baker.make(IntakeTable, destination=destination, intake_name="Fall", application_deadline=in_days(5))
+            baker.make(IntakeTable, destination=destination, intake_name="Past", application_deadline=in_days(-1))
+            baker.make(IntakeTable, destination=destination, intake_name="Far", application_deadline=in_days(90))
+            baker.make(IntakeTable, destination=hidden, intake_name="Hidden", application_deadline=in_days(3))
+
+        with django_assert_num_queries(1):
+            feed = closing_soon()
+        assert [(entry["title"], entry["days_left"]) for entry in feed] == [("Fall", 5), ("Later", 20)]
+        with django_assert_num_queries(0):
+            closing_soon()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Scholarship.objects.get(scholarship_title="Later").delete()
+        assert [entry["title"] for entry in closing_soon()] == ["Fall"]
+
+
+@pytest.mark.django_db
+class TestVisaComparison:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [("3-8 weeks", (21, 56)), ("2 Months", (60, 60)), ("8 to 10 month", (240, 300)), ("Varies", (None, None))],
+    )
+    def test_parse_duration(self, text, expected):
+        assert parse_duration_days(text) == expected
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("$350", (350, 350, "USD")),
+            ("Proof of $15,000 minimum", (15000, 15000, "USD")),
+            ("Main Applicant: 60€-90€", (60, 90, "EUR")),
+            ("9000+3000PKR", (12000, 12000, "PKR")),
+            ("Free", (None, None, "")),
+        ],
+    )
+    def test_parse_amount(self, text, expected):
+        assert parse_amount(text) == expected
+
+    @pytest.fixture
+    def visas(self):
+        for slug, processing, fee in (
+            ("uk", "3 weeks", "$490"),
+            ("canada", "8-12 weeks", "$150"),
+            ("japan", "Varies", ""),
+        ):
+            baker.make(
+                VisaRequirement,
+                destination=make_destination(slug, 0),
+                visa_type="STUDENT",
+                processing_time=processing,
+                visa_fee=fee,
+            )
+
+    def test_sorted_in_sql(self, visas, django_assert_num_queries):
+        """Test sorts use the parsed columns and unparsed rows come last"""
+        with django_assert_num_queries(1):
+            fastest = compare_visas("STUDENT", "fastest")
+        assert [visa["slug"] for visa in fastest["visas"]] == ["uk", "canada", "japan"]
+
+        cheapest = compare_visas("STUDENT", "cheapest", currency="USD", max_fee=200)
+        assert [visa["slug"] for visa in cheapest["visas"]] == ["canada"]
+
+    def test_json_endpoint(self, visas):
+        url = reverse("study_destinations:compare_visas")
+        response = Client().get(url, {"visa_type": "STUDENT", "max_processing_weeks": 4, "format": "json"}, secure=True)
+        assert [visa["slug"] for visa in response.json()["visas"]] == ["uk"]
+
+        response = Client().get(url, {"visa_type": "STUDENT", "max_fee": 100, "format": "json"}, secure=True)
+        assert response.status_code == 400
+
+    def test_backfill_command(self, visas):
+        """Test the backfill command restores the numeric columns"""
+        VisaRequirement.objects.update(processing_days_min=None, visa_fee_min=None)
+
+        call_command("backfill_visa_numbers", stdout=StringIO())
+
+        assert VisaRequirement.objects.get(destination__slug="uk").processing_days_min == 21
+        assert VisaRequirement.objects.get(destination__slug="canada").visa_fee_min == 150
+
+
+@pytest.mark.django_db
+class TestDestinationTransfer:
+    @pytest.fixture
+    def destinations(self):
+        for slug in ("uk", "canada"):
+            destination = make_destination(slug, 2)
+            destination.banner_image = f"study_destinations/banners/{slug}.jpg"
+            destination.save()
+
+    def export(self, *args):
+        out = StringIO()
+        call_command("destinations_export", *args, stdout=out, stderr=StringIO())
+        return json.loads(out.getvalue())
+
+    def test_export_streams_in_fixed_queries(self, destinations, django_assert_num_queries):
+        """Test one query per table however many destinations there are"""
+        with django_assert_num_queries(7):
+            records = self.export()
+        assert [record["slug"] for record in records] == ["uk", "canada"]
+        assert all(len(record["intakes"]) == 2 for record in records)
+        assert "section_content_html" not in records[0]["sections"][0]
+
+    def test_json_round_trip(self, destinations, tmp_path, django_capture_on_commit_callbacks):
+        """Test an edited file updates, creates and prunes rows and rebuilds derived columns"""
+        records = self.export()
+        uk = records[0]
+        uk["intro_description"] = "<p>Updated <script>x</script>intro</p>"
+        uk["intakes"] = [dict(uk["intakes"][0], intake_name="Fall", intake_month="September")]
+        path = tmp_path / "destinations.json"
+        path.write_text(json.dumps(records))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("destinations_import", str(path), stdout=StringIO())
+
+        destination = StudyDestination.objects.get(slug="uk")
+        assert destination.intro_description_html == "<p>Updated intro</p>"
+        intake = IntakeTable.objects.get(destination=destination)
+        assert intake.intake_name == "Fall" and intake.intake_date.month == 9
+        assert IntakeTable.objects.filter(destination__slug="canada").count() == 2
+        document = DestinationSnapshot.objects.get(destination=destination).document
+        assert document["intro_description_html"] == "<p>Updated intro</p>"
+
+    def test_csv_round_trip(self, destinations, tmp_path):
+        """Test a CSV export imports back without any changes"""
+        call_command("destinations_export", "--format", "csv", "--output", str(tmp_path), stderr=StringIO())
+        out = StringIO()
+
+        call_command("destinations_import", str(tmp_path), stdout=out)
+
+        assert "destinations: 0 created, 0 updated, 0 deleted" in out.getvalue()
+        assert "intakes: 0 created, 0 updated, 0 deleted" in out.getvalue()
+
+    def test_invalid_file_writes_nothing(self, destinations, tmp_path):
+        """Test every problem is reported and no row is touched"""
+        records = self.export()
+        records[0]["country_name"] = "Renamed"
+        records[1]["tuition_fees"][0]["program_level"] = "NOT_A_LEVEL"
+        records.append(dict(records[1], slug="new", scholarships=[{"bogus": 1}]))
+        path = tmp_path / "destinations.json"
+        path.write_text(json.dumps(records))
+        err = StringIO()
+
+        with pytest.raises(CommandError):
+            call_command("destinations_import", str(path), stdout=StringIO(), stderr=err)
+
+        assert "program_level" in err.getvalue() and "bogus" in err.getvalue()
+        assert StudyDestination.objects.get(slug="uk").country_name == "Uk"
+        assert not StudyDestination.objects.filter(slug="new").exists()
+
+    def test_import_invalidates_other_processes(self, destinations, tmp_path, django_capture_on_commit_callbacks):
+        """Test the version bumps an import makes are seen through another process's cache connection"""
+        path = tmp_path / "destinations.json"
+        path.write_text(json.dumps(self.export()))
+        keys = [cache.ALL_DESTINATIONS_VERSION_KEY, cache.TUITION_VERSION_KEY, cache.DEADLINES_VERSION_KEY]
+        before = [cache.get_version(key) for key in keys]
+        # A new connection holds no state of this process's, like the one a web worker has open
+        web_worker = caches.create_connection(cache.VERSION_CACHE)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("destinations_import", str(path), stdout=StringIO())
+
+        after = [web_worker.get(key) for key in keys]
+        assert all(token is not None for token in after)
+        assert not set(before) & set(after)
+
+    def test_process_local_version_cache_is_an_error(self, settings):
+        """Test a version cache other processes can't see fails the system checks"""
+        settings.CELERY_TASK_ALWAYS_EAGER = False
+        settings.CACHES = {**settings.CACHES, "versions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+        assert [error.id for error in check_version_cache(None)] == ["study_destinations.E002"]
+
+
+@pytest.mark.django_db
+class TestLazyAdminInlines:
+    @pytest.fixture
+    def admin_client(self):
+        client = Client()
+        client.force_login(User.objects.create_superuser("admin", "admin@test.com", "pass"))
+        return client
+
+    @pytest.fixture
+    def destination(self):
+        return make_destination("uk", 3)
+
+    def children_url(self, destination, model_name):
+        return reverse("admin:study_destinations_studydestination_children", args=[destination.pk, model_name])
+
+    def test_change_page_defers_child_tables(self, admin_client, destination):
+        url = reverse("admin:study_destinations_studydestination_change", args=[destination.pk])
+
+        response = admin_client.get(url, secure=True)
+
+        assert response.status_code == 200
+        assert b"sections-TOTAL_FORMS" not in response.content
+        assert self.children_url(destination, "intaketable").encode() in response.content
+
+        response = admin_client.get(url, {"inlines": "all"}, secure=True)
+        assert b"sections-TOTAL_FORMS" in response.content
+
+    def test_change_page_loads_inline_scripts(self, admin_client, destination):
+        """Test the scripts the lazily loaded child tables need are on the change page"""
+        url = reverse("admin:study_destinations_studydestination_change", args=[destination.pk])
+
+        response = admin_client.get(url, secure=True)
+
+        assert "admin/js/inlines" in str(response.context["media"])
+        assert b"admin/js/inlines" in response.content
+        assert b"tabularFormset" in response.content
+
+    def test_child_table_is_paginated(self, admin_client, destination, monkeypatch, django_assert_max_num_queries):
+        """Test a page of rows costs the same queries however many rows there are"""
+        monkeypatch.setattr(admin.site._registry[StudyDestination], "inline_per_page", 2)
+        url = self.children_url(destination, "intaketable")
+
+        with django_assert_max_num_queries(8):
+            response = admin_client.get(url, secure=True)
+
+        formset = response.context["inline_admin_formset"].formset
+        assert formset.initial_form_count() == 2
+        assert b"Page 1 of 2" in response.content
+        second = admin_client.get(url, {"page": 2}, secure=True)
+        assert second.context["inline_admin_formset"].formset.initial_form_count() == 1
+
+    def test_post_saves_one_table(self, admin_client, destination, django_capture_on_commit_callbacks):
+        url = self.children_url(destination, "poststudywork")
+        formset = admin_client.get(url, secure=True).context["inline_admin_formset"].formset
+        data = {
+            f"{formset.prefix}-TOTAL_FORMS": 3,
+            f"{formset.prefix}-INITIAL_FORMS": 3,
+            f"{formset.prefix}-MIN_NUM_FORMS": 0,
+            f"{formset.prefix}-MAX_NUM_FORMS": 1000,
+        }
+        for index, form in enumerate(formset.forms[:3]):
+            for name, field in form.fields.items():
+                value = form.initial.get(name)
+                data[f"{formset.prefix}-{index}-{name}"] = "" if value is None else value
+            data[f"{formset.prefix}-{index}-id"] = form.instance.pk
+            data[f"{formset.prefix}-{index}-destination"] = destination.pk
+        data[f"{formset.prefix}-0-visa_name"] = "Graduate Route"
+        data[f"{formset.prefix}-2-DELETE"] = "on"
+        sections_before = list(DestinationSection.objects.values_list("section_title", flat=True))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_client.post(url, data, secure=True)
+
+        assert response.status_code == 200
+        assert b"Saved." in response.content
+        rows = PostStudyWork.objects.filter(destination=destination)
+        assert rows.count() == 2 and rows.filter(visa_name="Graduate Route").exists()
+        assert list(DestinationSection.objects.values_list("section_title", flat=True)) == sections_before
+        assert LogEntry.objects.get().object_id == str(destination.pk)
+
+
+@pytest.mark.django_db
+class TestStructuredData:
+    def test_detail_page_embeds_json_ld(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            destination = make_destination("uk", 0)
+            baker.make(TuitionTable, destination=destination, program_name="MSc <Data>", tuition_fee_min=9000)
+            baker.make(
+                DestinationSection,
+                destination=destination,
+                section_title="Why study here?",
+                section_content="<p>Top <b>universities</b></p>",
+                is_active=True,
+            )
+
+        response = Client().get(destination.get_absolute_url(), secure=True)
+
+        content = response.content.decode()
+        script = content.split('<script type="application/ld+json">')[1].split("</script>")[0]
+        assert "<Data>" not in script
+        graph = {node["@type"]: node for node in json.loads(script)["@graph"]}
+        assert graph["EducationalOrganization"]["url"] == "https://testserver/"
+        assert graph["Course"]["name"] == "MSc <Data>"
+        assert graph["Course"]["offers"]["priceSpecification"]["minPrice"] == "9000.00"
+        assert graph["FAQPage"]["mainEntity"][0]["acceptedAnswer"]["text"] == "Top universities"
@@ -0,0 +1,125 @@
+from io import BytesIO
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import get_connection
+from PIL import Image
+from pypdf import PdfWriter
+
+from applications.documents import document_validator, revalidate_documents
+from applications.models import Document, OutboxEmail
+from applications.outbox import send_due_emails, send_due_emails_pooled
+from utils.file_validators import mime_detector
+from utils.smtp_sink import SMTP_BACKEND, SMTPSink
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSMTPDelivery:
+    @pytest.fixture
+    def sink(self, settings):
+        with SMTPSink() as sink:
+            settings.EMAIL_BACKEND = SMTP_BACKEND
+            settings.EMAIL_HOST, settings.EMAIL_PORT = sink.host, sink.port
+            settings.EMAIL_USE_TLS = False
+            settings.EMAIL_HOST_USER = ""
+            yield sink
+
+    def queue(self, visa_application, count):
+        for _ in range(count - 1):
+            OutboxEmail.objects.create(application=visa_application, kind=OutboxEmail.APPLICATION_SUBMITTED)
+
+    def test_batch_goes_out_over_one_connection(self, sink, visa_application):
+        self.queue(visa_application, 20)
+
+        assert send_due_emails() == (20, 0)
+        assert sink.connections == 1
+        assert len(sink.messages) == 20
+        assert sink.messages[0][1] == ["john@test.com"]
+        assert OutboxEmail.objects.filter(state=OutboxEmail.SENT, sent_at__isnull=False).count() == 20
+
+    def test_reconnects_when_the_server_ends_the_session(self, settings, visa_application):
+        self.queue(visa_application, 7)
+        with SMTPSink(messages_per_connection=3) as sink:
+            connection = get_connection(SMTP_BACKEND, host=sink.host, port=sink.port, use_tls=False)
+            assert send_due_emails(connection=connection) == (7, 0)
+        assert sink.connections == 3
+
+    def test_refused_recipients_fail_permanently(self, sink, visa_application):
+        sink.rejected_recipients.add("john@test.com")
+
+        assert send_due_emails() == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.state == OutboxEmail.FAILED
+        assert "550" in email.last_error
+
+    def test_unreachable_server_is_retried_later(self, settings, visa_application):
+        with SMTPSink() as sink:
+            port = sink.port
+        settings.EMAIL_BACKEND = SMTP_BACKEND
+        settings.EMAIL_HOST, settings.EMAIL_PORT, settings.EMAIL_USE_TLS = "127.0.0.1", port, False
+        self.queue(visa_application, 3)
+
+        assert send_due_emails() == (0, 3)
+        assert set(OutboxEmail.objects.values_list("state", "attempts")) == {(OutboxEmail.PENDING, 1)}
+
+    def test_pooled_workers_send_each_email_once(self, sink, visa_application):
+        self.queue(visa_application, 30)
+
+        assert send_due_emails_pooled(workers=3) == (30, 0)
+        assert len(sink.messages) == 30
+        assert sink.connections == 3
+
+
+def pdf_bytes(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(595, 842)
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def png_bytes():
+    output = BytesIO()
+    Image.new("RGB", (40, 30), (10, 120, 60)).save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestDocumentValidation:
+    def test_checks_run_in_one_pass(self):
+        info = document_validator.inspect(SimpleUploadedFile("statement.pdf", pdf_bytes(3)))
+        assert info == (".pdf", "application/pdf", 3)
+        assert document_validator.inspect(SimpleUploadedFile("scan.png", png_bytes())).pages is None
+        # One libmagic handle per thread, reused for every file
+        assert mime_detector() is mime_detector()
+
+    @pytest.mark.parametrize(
+        "name,content,error",
+        [
+            ("statement.pdf", pdf_bytes(51), "more than 50 pages"),
+            ("statement.pdf", png_bytes(), 'File type "image/png" is not allowed for .pdf files'),
+            ("statement.pdf", b"%PDF-1.4 not really a pdf", "Invalid PDF"),
+            ("run.exe", png_bytes(), 'File extension ".exe" is not allowed'),
+        ],
+    )
+    def test_rejects(self, name, content, error):
+        with pytest.raises(ValidationError, match=error):
+            document_validator.inspect(SimpleUploadedFile(name, content))
+
+
+@pytest.mark.django_db
+def test_revalidation_fans_out_over_processes(visa_application, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    contents = {"good.pdf": pdf_bytes(2), "scan.png": png_bytes(), "renamed.pdf": png_bytes()}
+    for name, content in contents.items():
+        document = Document(application=visa_application, processing_status=Document.PROCESSING_READY)
+        document.file.save(name, ContentFile(content))
+
+    assert revalidate_documents(Document.objects.all(), workers=2, batch_size=2) == (3, 1)
+    invalid = Document.objects.get(processing_status=Document.PROCESSING_INVALID)
+    assert invalid.file.name.endswith("renamed.pdf")
+    assert "image/png" in invalid.processing_error
+    # Nothing changes the second time round
+    assert revalidate_documents(Document.objects.all()) == (3, 0)
@@ -1,10 +1,27 @@
+import datetime
+import hashlib
+import os
+from io import BytesIO
+
 import pytest
 from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from model_bakery import baker
+from model_bakery.recipe import seq
+from PIL import Image
 
+from applications import documents, uploads
+from applications.blobs import reclaim_blobs
+from applications.models import Application, Document, DocumentBlob
+from applications.queue import work_queue
+from applications.views import ApplicationListView
 from study_destinations.models import StudyDestination  # Changed from visas
+from testimonials.models import Testimonial
 
 
 @pytest.mark.django_db
@@ -55,3 +72,432 @@ class TestApplicationViews:
         response = client.get(reverse("dashboard:application_list"))
         assert response.status_code == 302
         assert "login" in response.url
+
+
+@pytest.mark.django_db
+class TestTestimonialViews:
+    def test_testimonial_list_conditional_get(self):
+        """Test the testimonial list answers If-None-Match until a testimonial changes"""
+        testimonial = baker.make(Testimonial, is_approved=True, rating=5)
+        url = reverse("testimonials:testimonial_list")
+        client = Client()
+        etag = client.get(url, secure=True)["ETag"]
+        assert client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        testimonial.is_approved = False
+        testimonial.save()
+        assert client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+class TestSitemap:
+    def test_lists_public_pages_with_lastmod(self, study_destination):
+        baker.make(Testimonial, is_approved=True, rating=5)
+        baker.make(StudyDestination, slug="hidden", is_published=False)
+
+        response = Client().get(reverse("sitemap"), secure=True)
+
+        content = response.content.decode()
+        assert response.status_code == 200
+        assert f"https://testserver{study_destination.get_absolute_url()}" in content
+        assert f"<lastmod>{study_destination.updated_at.date()}</lastmod>" in content
+        assert reverse("testimonials:testimonial_list") in content
+        assert reverse("core:faq") in content
+        assert "/hidden/" not in content
+
+    def test_served_from_cache_until_content_changes(
+        self, study_destination, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        client = Client()
+        client.get(reverse("sitemap"), secure=True)
+
+        with django_assert_num_queries(0):
+            response = client.get(reverse("sitemap"), secure=True)
+        assert response.status_code == 200
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(StudyDestination, slug="new-country", is_published=True)
+        assert b"/new-country/" in client.get(reverse("sitemap"), secure=True).content
+
+
+@pytest.mark.django_db
+class TestStaffApplicationList:
+    @pytest.fixture
+    def staff_client(self):
+        client = Client()
+        client.force_login(User.objects.create_user("staff", "staff@test.com", "pass", is_staff=True))
+        return client
+
+    @pytest.fixture
+    def applications(self, client_user, study_destination):
+        apps = baker.make(
+            Application, client=client_user, destination=study_destination, application_id=seq("APP-"), _quantity=23
+        )
+        # Several rows share a timestamp so the id tiebreak is exercised
+        submitted = timezone.now()
+        for index, app in enumerate(apps):
+            Application.objects.filter(pk=app.pk).update(
+                submitted_date=submitted - datetime.timedelta(minutes=index // 3),
+                status="APPROVED" if index % 2 else "SUBMITTED",
+            )
+        return Application.objects.order_by("-submitted_date", "-id")
+
+    def test_walks_every_row_once(self, staff_client, applications, monkeypatch):
+        monkeypatch.setattr(ApplicationListView, "page_size", 5)
+        url = reverse("dashboard:application_list")
+        seen, query, pages = [], "", []
+
+        while True:
+            response = staff_client.get(f"{url}?{query}", secure=True)
+            pages.append(response)
+            seen += [app.pk for app in response.context["applications"]]
+            query = response.context.get("next_page_query")
+            if not query:
+                break
+
+        assert seen == [app.pk for app in applications]
+        back = staff_client.get(f"{url}?{pages[2].context['previous_page_query']}", secure=True)
+        assert list(back.context["applications"]) == list(pages[1].context["applications"])
+
+    def test_deep_pages_cost_the_same_queries(self, staff_client, applications, monkeypatch):
+        monkeypatch.setattr(ApplicationListView, "page_size", 5)
+        url = reverse("dashboard:application_list")
+        first = staff_client.get(url, secure=True)
+        with CaptureQueriesContext(connection) as first_queries:
+            staff_client.get(url, secure=True)
+
+        with CaptureQueriesContext(connection) as later_queries:
+            staff_client.get(f"{url}?{first.context['next_page_query']}", secure=True)
+
+        assert len(later_queries) == len(first_queries)
+        assert not any("OFFSET" in query["sql"] or "COUNT(" in query["sql"] for query in later_queries)
+
+    def test_filters(self, staff_client, applications, monkeypatch):
+        monkeypatch.setattr(ApplicationListView, "page_size", 5)
+        response = staff_client.get(reverse("dashboard:application_list"), {"status": "APPROVED"}, secure=True)
+
+        assert {app.status for app in response.context["applications"]} == {"APPROVED"}
+        assert response.context["next_page_query"].startswith("status=APPROVED&after=")
+
+    def test_invalid_cursor_is_404(self, staff_client):
+        response = staff_client.get(reverse("dashboard:application_list"), {"after": "garbage"}, secure=True)
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestWorkQueue:
+    @pytest.fixture
+    def staff(self):
+        return User.objects.create_user("agent", "agent@test.com", "pass", is_staff=True)
+
+    @pytest.fixture
+    def cases(self, staff, client_user):
+        now = timezone.now()
+        for days, status, assigned in (
+            (0, "SUBMITTED", staff),
+            (1, "UNDER_REVIEW", staff),
+            (3, "DOCS_REQUIRED", staff),
+            (10, "PROCESSING", staff),
+            (45, "SUBMITTED", staff),
+            (60, "SUBMITTED", staff),
+            (50, "APPROVED", staff),  # decided
+            (50, "SUBMITTED", None),  # someone else's
+        ):
+            app = baker.make(Application, client=client_user, destination=None, application_id="")
+            Application.objects.filter(pk=app.pk).update(
+                status=status, assigned_staff=assigned, last_updated=now - datetime.timedelta(days=days, hours=1)
+            )
+
+    def test_buckets_in_constant_queries(self, staff, cases, django_assert_num_queries):
+        """Test counts come from one grouped query plus one lookup per non-empty bucket"""
+        with django_assert_num_queries(5):
+            queue = work_queue(staff, limit=1)
+
+        assert queue["total"] == 6
+        assert [bucket["count"] for bucket in queue["buckets"]] == [2, 1, 1, 2]
+        oldest = queue["buckets"][-1]["cases"]
+        assert len(oldest) == 1 and oldest[0]["age_days"] == 60
+
+    def test_json_endpoint_is_staff_only(self, staff, client_user, cases):
+        client = Client()
+        client.force_login(staff)
+        response = client.get(reverse("dashboard:work_queue"), {"format": "json"}, secure=True)
+        assert response.json()["buckets"][0]["cases"][0]["status"] == "UNDER_REVIEW"
+
+        client.force_login(client_user)
+        assert client.get(reverse("dashboard:work_queue"), secure=True).status_code == 403
+
+
+@pytest.mark.django_db
+class TestApplicationStatusUpdate:
+    def test_records_staff_member(self, visa_application):
+        staff = User.objects.create_user("agent", "agent@test.com", "pass", is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        url = reverse("dashboard:application_update", kwargs={"pk": visa_application.pk})
+
+        response = client.post(url, {"status": "UNDER_REVIEW", "notes": ""}, secure=True)
+        assert response.status_code == 302
+        response = client.post(url, {"status": "SUBMITTED", "notes": ""}, secure=True)
+        assert response.status_code == 200  # not an allowed move
+
+        change = visa_application.status_history.last()
+        assert (change.to_status, change.changed_by) == ("UNDER_REVIEW", staff)
+
+
+@pytest.mark.django_db
+class TestDocumentUpload:
+    @pytest.fixture
+    def upload(self, visa_application, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        client = Client()
+        client.force_login(visa_application.client)
+        url = reverse("dashboard:upload_document", kwargs={"pk": visa_application.pk})
+
+        def upload(name, content):
+            data = {"document_type": "PASSPORT", "file": SimpleUploadedFile(name, content)}
+            return client.post(url, data, secure=True)
+
+        return upload
+
+    def test_checks_run_after_the_response(self, upload, django_capture_on_commit_callbacks):
+        output = BytesIO()
+        Image.new("RGB", (2400, 1600), (200, 30, 30)).save(output, format="PNG")
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            assert upload("scan.png", output.getvalue()).status_code == 302
+        document = Document.objects.get()
+        assert document.processing_status == Document.PROCESSING_PENDING
+
+        for callback in callbacks:
+            callback()
+        document.refresh_from_db()
+        assert document.processing_status == Document.PROCESSING_READY
+        assert document.file.name.endswith(".jpg")
+        assert document.original_name == "scan.jpg"
+        assert Image.open(document.file.path).size == (1200, 800)
+
+    @pytest.mark.parametrize("mode", ["P", "I;16"])
+    def test_palette_and_16_bit_images_are_accepted(self, upload, mode, django_capture_on_commit_callbacks):
+        output = BytesIO()
+        Image.effect_noise((1600, 1200), 60).convert(mode).save(output, format="PNG")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            upload("scan.png", output.getvalue())
+
+        document = Document.objects.get()
+        assert document.processing_status == Document.PROCESSING_READY
+        assert document.file.name.endswith(".jpg")
+        assert Image.open(document.file.path).size == (1200, 900)
+
+    def test_rolled_back_compression_leaves_no_file(
+        self, upload, tmp_path, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        """Test a compressed image written before its transaction rolls back is deleted"""
+        output = BytesIO()
+        Image.new("RGB", (2400, 1600), (200, 30, 30)).save(output, format="PNG")
+
+        def fail(blob_id):
+            raise RuntimeError("release failed")
+
+        monkeypatch.setattr(documents, "release_blob", fail)
+        with django_capture_on_commit_callbacks(execute=True):
+            upload("scan.png", output.getvalue())
+
+        document = Document.objects.get()
+        assert document.processing_status == Document.PROCESSING_READY
+        assert document.file.name.endswith(".png")
+        files = [path for path in (tmp_path / "document_blobs").rglob("*") if path.is_file()]
+        assert [str(path.relative_to(tmp_path)) for path in files] == [document.file.name]
+
+    def test_unreadable_pdf_is_rejected(self, upload, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            upload("statement.pdf", b"%PDF-1.4 not really a pdf")
+
+        document = Document.objects.get()
+        assert document.processing_status == Document.PROCESSING_INVALID
+        assert document.processing_error.startswith("Invalid PDF")
+
+
+@pytest.mark.django_db
+class TestChunkedUpload:
+    content = b"%PDF-1.4 " + bytes(range(256)) * 40
+
+    @pytest.fixture
+    def client(self, visa_application, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path / "media"
+        settings.CHUNKED_UPLOAD_ROOT = tmp_path / "parts"
+        client = Client()
+        client.force_login(visa_application.client)
+        return client
+
+    def start(self, client, application, filename="statement.pdf", size=None, sha256=""):
+        url = reverse("dashboard:start_chunked_upload", kwargs={"pk": application.pk})
+        data = {"document_type": "BANK_STATEMENT", "filename": filename, "size": size or len(self.content)}
+        return client.post(url, {**data, "sha256": sha256}, secure=True)
+
+    def patch(self, client, url, offset, chunk):
+        return client.generic(
+            "PATCH", url, chunk, content_type="application/octet-stream", HTTP_UPLOAD_OFFSET=str(offset), secure=True
+        )
+
+    def test_chunks_assemble_into_a_hashed_document(self, client, visa_application, django_capture_on_commit_callbacks):
+        upload = self.start(client, visa_application).json()
+        assert upload["offset"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for offset in range(0, len(self.content), 4000):
+                chunk = self.content[offset:][:4000]
+                response = self.patch(client, upload["url"], offset, chunk)
+                assert response.status_code == 200
+                assert response["Upload-Offset"] == str(min(offset + 4000, len(self.content)))
+
+        assert response.json()["complete"]
+        document = Document.objects.get(pk=response.json()["document_id"])
+        assert document.sha256 == hashlib.sha256(self.content).hexdigest()
+        with document.file.open("rb") as fh:
+            assert fh.read() == self.content
+        # Checked once, on the assembled file
+        assert document.processing_status == Document.PROCESSING_INVALID
+        assert not os.listdir(uploads.settings.CHUNKED_UPLOAD_ROOT)
+
+    def test_resumes_from_the_acknowledged_offset(self, client, visa_application):
+        upload = self.start(client, visa_application).json()
+        self.patch(client, upload["url"], 0, self.content[:4000])
+
+        # A retry of a chunk the server already has is refused with the offset to carry on from
+        response = self.patch(client, upload["url"], 0, self.content[:4000])
+        assert response.status_code == 409
+        assert response.json()["offset"] == 4000
+        assert client.get(upload["url"], secure=True).json()["offset"] == 4000
+
+        # Another process without the hash state in memory rebuilds it from the part file
+        uploads._hashers.clear()
+        self.patch(client, upload["url"], 4000, self.content[4000:])
+        document = Document.objects.get()
+        assert document.sha256 == hashlib.sha256(self.content).hexdigest()
+
+    def test_rejects_bad_uploads(self, client, visa_application):
+        assert self.start(client, visa_application, filename="run.exe").status_code == 400
+        assert self.start(client, visa_application, size=50 * 1024 * 1024).status_code == 400
+
+        upload = self.start(client, visa_application).json()
+        assert self.patch(client, upload["url"], 0, self.content + b"extra").status_code == 400
+
+        other = Client()
+        other.force_login(User.objects.create_user("other", "other@test.com", "pass"))
+        assert other.get(upload["url"], secure=True).status_code == 404
+
+    def test_known_file_completes_without_sending_it(self, client, visa_application):
+        sha256 = hashlib.sha256(self.content).hexdigest()
+        upload = self.start(client, visa_application, sha256=sha256).json()
+        self.patch(client, upload["url"], 0, self.content)
+        Document.objects.update(processing_status=Document.PROCESSING_READY)
+
+        again = self.start(client, visa_application, sha256=sha256).json()
+        assert again["complete"]
+        first, second = Document.objects.order_by("pk")
+        assert second.blob == first.blob
+        assert second.file.name == first.file.name
+        first.blob.refresh_from_db()
+        assert first.blob.ref_count == 2
+
+        # Another client's matching hash proves nothing: they have to send the bytes
+        other_application = baker.make(Application, destination=visa_application.destination)
+        other = Client()
+        other.force_login(other_application.client)
+        assert not self.start(other, other_application, sha256=sha256).json()["complete"]
+
+    def test_known_file_checked_into_another_blob(self, client, visa_application, django_capture_on_commit_callbacks):
+        output = BytesIO()
+        Image.new("RGB", (2400, 1600), (200, 30, 30)).save(output, format="PNG")
+        content, sha256 = output.getvalue(), hashlib.sha256(output.getvalue()).hexdigest()
+        with django_capture_on_commit_callbacks(execute=True):
+            upload = self.start(client, visa_application, filename="scan.png", size=len(content), sha256=sha256).json()
+            self.patch(client, upload["url"], 0, content)
+        compressed = Document.objects.get().blob
+        assert compressed.pk != sha256
+
+        # The original bytes are still stored: they're checked and compressed again
+        with django_capture_on_commit_callbacks(execute=True):
+            again = self.start(client, visa_application, filename="scan.png", size=len(content), sha256=sha256)
+        assert again.json()["complete"]
+        assert Document.objects.get(pk=again.json()["document_id"]).blob == compressed
+
+        # Once they've been reclaimed the file has to be sent again
+        reclaim_blobs(datetime.timedelta(0))
+        assert not DocumentBlob.objects.filter(pk=sha256).exists()
+        response = self.start(client, visa_application, filename="scan.png", size=len(content), sha256=sha256)
+        assert response.status_code == 201
+        assert not response.json()["complete"]
+
+    def test_bytes_must_match_the_declared_hash(self, client, visa_application):
+        upload = self.start(client, visa_application, sha256="0" * 64).json()
+        response = self.patch(client, upload["url"], 0, self.content)
+        assert response.status_code == 400
+        assert not Document.objects.exists()
+
+
+@pytest.mark.django_db
+class TestDocumentBlobs:
+    content = b"%PDF-1.4 " + b"x" * 2000
+
+    @pytest.fixture
+    def upload(self, visa_application, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        client = Client()
+        client.force_login(visa_application.client)
+        url = reverse("dashboard:upload_document", kwargs={"pk": visa_application.pk})
+
+        def upload(name):
+            data = {"document_type": "PASSPORT", "file": SimpleUploadedFile(name, self.content)}
+            return client.post(url, data, secure=True)
+
+        return upload
+
+    def test_identical_files_are_stored_once(self, upload, settings):
+        upload("passport.pdf")
+        upload("passport-copy.pdf")
+
+        blob = DocumentBlob.objects.get()
+        assert blob.ref_count == 2
+        assert blob.sha256 == hashlib.sha256(self.content).hexdigest()
+        assert set(Document.objects.values_list("file", flat=True)) == {blob.file.name}
+        assert len(list((settings.MEDIA_ROOT / "document_blobs").rglob("*.pdf"))) == 1
+
+    def test_documents_keep_their_upload_names(self, upload, visa_application):
+        upload("passport.pdf")
+        upload("passport-copy.pdf")
+        client = Client()
+        client.force_login(visa_application.client)
+
+        page = client.get(reverse("dashboard:application_detail", kwargs={"pk": visa_application.pk}), secure=True)
+        assert b"passport-copy.pdf" in page.content
+
+        document = Document.objects.get(original_name="passport-copy.pdf")
+        url = reverse("dashboard:download_document", kwargs={"pk": document.pk})
+        response = client.get(url, secure=True)
+        assert response["Content-Disposition"] == 'attachment; filename="passport-copy.pdf"'
+        assert b"".join(response.streaming_content) == self.content
+
+        other = Client()
+        other.force_login(User.objects.create_user("other", "other@test.com", "pass"))
+        assert other.get(url, secure=True).status_code == 403
+
+    def test_file_is_reclaimed_once_unreferenced(self, upload, django_capture_on_commit_callbacks):
+        upload("passport.pdf")
+        upload("passport-copy.pdf")
+        blob = DocumentBlob.objects.get()
+        path = blob.file.path
+
+        Document.objects.first().delete()
+        assert reclaim_blobs(datetime.timedelta(0)) == (0, 0)
+
+        Document.objects.get().delete()
+        blob.refresh_from_db()
+        assert blob.ref_count == 0
+        assert reclaim_blobs(datetime.timedelta(hours=1)) == (0, 0)
+        with django_capture_on_commit_callbacks(execute=True):
+            assert reclaim_blobs(datetime.timedelta(0)) == (1, len(self.content))
+        assert not DocumentBlob.objects.exists()
+        assert not os.path.exists(path)
@@ -5,6 +5,7 @@ from functools import wraps
 
 from django.conf import settings
 from django.core.cache import cache
+from django.views.decorators.http import condition
 
 
 class CacheManager:
@@ -78,6 +79,49 @@ from django.views.decorators.cache import cache_page
 class ViewCache:
     """View-level caching utilities"""
 
+    @staticmethod
+    def is_public_request(request):
+        """
+        True for GET/HEAD requests that render the same for every visitor: no
+        session (so no logged-in user) and no pending flash messages. Checked on
+        cookies alone so answering it never touches the database.
+        """
+        return (
+            request.method in ("GET", "HEAD")
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and "messages" not in request.COOKIES
+        )
+
+    @staticmethod
+    def conditional_public_page(state_func):
+        """
+        Conditional GET for public pages. state_func(request, *args, **kwargs)
+        returns a cheap (last_modified, fingerprint) summary of the content a
+        page renders; ETag and Last-Modified are derived from it so an unchanged
+        page is answered with 304 before the view runs. Requests that aren't
+        public render per visitor and always get a full response.
+        """
+
+        def state(request, *args, **kwargs):
+            if not ViewCache.is_public_request(request):
+                return None
+            # etag_func and last_modified_func both need it; compute it once
+            if not hasattr(request, "_content_state"):
+                request._content_state = state_func(request, *args, **kwargs)
+            return request._content_state
+
+        def etag(request, *args, **kwargs):
+            current = state(request, *args, **kwargs)
+            if current is None:
+                return None
+            return 'W/"{}"'.format(hashlib.md5(str(current[1]).encode()).hexdigest())
+
+        def last_modified(request, *args, **kwargs):
+            current = state(request, *args, **kwargs)
+            return current[0] if current else None
+
+        return condition(etag_func=etag, last_modified_func=last_modified)
+
     @staticmethod
     def cache_public_page(timeout=300):
         """Cache decorator for public pages"""
@@ -1,12 +1,14 @@
 # Create utils/file_handlers.py
 import os
+import re
 import uuid
 from io import BytesIO
 
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from PIL import Image
-from pypdf import PdfReader
+
+from utils.file_validators import pdf_page_count
 
 
 class SecureFileHandler:
@@ -36,11 +38,20 @@ class SecureFileHandler:
         try:
             img = Image.open(image_file)
 
+            # JPEG only holds RGB or greyscale: palettes with transparency are
+            # flattened like RGBA, and 16-bit greyscale is scaled to 8 bits
+            if img.mode == "PA" or (img.mode == "P" and "transparency" in img.info):
+                img = img.convert("RGBA")
+            elif img.mode.startswith("I"):
+                img = img.convert("I").point(lambda value: value / 256).convert("L")
+
             # Convert RGBA to RGB if necessary
             if img.mode in ("RGBA", "LA"):
                 background = Image.new("RGB", img.size, (255, 255, 255))
                 background.paste(img, mask=img.split()[-1])
                 img = background
+            elif img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
 
             # Resize if larger than max_size
             if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
@@ -56,21 +67,8 @@ class SecureFileHandler:
             raise Exception(f"Image compression failed: {str(e)}")
 
     @staticmethod
-    def validate_pdf(file):
+    def validate_pdf(file, max_pages=50):
         """Validate PDF file structure"""
-        try:
-            file.seek(0)  # ensure file pointer at start
-            pdf = PdfReader(file)
-
-            # Check if PDF is encrypted
-            if pdf.is_encrypted:
-                raise ValueError("Encrypted PDFs are not allowed")
-
-            # Check number of pages (optional limit)
-            if len(pdf.pages) > 50:
-                raise ValueError("PDF cannot have more than 50 pages")
-
-            return True
-
-        except Exception as e:
-            raise ValueError(f"Invalid PDF: {str(e)}")
+        if pdf_page_count(file) > max_pages:
+            raise ValueError(f"Invalid PDF: PDF cannot have more than {max_pages} pages")
+        return True
@@ -0,0 +1,119 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the sort key of the row they continue from rather
+than an offset, so fetching page 10,000 costs the same index seek as page
+one and rows inserted meanwhile never shift a page. There is no total count.
+"""
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    # isoformat() keeps the microseconds DjangoJSONEncoder would drop; the key must round-trip exactly
+    values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+    if not isinstance(values, list):
+        raise InvalidCursor("cursor must encode a list")
+    return values
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset in descending order of fields, the last of which
+    must be unique (typically ("submitted_date", "id")). An index on the
+    same fields, after any equality filters, makes every page one seek.
+    """
+
+    def __init__(self, queryset, fields, per_page):
+        self.queryset = queryset
+        self.fields = list(fields)
+        self.per_page = per_page
+
+    def _key(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def _parse(self, values):
+        if len(values) != len(self.fields):
+            raise InvalidCursor("cursor doesn't match the sort fields")
+        parsed = []
+        for field_name, value in zip(self.fields, values):
+            field = self.queryset.model._meta.get_field(field_name)
+            if field.get_internal_type() == "DateTimeField":
+                value = parse_datetime(value) if isinstance(value, str) else None
+                if value is None:
+                    raise InvalidCursor(f"invalid value for {field_name}")
+            else:
+                try:
+                    value = field.to_python(value)
+                except Exception as e:
+                    raise InvalidCursor(str(e))
+            parsed.append(value)
+        return parsed
+
+    def _beyond(self, values, lookup):
+        """
+        Rows past values in the given direction. (a, b) < (x, y) is written as
+        a <= x AND (a < x OR (a = x AND b < y)), so the leading column bounds
+        an index range scan.
+        """
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            equal = {self.fields[i]: values[i] for i in range(index)}
+            condition |= Q(**equal, **{f"{field}__{lookup}": values[index]})
+        return Q(**{f"{self.fields[0]}__{lookup}e": values[0]}) & condition
+
+    def page(self, after=None, before=None):
+        """The page following cursor after, preceding cursor before, or the first page"""
+        descending = [f"-{field}" for field in self.fields]
+        if before:
+            rows = self.queryset.filter(self._beyond(self._parse(decode_cursor(before)), "gt"))
+            rows = list(rows.order_by(*self.fields)[: self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[: self.per_page][::-1]
+            previous_cursor = encode_cursor(self._key(rows[0])) if rows and has_more else None
+            next_cursor = encode_cursor(self._key(rows[-1])) if rows else None
+            return KeysetPage(rows, next_cursor, previous_cursor)
+
+        rows = self.queryset
+        if after:
+            rows = rows.filter(self._beyond(self._parse(decode_cursor(after)), "lt"))
+        rows = list(rows.order_by(*descending)[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        next_cursor = encode_cursor(self._key(rows[-1])) if has_more else None
+        previous_cursor = encode_cursor(self._key(rows[0])) if rows and after else None
+        return KeysetPage(rows, next_cursor, previous_cursor)
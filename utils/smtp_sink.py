@@ -0,0 +1,120 @@
+# utils/smtp_sink.py
+"""
+A minimal SMTP server that accepts mail and keeps it in memory, for testing
+and benchmarking email delivery against a real socket without a mail
+provider. It speaks just enough of RFC 5321 for smtplib: no TLS, no AUTH.
+
+    with SMTPSink() as sink:
+        connection = get_connection(SMTP_BACKEND, host=sink.host, port=sink.port)
+        ...
+        sink.messages  # [(sender, recipients, data), ...]
+"""
+import socketserver
+import threading
+import time
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        if server.connect_delay:
+            # Stands in for the TCP and TLS handshakes with a remote server
+            time.sleep(server.connect_delay)
+        self.reply("220 localhost SMTP sink ready")
+        sender, recipients, accepted = None, [], 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode("utf-8", "replace").strip().partition(" ")
+            command = command.upper()
+            if command == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif command == "HELO":
+                self.reply("250 localhost")
+            elif command == "MAIL":
+                sender, recipients = argument.split(":", 1)[1].strip().strip("<>"), []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                recipient = argument.split(":", 1)[1].strip().strip("<>")
+                if recipient in server.rejected_recipients:
+                    self.reply(f"550 No such user {recipient}")
+                else:
+                    recipients.append(recipient)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in iter(self.rfile.readline, b""):
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    data.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                with server.lock:
+                    server.messages.append((sender, recipients, b"".join(data)))
+                accepted += 1
+                self.reply("250 OK queued")
+                if server.messages_per_connection and accepted >= server.messages_per_connection:
+                    # Like providers that cap messages per session
+                    self.reply("421 Too many messages, closing connection")
+                    return
+            elif command in ("RSET", "NOOP"):
+                if command == "RSET":
+                    sender, recipients = None, []
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """
+    Accepts mail on host:port in a background thread. rejected_recipients
+    get a permanent 550; messages_per_connection makes the server hang up
+    after that many messages in one session.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, connect_delay=0, rejected_recipients=(), messages_per_connection=0):
+        super().__init__((host, port), _SMTPHandler)
+        self.connect_delay = connect_delay
+        self.rejected_recipients = set(rejected_recipients)
+        self.messages_per_connection = messages_per_connection
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def host(self):
+        return self.server_address[0]
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
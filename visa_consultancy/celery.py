@@ -0,0 +1,32 @@
+# visa_consultancy/celery.py
+import os
+
+from celery import Celery
+
+# Set the default Django settings module
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "visa_consultancy.settings")
+
+app = Celery("visa_consultancy")
+
+# Using a string here means the worker doesn't have to serialize
+# the configuration object to child processes.
+app.config_from_object("django.conf:settings", namespace="CELERY")
+
+# Load task modules from all registered Django apps.
+app.autodiscover_tasks()
+
+
+@app.on_after_configure.connect
+def create_broker_folders(sender, **kwargs):
+    """The filesystem broker used in development expects its folders to exist"""
+    if not sender.conf.broker_url.startswith("filesystem://"):
+        return
+    for option in ("data_folder_in", "data_folder_out", "control_folder"):
+        folder = sender.conf.broker_transport_options.get(option)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+
+@app.task(bind=True, ignore_result=True)
+def debug_task(self):
+    print(f"Request: {self.request!r}")
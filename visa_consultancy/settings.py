@@ -1,6 +1,9 @@
 # visa_consultancy/settings.py
 import os
+from datetime import timedelta
 from pathlib import Path
+
+from celery.schedules import crontab
 from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +30,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.sitemaps",
     # Third party
     "crispy_forms",
     "crispy_bootstrap5",
@@ -47,6 +51,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.PrerenderedPageMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -105,6 +110,17 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # WhiteNoise for static files
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Pre-rendered public pages (see `manage.py export_static_pages`)
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+PRERENDER_HOST = 'uniworldeducation.pythonanywhere.com'
+
+# Chunked document uploads are assembled here, outside MEDIA_ROOT, until complete
+CHUNKED_UPLOAD_ROOT = os.path.join(BASE_DIR, "upload_parts")
+CHUNKED_UPLOAD_MAX_CHUNK = 2 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY = timedelta(days=1)
+# How long an unreferenced document blob is kept before it's deleted
+DOCUMENT_BLOB_GRACE = timedelta(hours=1)
+
 # Media files (user uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -146,12 +162,63 @@ EMAIL_CONFIG = {
 }
 EMAIL_TIMEOUT = 30
 
+# Used in emails, which are rendered outside any request
+SITE_NAME = "Uni World Consultancy"
+SITE_DOMAIN = config("SITE_DOMAIN", default="uniworldeducation.pythonanywhere.com")
+
+# Outbox emails are retried with exponential backoff, then marked failed
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
+# Celery: slow side effects (emails, document checks, static page exports) run
+# as tasks. The filesystem broker needs no server in development; point
+# CELERY_BROKER_URL at Redis or RabbitMQ in production. With
+# CELERY_TASK_ALWAYS_EAGER, as in the tests, tasks run inline.
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default="filesystem://")
+CELERY_BROKER_FOLDER = os.path.join(BASE_DIR, ".celery")
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "data_folder_in": os.path.join(CELERY_BROKER_FOLDER, "queue"),
+    "data_folder_out": os.path.join(CELERY_BROKER_FOLDER, "queue"),
+    "control_folder": os.path.join(CELERY_BROKER_FOLDER, "control"),
+}
+CELERY_TASK_ALWAYS_EAGER = config("CELERY_TASK_ALWAYS_EAGER", default=False, cast=bool)
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "send-outbox-emails": {"task": "applications.tasks.send_outbox_emails", "schedule": 30.0},
+    "discard-expired-uploads": {"task": "applications.tasks.discard_expired_uploads", "schedule": 60.0 * 60},
+    "reclaim-document-blobs": {"task": "applications.tasks.reclaim_document_blobs", "schedule": 60.0 * 60 * 6},
+    # Just after midnight, when yesterday's deadlines have passed
+    "refresh-deadline-dates": {
+        "task": "study_destinations.tasks.refresh_deadlines",
+        "schedule": crontab(hour=0, minute=5),
+    },
+}
+
 # Cache Configuration - Use local memory cache
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": "unique-snowflake",
-    }
+    },
+    # Content version tokens. Shared through the filesystem so a change saved
+    # by a Celery task or a management command invalidates every web worker's
+    # locmem page caches too
+    "versions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, ".cache", "versions"),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Cache timeouts (seconds) by key prefix. Versioned page caches are invalidated
+# explicitly on content changes, so their timeout only bounds memory use.
+CACHE_TIMEOUTS = {
+    "destination_pages": 60 * 60 * 24,
+    "tuition_comparison": 60 * 60 * 24,
+    "closing_soon": 60 * 60 * 24,
+    "sitemap": 60 * 60 * 24,
 }
 
 # CKEditor config